@@ -3,7 +3,7 @@
 # =========================
 
 # --- Patch chemin d'import pour Streamlit Cloud ---
-import sys, os
+import sys, os, time, contextlib
 ROOT = os.path.dirname(__file__)
 sys.path.insert(0, ROOT)                         # repo root
 sys.path.insert(0, os.path.join(ROOT, "src"))    # /src pour import direct
@@ -13,106 +13,40 @@ import streamlit as st
 import yaml
 import pandas as pd
 import numpy as np
-import requests
 
 # ---- Imports robustes (avec fallback) ----
 # Data
 try:
-    from src.data.loader import load_or_fetch, fetch_last_price
+    from src.data.loader import load_or_fetch
+    from src.data.prices import snapshot as price_snapshot
+    from src.data.resample import history as resampled_history
 except Exception as e:
     st.stop()
 
-# Stratégies & recherche (chargement dynamique, plus besoin de ALL)
-from importlib import import_module
-import pkgutil
-
-try:
-    from src.research.ensemble import ensemble_weights, blended_signal
-    try:
-        from src.research.regime import kmeans_regime
-        HAS_REGIME = True
-    except Exception:
-        HAS_REGIME = False
-except Exception as e:
-    st.error(f"Import recherche impossible: {e}")
-    st.stop()
-
-# 🔎 Détecte automatiquement toutes les stratégies présentes dans src/strategies
-STRATS = {}
+# Stratégies : registre déclaré dans src/strategies/manifest.json, modules importés au premier appel
 try:
-    pkg = import_module("src.strategies")     # doit exister : src/strategies/
-    for _, modname, ispkg in pkgutil.iter_modules(pkg.__path__):
-        if ispkg or modname in ("__init__", "all"):   # ignore sous-packages et all.py
-            continue
-        m = import_module(f"src.strategies.{modname}")
-        # Cherche une fonction de signal plausible
-        candidates = (
-            "signal",
-            f"{modname}_signal",
-            "ema_trend_signal", "macd_momentum_signal", "donchian_breakout_signal",
-            "boll_mr_signal", "kama_trend_signal", "rsi_reversion_signal",
-            "ichimoku_signal", "supertrend_signal", "atr_channel_signal",
-        )
-        fn = next((getattr(m, c) for c in candidates if hasattr(m, c)), None)
-        if callable(fn):
-            pretty = modname.replace("_", " ").title()
-            # quelques jolis noms connus
-            pretty = {
-                "Ema Trend": "EMA Trend",
-                "Macd": "MACD Momentum",
-                "Donchian": "Donchian Breakout",
-                "Boll Mr": "Bollinger MR",
-                "Atr Channel": "ATR Channel",
-                "Supertrend": "SuperTrend",
-            }.get(pretty, pretty)
-            STRATS[pretty] = fn
+    from src.strategies.registry import strategies as load_strategies, import_report
+    STRATS = load_strategies()
 except Exception as e:
     st.error(f"Chargement des stratégies impossible : {e}")
     st.stop()
 
 if not STRATS:
-    st.error("Aucune stratégie détectée dans src/strategies/.")
+    st.error("Aucune stratégie déclarée dans src/strategies/manifest.json.")
     st.stop()
-# 🔎 Détecte automatiquement toutes les stratégies présentes dans src/strategies
-STRATS = {}
+
 try:
-    pkg = import_module("src.strategies")     # doit exister : src/strategies/
-    for _, modname, ispkg in pkgutil.iter_modules(pkg.__path__):
-        if ispkg or modname in ("__init__", "all"):   # ignore sous-packages et all.py
-            continue
-        m = import_module(f"src.strategies.{modname}")
-        # Cherche une fonction de signal plausible
-        candidates = (
-            "signal",
-            f"{modname}_signal",
-            "ema_trend_signal", "macd_momentum_signal", "donchian_breakout_signal",
-            "boll_mr_signal", "kama_trend_signal", "rsi_reversion_signal",
-            "ichimoku_signal", "supertrend_signal", "atr_channel_signal",
-        )
-        fn = next((getattr(m, c) for c in candidates if hasattr(m, c)), None)
-        if callable(fn):
-            pretty = modname.replace("_", " ").title()
-            # quelques jolis noms connus
-            pretty = {
-                "Ema Trend": "EMA Trend",
-                "Macd": "MACD Momentum",
-                "Donchian": "Donchian Breakout",
-                "Boll Mr": "Bollinger MR",
-                "Atr Channel": "ATR Channel",
-                "Supertrend": "SuperTrend",
-            }.get(pretty, pretty)
-            STRATS[pretty] = fn
+    from src.research.ensemble import walk_forward_weights, blended_signal
+    from src.research.scan import scan, rank_picks
+    from src.risk.portfolio import select_picks
+    from src.research.cache import PIPELINE_CACHE, pipeline_key
 except Exception as e:
-    st.error(f"Chargement des stratégies impossible : {e}")
-    st.stop()
-
-if not STRATS:
-    st.error("Aucune stratégie détectée dans src/strategies/.")
+    st.error(f"Import recherche impossible: {e}")
     st.stop()
 
 # Risque & backtest
 try:
-    from src.risk.levels import adaptive_levels, size_fixed_pct, size_fixed_usd, size_kelly_fraction
+    from src.risk.levels import levels_from_signal, position_size
 except Exception as e:
     st.error(f"Import risk-levels impossible: {e}")
     st.stop()
@@ -123,56 +57,13 @@ try:
 except Exception:
     backtest = None
 
-# Portefeuille (avec Fallback inline si le module n’existe pas)
-try:
-    from src.portfolio.db import list_positions, open_position, close_position
-    PORTF_OK = True
-except Exception:
-    PORTF_OK = False
-    import sqlite3, datetime
-    DB_FALLBACK = os.path.join(ROOT, "portfolio.db")
-
-    def _init_db():
-        conn = sqlite3.connect(DB_FALLBACK); c = conn.cursor()
-        c.execute("""CREATE TABLE IF NOT EXISTS positions(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            open_ts TEXT, close_ts TEXT, symbol TEXT, side TEXT,
-            entry REAL, sl REAL, tp REAL, qty REAL,
-            status TEXT, exit_price REAL, pnl REAL, note TEXT
-        )""")
-        conn.commit(); conn.close()
-
-    def open_position(symbol, side, entry, sl, tp, qty, note=""):
-        _init_db()
-        conn = sqlite3.connect(DB_FALLBACK); c = conn.cursor()
-        c.execute("""INSERT INTO positions (open_ts, close_ts, symbol, side, entry, sl, tp, qty, status, exit_price, pnl, note)
-                     VALUES (?,?,?,?,?,?,?,?,?,?,?,?)""",
-                  (datetime.datetime.utcnow().isoformat(), None, symbol, side.upper(),
-                   float(entry), float(sl), float(tp), float(qty), "OPEN", None, None, note))
-        conn.commit(); rid = c.lastrowid; conn.close(); return rid
+from src import tracing as trace
 
-    def close_position(pos_id, exit_price, note="CLOSE"):
-        _init_db()
-        conn = sqlite3.connect(DB_FALLBACK); c = conn.cursor()
-        row = conn.execute('SELECT side, entry, qty FROM positions WHERE id=? AND status="OPEN"', (pos_id,)).fetchone()
-        if not row:
-            conn.close(); raise ValueError("position introuvable ou déjà close")
-        side, entry, qty = row
-        pnl = (float(exit_price) - float(entry)) * float(qty) * (1 if side.upper()=="LONG" else -1)
-        conn.execute("""UPDATE positions SET close_ts=?, status=?, exit_price=?, pnl=?, note=? WHERE id=?""",
-                     (datetime.datetime.utcnow().isoformat(), "CLOSED", float(exit_price), float(pnl), note, pos_id))
-        conn.commit(); conn.close(); return pnl
-
-    def list_positions(status=None, limit=500):
-        _init_db()
-        conn = sqlite3.connect(DB_FALLBACK)
-        q = "SELECT id, open_ts, close_ts, symbol, side, entry, sl, tp, qty, status, exit_price, pnl, note FROM positions"
-        params = ()
-        if status in ("OPEN","CLOSED"):
-            q += " WHERE status=?"; params = (status,)
-        q += " ORDER BY id DESC LIMIT ?"; params = params + (int(limit),)
-        rows = list(conn.execute(q, params)); conn.close()
-        return pd.DataFrame(rows, columns=["id","open_ts","close_ts","symbol","side","entry","sl","tp","qty","status","exit_price","pnl","note"])
+# Portefeuille (stockage SQLite unique : WAL, index, écritures groupées)
+from src.storage.db import list_positions, open_positions, close_positions, close_position, save_picks, latest_picks
+from src.research.daemon import last_close
+from src.portofolio.analytics import summary as pf_summary, equity_curve, pnl_by, page_positions
+from src.portofolio.monitor import PositionMonitor, PollingSource, hits as tp_sl_hits
 
 # ---------- Config ----------
 def _read_yaml(path, default=None):
@@ -209,9 +100,9 @@ with st.sidebar:
     capital = st.number_input("Capital (USD)", value=float(CFG.get("backtest",{}).get("initial_cash",1000)), step=100.0)
     # presets
     presets = {
-        "Conservateur": dict(risk_pct=0.5, max_expo=40.0, min_rr=1.5, max_positions=2),
-        "Balancé":     dict(risk_pct=1.0, max_expo=70.0, min_rr=1.6, max_positions=3),
-        "Agressif":     dict(risk_pct=2.0, max_expo=100.0, min_rr=1.8, max_positions=5),
+        "Conservateur": dict(risk_pct=0.5, max_expo=40.0, min_rr=1.5, max_positions=2, vol_budget=1.0),
+        "Balancé":     dict(risk_pct=1.0, max_expo=70.0, min_rr=1.6, max_positions=3, vol_budget=2.0),
+        "Agressif":     dict(risk_pct=2.0, max_expo=100.0, min_rr=1.8, max_positions=5, vol_budget=3.5),
     }
     if mode!="Custom":
         p = presets[mode]
@@ -219,94 +110,114 @@ with st.sidebar:
         max_expo  = st.slider("Cap d’exposition (%)", 10.0, 200.0, p["max_expo"], 1.0)
         min_rr    = st.slider("R/R minimum", 1.0, 5.0, p["min_rr"], 0.1)
         max_pos   = st.slider("Nb max positions", 1, 8, p["max_positions"], 1)
+        vol_budget = st.slider("Budget de volatilité (%/jour)", 0.2, 10.0, p["vol_budget"], 0.1)
     else:
         risk_pct = st.slider("Risque %/trade", 0.1, 5.0, 1.0, 0.1)
         max_expo  = st.slider("Cap d’exposition (%)", 10.0, 200.0, 80.0, 1.0)
         min_rr    = st.slider("R/R minimum", 1.0, 5.0, 1.6, 0.1)
         max_pos   = st.slider("Nb max positions", 1, 8, 3, 1)
+        vol_budget = st.slider("Budget de volatilité (%/jour)", 0.2, 10.0, 2.0, 0.1)
 
     st.caption("TF = cadence de recalcul. Exécution 100% manuelle.")
+    with st.expander("Imports (stratégies chargées)"):
+        st.write({m: f"{1000*t:.1f} ms" for m, t in import_report().items()} or "aucune stratégie chargée")
 
-tabs = st.tabs(["🏠 Top Picks", "📈 Portefeuille", "🧾 Journal", "🧪 Backtest 3Y"])
-
-# --------- Helpers ----------
-def rr_from_levels(entry, sl, tp):
-    R = abs(entry - sl)
-    return float(abs(tp - entry) / (R if R>0 else 1e-9))
-
-def confidence_from_backtest(df, sig):
-    if backtest is None or len(df) < 100:
-        return 50.0
-    bt = backtest(df, sig, initial_cash=1.0, fee_bps=2.0, slippage_bps=1.0)
-    s = max(0.0, min(3.0, sharpe(bt["pnl"])))
-    dd = abs(max_drawdown(bt["equity"]))
-    score = (s/3.0)*70.0 + (1.0 - min(dd,0.4)/0.4)*30.0
-    return round(100.0*score/100.0, 1)
-
-def size_qty(account_equity, entry, sl, risk_pct):
-    return size_fixed_pct(account_equity, entry, sl, risk_pct)
+tabs = st.tabs(["🏠 Top Picks", "📈 Portefeuille", "🧾 Journal", "🧪 Backtest 3Y", "🩺 Diagnostics"])
 
 # --------- TAB 1: TOP PICKS ----------
 with tabs[0]:
     st.subheader("Top Picks (1 clic)")
-    if st.button("🚀 Générer les meilleurs trades (max 5)"):
-        rows = []
-        for sym in symbols:
-            df = load_or_fetch(exchange, sym, tf, limit=2500)
-            # Regime gating (si dispo)
-            sigs = {name: fn(df) for name, fn in STRATS.items()}
-            if HAS_REGIME:
-                reg = kmeans_regime(df)
-                reg_now = str(reg.iloc[-1])
-            else:
-                reg_now = "neutral"
-            w = ensemble_weights(df, sigs, window=int((CFG.get("app",{}).get("ensemble_window") or 300)))
-            sig = blended_signal(sigs, w)
-            d = int(sig.iloc[-1])
-            if d == 0:
-                continue
-            lvl = adaptive_levels(df, d,
-                atr_mult_sl=float(CFG.get("risk",{}).get("atr_k_sl", 2.5)),
-                atr_mult_tp=float(CFG.get("risk",{}).get("atr_k_tp", 3.5))
-            )
-            if not lvl:
-                continue
-            rr = rr_from_levels(lvl["entry"], lvl["sl"], lvl["tp"])
-            if rr < min_rr:
-                continue
-            qty = size_qty(capital, lvl["entry"], lvl["sl"], risk_pct)
-            conf = confidence_from_backtest(df, sig)
-            rows.append({
-                "symbol": sym,
-                "dir": "LONG" if d>0 else "SHORT",
-                "entry": lvl["entry"], "sl": lvl["sl"], "tp": lvl["tp"],
-                "rr": rr, "qty": qty, "confiance": conf, "regime": reg_now
-            })
-        if not rows:
+    # les picks sont précalculés par le scanner headless (python -m src.research.daemon) et lus en base ;
+    # le bouton relance le même pipeline ici et enregistre le résultat de la même façon
+    profile_scan = st.checkbox("Profiler ce scan (cProfile, analyse dans ce processus)", value=False)
+    if st.button(f"🚀 Générer les meilleurs trades (max {max_pos})"):
+        rows = []; t0 = time.perf_counter()
+        # le profileur est toujours désactivé en sortie, même si le scan ou l’enregistrement échoue
+        with (trace.profile() if profile_scan else contextlib.nullcontext()) as prof:
+            prog = st.progress(0.0, text="Scan en cours…")
+            table = st.empty()
+            params = dict(min_rr=min_rr, capital=capital, risk_pct=risk_pct,
+                          atr_k_sl=float(CFG.get("risk",{}).get("atr_k_sl", 2.5)),
+                          atr_k_tp=float(CFG.get("risk",{}).get("atr_k_tp", 3.5)),
+                          ensemble_window=int((CFG.get("app",{}).get("ensemble_window") or 300)))
+            results = scan(exchange, symbols, tf, limit=2500, strategies=STRATS,
+                           cpu_workers=1 if prof else None, **params)
+            # les lignes arrivent symbole par symbole : le tableau se remplit progressivement
+            for i, (sym, row, err) in enumerate(results, 1):
+                prog.progress(i/len(symbols), text=f"{sym} ({i}/{len(symbols)})")
+                if err is not None:
+                    st.caption(f"⚠️ {sym}: {err}")
+                if row:
+                    rows.append(row)
+                    table.dataframe(rank_picks(rows, k=max_pos).round(6), use_container_width=True)
+            prog.empty(); table.empty()
+            # sélection sous les caps du portefeuille (positions ouvertes comprises) : exposition, nb de
+            # positions, budget de volatilité (covariance des candidats), doublons corrélés écartés
+            picks, pf = select_picks(rows, exchange, tf, capital, max_expo=max_expo, max_pos=max_pos,
+                                     vol_budget=vol_budget, existing=list_positions(status="OPEN"))
+            save_picks(exchange, tf, last_close(tf), picks, n_symbols=len(symbols), duration_s=time.perf_counter() - t0,
+                       params=dict(params, max_pos=max_pos, max_expo=max_expo, vol_budget=vol_budget, portfolio=pf, source="ui"))
+        if prof:
+            st.session_state["profile_report"] = prof.report(40)
+
+    run, df_rows = latest_picks(exchange, tf)
+    if run is not None:
+        stale = run["bar_ts"] != str(last_close(tf))
+        st.caption(f"Scan du {run['ts'][:16].replace('T',' ')} UTC · {run['n_symbols']} symboles · "
+                   f"{run['duration_s'] or 0:.1f}s" + (" · ⚠️ une bougie a clôturé depuis" if stale else ""))
+        pf = run["params"].get("portfolio")
+        if pf:
+            st.caption(f"Portefeuille après ces trades : exposition {pf['gross_pct']:.0f} % · volatilité {pf['vol_day_pct']:.2f} %/jour"
+                       + (" · écartés : " + ", ".join(f"{k} ({v})" for k, v in pf["rejected"].items()) if pf["rejected"] else ""))
+        taken = st.session_state.setdefault("taken_runs", set())
+        if df_rows.empty:
             st.warning("Aucun signal suffisamment solide pour l’instant.")
+        elif run["id"] in taken:
+            st.info("Trades de ce scan déjà ajoutés au portefeuille.")
         else:
-            df_rows = pd.DataFrame(rows).sort_values(["confiance","rr"], ascending=False).head(5)
-            st.dataframe(df_rows[["symbol","dir","entry","sl","tp","qty","rr","confiance","regime"]].round(6),
+            st.dataframe(df_rows[["symbol","dir","entry","sl","tp","qty","rr","confiance","score_p5","score_p95","regime"]].round(6),
                          use_container_width=True)
             # Enregistrer tout d’un coup
             if st.button("📌 J’ai pris ces trades"):
-                n=0
-                for _, r in df_rows.iterrows():
-                    open_position(r["symbol"], r["dir"], float(r["entry"]), float(r["sl"]),
-                                  float(r["tp"]), float(r["qty"]), note="TOPPICK")
-                    n+=1
+                n = open_positions(df_rows.to_dict("records"), note="TOPPICK")
                 st.success(f"{n} trade(s) ajouté(s) au portefeuille.")
+                taken.add(run["id"])
                 st.rerun()
 
 # --------- TAB 2: PORTEFEUILLE ----------
+@st.cache_resource
+def _tp_sl_monitor():
+    # un seul moniteur par processus serveur, partagé entre sessions : la table positions n'a pas
+    # de colonne exchange, deux moniteurs confronteraient tout le carnet aux prix de deux places
+    return {"enabled": True, "monitor": None}
+
 with tabs[1]:
     st.subheader("Positions ouvertes")
+    # surveillance TP/SL en tâche de fond (asyncio, src/portofolio/monitor.py)
+    mon_state = _tp_sl_monitor()
+    mon_state["enabled"] = st.toggle("Surveillance TP/SL automatique (serveur, toutes sessions)",
+                                     value=mon_state["enabled"],
+                                     help="Réglage commun à toutes les sessions ; les prix viennent de l’exchange sélectionné.")
+    mon = mon_state["monitor"]
+    if mon_state["enabled"]:
+        if mon is not None and mon.source.exchange != exchange:
+            mon.stop(); mon = None        # changement d'exchange : l'ancien moniteur est remplacé
+        if mon is None or not mon.running:
+            mon = mon_state["monitor"] = PositionMonitor(PollingSource(exchange, float(CFG.get("app",{}).get("monitor_interval", 1))))
+            mon.start()
+        ms = mon.stats
+        st.caption(f"Surveillance active ({exchange}) · {ms['positions']} position(s) · {ms['ticks']} ticks · "
+                   f"dernier tick {ms['last_tick'] or '—'} · {ms['closed']} clôture(s) auto")
+    elif mon is not None:
+        mon.stop(); mon_state["monitor"] = None
     open_df = list_positions(status="OPEN", limit=500)
     if open_df.empty:
         st.info("Aucune position ouverte.")
     else:
         # PnL latent live
-        latest_prices = {sym: fetch_last_price(exchange, sym) for sym in open_df["symbol"].unique()}
+        # un seul snapshot (fetch_tickers groupé + cache TTL) pour le MTM et le contrôle TP/SL
+        latest_prices = price_snapshot(exchange, open_df["symbol"].unique(),
+                                       ttl=float(CFG.get("app",{}).get("price_ttl", 5)))
         def _latent(row):
             last = latest_prices.get(row["symbol"], row["entry"])
             sign = 1 if row["side"]=="LONG" else -1
@@ -318,17 +229,11 @@ with tabs[1]:
 
         # Auto-close si TP/SL touché
         if st.button("🔍 Mettre à jour (TP/SL)"):
-            closed = 0
-            for _, r in open_df.iterrows():
-                px = latest_prices.get(r["symbol"], r["entry"])
-                if r["side"]=="LONG" and (px>=r["tp"] or px<=r["sl"]):
-                    pnl = close_position(int(r["id"]), px, note="AUTO_TP_SL")
-                    st.success(f"Position {int(r['id'])} clôturée. PnL ≈ {pnl:.2f}")
-                    closed += 1
-                if r["side"]=="SHORT" and (px<=r["tp"] or px>=r["sl"]):
-                    pnl = close_position(int(r["id"]), px, note="AUTO_TP_SL")
-                    st.success(f"Position {int(r['id'])} clôturée. PnL ≈ {pnl:.2f}")
-                    closed += 1
+            px = open_df["symbol"].map(latest_prices).fillna(open_df["entry"])
+            hit, at_sl = tp_sl_hits(open_df["side"]=="LONG", px, open_df["sl"].to_numpy(), open_df["tp"].to_numpy())
+            closed = close_positions(zip(open_df.loc[hit, "id"], px[hit], np.where(at_sl, "SL", "TP")[hit]), note="AUTO_TP_SL")
+            for pid, pnl in closed.items():
+                st.success(f"Position {pid} clôturée. PnL ≈ {pnl:.2f}")
             if closed: st.rerun()
 
         # Clôture manuelle
@@ -350,13 +255,27 @@ with tabs[1]:
 # --------- TAB 3: JOURNAL ----------
 with tabs[2]:
     st.subheader("Historique (clôturées)")
-    closed_df = list_positions(status="CLOSED", limit=1000)
-    if closed_df.empty:
+    # agrégats SQL (table pnl_summary) + pagination par clé : coût indépendant de la taille de l'historique
+    stats = pf_summary()
+    if not stats["trades"]:
         st.info("Aucun trade clôturé.")
     else:
-        st.dataframe(closed_df[["id","open_ts","close_ts","symbol","side","entry","exit_price","qty","pnl","note"]],
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("P&L réalisé (total)", f"{stats['pnl']:.2f} USD")
+        m2.metric("Win rate", f"{100*(stats['win_rate'] or 0):.1f} %")
+        m3.metric("R moyen", f"{stats['avg_r'] or 0:.2f}")
+        m4.metric("Max drawdown", f"{stats['max_drawdown']:.2f} USD")
+        st.line_chart(equity_curve()["equity"])
+        st.dataframe(pnl_by("symbol").round(4), use_container_width=True)
+        cursors = st.session_state.setdefault("journal_cursors", [None])
+        page, nxt = page_positions("CLOSED", before_id=cursors[-1], limit=50)
+        st.dataframe(page[["id","open_ts","close_ts","symbol","side","entry","exit_price","qty","pnl","note"]],
                      use_container_width=True)
-        st.metric("P&L réalisé (total)", f"{closed_df['pnl'].sum():.2f} USD")
+        p1, p2 = st.columns(2)
+        if len(cursors) > 1 and p1.button("← Plus récents"):
+            cursors.pop(); st.rerun()
+        if nxt is not None and p2.button("Plus anciens →"):
+            cursors.append(nxt); st.rerun()
 
 # --------- TAB 4: BACKTEST ----------
 with tabs[3]:
@@ -366,15 +285,42 @@ with tabs[3]:
     else:
         sym = st.selectbox("Symbole", symbols)
         if st.button("▶️ Lancer backtest"):
-            df = load_or_fetch(exchange, sym, "1d", limit=1500)
-            sigs = {k: fn(df) for k, fn in STRATS.items()}
-            w = ensemble_weights(df, sigs, window=300)
-            sig = blended_signal(sigs, w)
-            bt = backtest(df, sig, initial_cash=1.0, fee_bps=2.0, slippage_bps=1.0)
+            try:   # 3 ans de journalier, agrégés depuis la série de base (une seule série téléchargée par symbole)
+                df = resampled_history(exchange, sym, "1d", start=pd.Timestamp.now(tz="UTC") - pd.DateOffset(years=3))
+            except Exception:
+                df = load_or_fetch(exchange, sym, "1d", limit=1500)
+            def _run_bt(df):
+                sigs = {k: fn(df) for k, fn in STRATS.items()}
+                w = walk_forward_weights(df, sigs, window=300)   # poids walk-forward : pas de look-ahead
+                return backtest(df, blended_signal(sigs, w), initial_cash=1.0, fee_bps=2.0, slippage_bps=1.0)
+            # recalculé seulement si une nouvelle bougie est arrivée (ou si les stratégies changent)
+            key = pipeline_key(exchange, sym, "1d", df, STRATS, {"view": "backtest3y", "window": 300})
+            bt = PIPELINE_CACHE.get_or_compute(key, _run_bt, df)
             st.line_chart(pd.Series(bt["equity"], name="Equity (norm.)"))
-            st.write({
-                "Sharpe": round(sharpe(bt["pnl"]), 2),
-                "Sortino": round(sortino(bt["pnl"]), 2),
+            st.write({   # bougies journalières : annualisation sur 365 périodes
+                "Sharpe": round(sharpe(bt["pnl"], 365), 2),
+                "Sortino": round(sortino(bt["pnl"], 365), 2),
                 "MaxDD": round(max_drawdown(bt["equity"]), 3),
-                "Calmar": round(calmar(bt["equity"]), 2)
+                "Calmar": round(calmar(bt["equity"], 365), 2)
             })
+
+# --------- TAB 5: DIAGNOSTICS ----------
+with tabs[4]:
+    st.subheader("Temps par étape (depuis le démarrage ou la remise à zéro)")
+    snap = trace.snapshot()
+    if not snap["stages"]:
+        st.info("Aucune mesure pour l’instant : lance un scan.")
+    else:
+        st.dataframe(pd.DataFrame(snap["stages"]).T.round(2), use_container_width=True)
+        st.write("Par symbole (ms)")
+        st.dataframe(pd.DataFrame(snap["by_symbol"]).T.fillna(0.0).round(1), use_container_width=True)
+    st.write("Compteurs de cache", {**snap["counters"], **{f"pipeline_cache.{k}": v for k, v in PIPELINE_CACHE.stats().items()}})
+    d1, d2, d3 = st.columns(3)
+    d1.download_button("Export JSON", trace.export_json(), file_name="helios_trace.json", mime="application/json")
+    d2.download_button("Export Chrome trace", trace.export_chrome(), file_name="helios_chrome_trace.json",
+                       mime="application/json")
+    if d3.button("Remettre à zéro"):
+        trace.reset(); st.session_state.pop("profile_report", None); st.rerun()
+    if st.session_state.get("profile_report"):
+        with st.expander("cProfile du dernier scan profilé"):
+            st.code(st.session_state["profile_report"])
@@ -0,0 +1,92 @@
+"""Simulateur d'ordres bracket (SL/TP) vectorisé, fidèle à l'exécution réelle
+(niveaux ATR de levels_from_signal) plutôt qu'au PnL continu signal × rendement.
+
+Toutes les entrées de l'historique sont simulées en même temps : pour chaque trade on
+cherche la première bougie dont le high/low touche SL ou TP, par blocs de bougies
+(horizon croissant) sur les tableaux OHLC.
+"""
+import numpy as np, pandas as pd
+from ..data.features import feature
+
+TIE_RULES = ('sl', 'tp', 'nearest')
+_MAX_CELLS = 4_000_000      # taille max d'un bloc trades × bougies
+
+def entries_from_signal(sig: pd.Series) -> pd.Series:
+    """Direction (-1/+1) aux bougies où le signal devient non nul ou change de sens, 0 ailleurs."""
+    s = np.sign(sig.fillna(0.0)).astype(int)
+    return s.where((s != 0) & (s != s.shift(fill_value=0)), 0)
+
+def _scan(high, low, idx, sl, tp, long, start, width):
+    """Premier contact dans [idx+start, idx+start+width[ : (offset, touche_sl, touche_tp) ; offset=-1 si aucun."""
+    n = len(high)
+    off = np.full(len(idx), -1); hsl = np.zeros(len(idx), bool); htp = np.zeros(len(idx), bool)
+    step = max(1, _MAX_CELLS // width)
+    cols = np.arange(start, start + width)
+    for a in range(0, len(idx), step):
+        sl_ = slice(a, a + step)
+        J = idx[sl_, None] + cols[None, :]
+        valid = J < n; J = np.minimum(J, n - 1)
+        hi, lo = high[J], low[J]; lg = long[sl_, None]
+        s = np.where(lg, lo <= sl[sl_, None], hi >= sl[sl_, None]) & valid
+        t = np.where(lg, hi >= tp[sl_, None], lo <= tp[sl_, None]) & valid
+        hit = s | t
+        first = hit.argmax(axis=1); found = hit[np.arange(len(first)), first]
+        rows = np.arange(a, a + len(first))[found]; f = first[found]
+        off[rows] = start + f
+        hsl[rows] = s[found, f]; htp[rows] = t[found, f]
+    return off, hsl, htp
+
+def simulate_brackets(df: pd.DataFrame, entries, sl=None, tp=None, sl_mult: float = 2.5, tp_mult: float = 3.5,
+                      atr_len: int = 14, tie: str = 'sl', max_bars: int = None, block: int = 64) -> pd.DataFrame:
+    """Simule un trade par entrée non nulle de `entries` (direction par bougie, entrée à la clôture).
+    SL/TP : tableaux explicites, sinon entry ∓ sl_mult·ATR / entry ± tp_mult·ATR comme levels_from_signal.
+    tie : bougie qui touche SL et TP -> 'sl' (prudent), 'tp', ou 'nearest' (niveau le plus proche de l'open).
+    Une ouverture au-delà d'un niveau (gap) sort à l'open. max_bars : sortie à la clôture après N bougies.
+    Retourne une ligne par trade : entrée, sortie, bars_held, r_multiple."""
+    if tie not in TIE_RULES:
+        raise ValueError(f"tie doit être parmi {TIE_RULES}")
+    o, h, l, c = (df[k].to_numpy(dtype=float) for k in ('open', 'high', 'low', 'close'))
+    direction = np.asarray(entries, dtype=float)
+    idx = np.flatnonzero(np.nan_to_num(direction) != 0)
+    side = np.sign(direction[idx]); long = side > 0
+    entry = c[idx]
+    if sl is None or tp is None:
+        a = feature(df, 'atr', length=atr_len).to_numpy(dtype=float)[idx]
+    sl = entry - side*sl_mult*a if sl is None else np.asarray(sl, dtype=float)[idx]
+    tp = entry + side*tp_mult*a if tp is None else np.asarray(tp, dtype=float)[idx]
+    n, m = len(df), len(idx)
+    horizon = (n - 1 - idx) if max_bars is None else np.minimum(n - 1 - idx, int(max_bars))
+
+    off = np.full(m, -1); hsl = np.zeros(m, bool); htp = np.zeros(m, bool)
+    todo = np.flatnonzero(horizon > 0); start, width = 1, max(1, int(block))
+    while len(todo):
+        f, s, t = _scan(h, l, idx[todo], sl[todo], tp[todo], long[todo], start, width)
+        f = np.where(f > horizon[todo], -1, f)
+        hit = f >= 0
+        off[todo[hit]] = f[hit]; hsl[todo[hit]] = s[hit]; htp[todo[hit]] = t[hit]
+        start += width; width *= 2
+        todo = todo[~hit]; todo = todo[horizon[todo] >= start]
+
+    exit_i = np.where(off >= 0, idx + np.maximum(off, 0), idx + horizon)
+    op = o[exit_i]
+    gap_sl = np.where(long, op <= sl, op >= sl) & hsl
+    gap_tp = np.where(long, op >= tp, op <= tp) & htp
+    both = hsl & htp & ~gap_sl & ~gap_tp
+    if tie == 'sl':
+        take_tp = htp & ~hsl
+    elif tie == 'tp':
+        take_tp = htp & ~gap_sl
+    else:
+        take_tp = (htp & ~hsl) | (both & (np.abs(op - tp) < np.abs(op - sl)))
+    take_tp |= gap_tp & ~gap_sl
+    take_sl = hsl & ~take_tp
+    exit_px = np.where(take_tp, np.where(gap_tp, op, tp), np.where(take_sl, np.where(gap_sl, op, sl), c[exit_i]))
+    timed_out = (horizon == int(max_bars)) if max_bars is not None else np.zeros(m, bool)
+    outcome = np.where(take_tp, 'tp', np.where(take_sl, 'sl', np.where(timed_out, 'timeout', 'open')))
+    risk = np.abs(entry - sl)
+    return pd.DataFrame({
+        'entry_time': df.index[idx], 'exit_time': df.index[exit_i],
+        'side': np.where(long, 'LONG', 'SHORT'), 'entry': entry, 'sl': sl, 'tp': tp,
+        'exit': exit_px, 'outcome': outcome, 'bars_held': exit_i - idx,
+        'r_multiple': np.where(risk > 0, side*(exit_px - entry) / np.where(risk > 0, risk, 1.0), 0.0),
+    })
@@ -0,0 +1,43 @@
+"""Moteur de backtest vectorisé multi-actifs.
+
+Une matrice de prix (temps × actifs) et une matrice de positions de même forme (ou avec
+des axes supplémentaires, ex. temps × actifs × stratégies) : la position décidée à la
+clôture de t est tenue sur t+1, frais + slippage payés sur chaque variation de position.
+"""
+import numpy as np, pandas as pd
+from .metrics import summary, PERIODS_PER_YEAR
+
+def run(prices, positions, fee_bps: float = 2.0, slippage_bps: float = 1.0, initial_cash: float = 1.0) -> dict:
+    """Version tableau : renvoie ret, pos, pnl, equity (np.ndarray, axe 0 = temps)."""
+    P = np.asarray(prices, dtype=float); X = np.asarray(positions, dtype=float)
+    if P.ndim == 1 and X.ndim > 1:
+        P = P[:, None]
+    P = P.reshape(P.shape + (1,)*(X.ndim - P.ndim))
+    ret = np.zeros(P.shape); ret[1:] = P[1:] / P[:-1] - 1
+    ret = np.nan_to_num(ret, nan=0.0, posinf=0.0, neginf=0.0)
+    pos = np.zeros(np.broadcast_shapes(P.shape, X.shape)); pos[1:] = np.clip(X[:-1], -1, 1)
+    pos = np.nan_to_num(pos, nan=0.0)
+    cost = np.zeros_like(pos); cost[1:] = np.abs(np.diff(pos, axis=0))
+    pnl = pos * ret - cost * ((fee_bps + slippage_bps) / 10000.0)
+    return {'ret': ret, 'pos': pos, 'pnl': pnl, 'equity': initial_cash * np.cumprod(1 + pnl, axis=0)}
+
+def backtest_matrix(prices, positions, fee_bps: float = 2.0, slippage_bps: float = 1.0,
+                    initial_cash: float = 1.0, periods_per_year: float = PERIODS_PER_YEAR) -> dict:
+    """PnL, equity et métriques (Sharpe, Sortino, Calmar, MaxDD, hit) en un seul appel.
+    Si prices/positions sont des DataFrames, pnl/equity gardent leurs index et colonnes."""
+    res = run(prices, positions, fee_bps, slippage_bps, initial_cash)
+    labels = positions if isinstance(positions, pd.DataFrame) else prices if isinstance(prices, pd.DataFrame) else None
+    if labels is not None and res['pnl'].ndim == 2 and res['pnl'].shape == labels.shape:
+        for k in ('pnl', 'equity'):
+            res[k] = pd.DataFrame(res[k], index=labels.index, columns=labels.columns)
+    res['metrics'] = summary(res['pnl'], res['equity'], periods_per_year)
+    return res
+
+def compute(df: pd.DataFrame, sig: pd.Series, fee_bps: float = 2.0, slippage_bps: float = 1.0):
+    """Un actif : renvoie (ret, pos, pnl, equity) en Series alignées sur df."""
+    res = run(df['close'], sig.reindex(df.index), fee_bps, slippage_bps)
+    return tuple(pd.Series(res[k], index=df.index, name=k) for k in ('ret', 'pos', 'pnl', 'equity'))
+
+def backtest(df: pd.DataFrame, sig: pd.Series, initial_cash: float = 1.0, fee_bps: float = 2.0, slippage_bps: float = 1.0) -> dict:
+    ret, pos, pnl, equity = compute(df, sig, fee_bps, slippage_bps)
+    return {'ret': ret, 'pos': pos, 'pnl': pnl, 'equity': initial_cash * equity}
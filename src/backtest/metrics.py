@@ -0,0 +1,49 @@
+"""Métriques de performance. Acceptent une Series ou un tableau (temps × actifs × ...) :
+le calcul se fait le long de l'axe temps, renvoie un float ou un tableau."""
+import numpy as np
+
+PERIODS_PER_YEAR = 365*24     # bougies 1h par défaut, comme research.backtest.metrics
+
+def _arr(x):
+    return x.to_numpy(dtype=float) if hasattr(x, 'to_numpy') else np.asarray(x, dtype=float)
+
+def _out(v):
+    return float(v) if np.ndim(v) == 0 else v
+
+def sharpe(pnl, periods_per_year: float = PERIODS_PER_YEAR):
+    x = _arr(pnl)
+    if len(x) < 2:
+        return _out(np.zeros(x.shape[1:]))
+    m = np.nanmean(x, axis=0); s = np.nanstd(x, axis=0, ddof=1)
+    return _out(np.where(s > 0, m / np.where(s > 0, s, 1.0) * np.sqrt(periods_per_year), 0.0))
+
+def sortino(pnl, periods_per_year: float = PERIODS_PER_YEAR):
+    x = _arr(pnl)
+    if len(x) < 2:
+        return _out(np.zeros(x.shape[1:]))
+    m = np.nanmean(x, axis=0); down = np.sqrt(np.nanmean(np.minimum(x, 0.0)**2, axis=0))
+    return _out(np.where(down > 0, m / np.where(down > 0, down, 1.0) * np.sqrt(periods_per_year), 0.0))
+
+def max_drawdown(equity):
+    """Pire repli depuis un plus haut (négatif, ex. -0.35)."""
+    x = _arr(equity)
+    if len(x) == 0:
+        return _out(np.zeros(x.shape[1:]))
+    return _out(np.nanmin(x / np.fmax.accumulate(x, axis=0) - 1, axis=0))
+
+def calmar(equity, periods_per_year: float = PERIODS_PER_YEAR):
+    """Rendement annualisé / |MaxDD|."""
+    x = _arr(equity)
+    if len(x) < 2:
+        return _out(np.zeros(x.shape[1:]))
+    ann = (x[-1] / x[0]) ** (periods_per_year / (len(x) - 1)) - 1
+    dd = np.abs(_arr(max_drawdown(x)))
+    return _out(np.where(dd > 0, ann / np.where(dd > 0, dd, 1.0), 0.0))
+
+def hit_rate(pnl):
+    x = _arr(pnl)
+    return _out((x > 0).mean(axis=0) if len(x) else np.zeros(x.shape[1:]))
+
+def summary(pnl, equity, periods_per_year: float = PERIODS_PER_YEAR) -> dict:
+    return {'sharpe': sharpe(pnl, periods_per_year), 'sortino': sortino(pnl, periods_per_year),
+            'calmar': calmar(equity, periods_per_year), 'maxdd': max_drawdown(equity), 'hit': hit_rate(pnl)}
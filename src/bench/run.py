@@ -0,0 +1,202 @@
+"""Suite de benchmarks hors ligne : stratégies, ensemble, régime, backtest, niveaux et scan
+complet sur OHLCV synthétique (voir synthetic.py).
+
+    python -m src.bench.run                                  # 1k 10k 100k 1M, comparé à baseline.json
+    python -m src.bench.run --sizes 1k 10k --only strategy   # sous-ensemble (préfixe de nom)
+    python -m src.bench.run --save                           # enregistre la référence
+
+Pour chaque cas : un appel de chauffe non chronométré (compilation numba, imports), puis
+meilleur temps sur `reps` répétitions (cache de features vidé avant chacune), débit en
+bougies/s et pic mémoire Python+NumPy (tracemalloc, passe séparée).
+
+baseline.json (versionné) est la référence de la machine de dev. La comparaison n'a lieu que
+si l'environnement (versions, machine, nb de CPU) est celui de la référence : ailleurs (CI,
+autre poste), lancer d'abord --save.
+"""
+import os, sys, json, time, platform, argparse, tempfile, tracemalloc
+from collections import OrderedDict
+import numpy as np, pandas as pd
+from .synthetic import synthetic_ohlcv, parse_size
+from ..data import features
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+CASES = OrderedDict()    # nom -> (préparation(df) -> callable, taille max ou None)
+
+def case(name: str, max_n: int = None):
+    """Décorateur : la fonction reçoit le DataFrame et renvoie l'appel à chronométrer."""
+    def deco(fn):
+        CASES[name] = (fn, max_n)
+        return fn
+    return deco
+
+def _signals(df):
+    from ..strategies import ALL
+    return {k: fn(df) for k, fn in ALL.items()}
+
+def _strategy_case(name):
+    def prep(df):
+        from ..strategies.registry import get
+        fn = get(name); fn.load()
+        return lambda: fn(df)
+    return prep
+
+def _strategy_cases() -> OrderedDict:
+    from ..strategies.registry import names
+    return OrderedDict((f"strategy/{n}", (_strategy_case(n), None)) for n in names())
+
+@case("ensemble/ensemble_weights")
+def _(df):
+    from ..research.ensemble import ensemble_weights
+    sigs = _signals(df)
+    return lambda: ensemble_weights(df, sigs)
+
+@case("ensemble/blended_signal")
+def _(df):
+    from ..research.ensemble import ensemble_weights, blended_signal
+    sigs = _signals(df); w = ensemble_weights(df, sigs)
+    return lambda: blended_signal(sigs, w)
+
+@case("ensemble/walk_forward_weights")
+def _(df):
+    from ..research.ensemble import walk_forward_weights
+    sigs = _signals(df)
+    return lambda: walk_forward_weights(df, sigs)
+
+@case("regime/kmeans_regime")
+def _(df):
+    from ..research.regime import kmeans_regime
+    kmeans_regime(df.iloc[:1000])   # import sklearn hors chrono
+    return lambda: kmeans_regime(df)
+
+@case("backtest/research.backtest+metrics")
+def _(df):
+    from ..research.backtest import backtest, metrics
+    sig = np.sign(_signals(df)["EMA Trend"])
+    return lambda: metrics(backtest(df, sig))
+
+@case("backtest/engine.backtest")
+def _(df):
+    from ..backtest.engine import backtest
+    sig = np.sign(_signals(df)["EMA Trend"])
+    return lambda: backtest(df, sig)
+
+@case("risk/levels+position_size")
+def _(df):
+    from ..risk.levels import levels_from_signal, position_size
+    def call():
+        lvl = levels_from_signal(df, 1)
+        return position_size(1000.0, lvl["entry"], lvl["sl"], 1.0)
+    return call
+
+@case("scan/end_to_end(4 symboles)", max_n=100_000)
+def _(df):
+    from ..research import scan as S, regime
+    regime.REGIME_DIR = tempfile.mkdtemp(prefix="helios-bench-")   # modèles de régime jetables
+    frames = {f"SYN{i}/USDT": df if i == 0 else synthetic_ohlcv(len(df), seed=i) for i in range(4)}
+    def call():
+        regime._MODELS.clear()
+        return list(S.scan("bench", list(frames), "1h", limit=len(df), cpu_workers=1, cache=False,
+                           loader=lambda ex, s, tf, limit=None: frames[s], min_rr=1.0))
+    return call
+
+def measure(prep, df, reps: int = 3, memory: bool = True) -> dict:
+    call = prep(df); best = float("inf")
+    features.clear(); call()   # chauffe : JIT numba et imports hors chrono
+    for _ in range(max(1, reps)):
+        features.clear()
+        t0 = time.perf_counter(); call(); best = min(best, time.perf_counter() - t0)
+    peak = None
+    if memory:
+        features.clear(); tracemalloc.start()
+        try:
+            call(); peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return {"seconds": best, "bars_per_s": len(df) / best if best > 0 else float("inf"), "peak_mb": peak}
+
+def run_suite(sizes=("1k", "10k", "100k", "1M"), only=None, reps: int = 3, memory: bool = True, seed: int = 0,
+              echo=None) -> dict:
+    """{'case@taille': mesures}. Les cas dont max_n est dépassé sont ignorés.
+    echo(clé, mesures) est appelé après chaque cas (affichage au fil de l'eau)."""
+    cases = _strategy_cases(); cases.update(CASES)
+    results = OrderedDict()
+    for size in sizes:
+        n = parse_size(size); df = synthetic_ohlcv(n, seed=seed)
+        for name, (prep, max_n) in cases.items():
+            if only and not any(name.startswith(o) for o in only):
+                continue
+            if max_n is not None and n > max_n:
+                continue
+            r = measure(prep, df, reps=reps if n < 1_000_000 else 1, memory=memory)
+            results[f"{name}@{size}"] = r
+            if echo: echo(f"{name}@{size}", r)
+    return results
+
+def _line(key, r, base=None, tol=0.25):
+    s = f"{key:<46} {1000*r['seconds']:>10.2f} ms {r['bars_per_s']/1e6:>9.3f} Mbar/s"
+    s += f" {r['peak_mb']:>9.1f} MB" if r.get("peak_mb") is not None else " " * 13
+    if base:
+        ratio = r["seconds"] / base["seconds"] if base["seconds"] > 0 else float("nan")
+        s += f"  x{ratio:5.2f}" + ("  REGRESSION" if ratio > 1 + tol else "")
+    return s
+
+def compare(results: dict, baseline: dict, tol: float = 0.25) -> list:
+    """Cas plus lents que la référence de plus de `tol` (en relatif) : [(clé, ratio)]."""
+    ref = baseline.get("results", {}); out = []
+    for k, r in results.items():
+        if k in ref and ref[k]["seconds"] > 0 and r["seconds"] / ref[k]["seconds"] > 1 + tol:
+            out.append((k, r["seconds"] / ref[k]["seconds"]))
+    return out
+
+def environment() -> dict:
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "processor": platform.processor(), "cpus": os.cpu_count()}
+
+def env_diff(baseline: dict, env: dict = None) -> dict:
+    """Champs d'environnement qui diffèrent de la référence : {champ: (référence, ici)}."""
+    env = env or environment(); ref = baseline.get("environment", {})
+    return {k: (ref.get(k), v) for k, v in env.items() if ref.get(k) != v}
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmarks hors ligne (OHLCV synthétique)")
+    p.add_argument("--sizes", nargs="+", default=["1k", "10k", "100k", "1M"])
+    p.add_argument("--only", nargs="+", help="préfixes de cas (ex. strategy ensemble scan)")
+    p.add_argument("--reps", type=int, default=3)
+    p.add_argument("--no-memory", action="store_true", help="pas de passe tracemalloc")
+    p.add_argument("--baseline", default=BASELINE)
+    p.add_argument("--save", action="store_true", help="écrit les résultats comme nouvelle référence")
+    p.add_argument("--tol", type=float, default=0.25, help="ralentissement toléré (0.25 = +25 %%)")
+    p.add_argument("--json", help="écrit les résultats dans ce fichier")
+    p.add_argument("--fail", action="store_true", help="code de sortie 1 en cas de régression")
+    a = p.parse_args(argv)
+
+    try:
+        with open(a.baseline) as f: baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+    ref = baseline.get("results", {})
+    diff = env_diff(baseline) if ref else {}
+    if diff:   # temps d'une autre machine : pas de comparaison (ni de --fail)
+        print("référence mesurée sur un autre environnement, pas de comparaison : "
+              + ", ".join(f"{k} {r} -> {v}" for k, (r, v) in diff.items()) + " (lancer --save ici)")
+        ref = {}
+    elif not ref:
+        print(f"aucune référence dans {a.baseline} : lancer d'abord avec --save (pas de comparaison)")
+    print(f"{'cas@taille':<46} {'temps':>13} {'débit':>16} {'pic mém.':>12}" + ("  vs réf." if ref else ""))
+    results = run_suite(a.sizes, a.only, a.reps, not a.no_memory,
+                        echo=lambda k, r: print(_line(k, r, ref.get(k), a.tol), flush=True))
+    out = {"environment": environment(), "results": results}
+    if a.json:
+        with open(a.json, "w") as f: json.dump(out, f, indent=1)
+    if a.save:
+        merged = dict(ref); merged.update(results)
+        with open(a.baseline, "w") as f: json.dump({"environment": environment(), "results": merged}, f, indent=1)
+        print(f"référence écrite : {a.baseline}")
+    slow = compare(results, {"results": ref}, a.tol) if ref else []
+    if slow:
+        print(f"{len(slow)} régression(s) au-delà de +{a.tol:.0%}")
+    if a.fail and slow:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
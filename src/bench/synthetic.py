@@ -0,0 +1,53 @@
+"""OHLCV synthétique reproductible pour les benchmarks (aucun accès exchange).
+
+Marche aléatoire log-normale dont la volatilité et la dérive suivent une chaîne de Markov
+à 3 régimes (calme / normal / agité), avec mèches et volume corrélés à la volatilité.
+"""
+import numpy as np
+import pandas as pd
+from ..data.resample import timeframe_index
+
+# (vol par bougie, dérive par bougie) des régimes, et matrice de transition (lignes = départ)
+REGIMES = np.array([[0.004, 0.0002], [0.010, 0.0], [0.025, -0.0004]])
+TRANSITIONS = np.array([[0.995, 0.004, 0.001],
+                        [0.003, 0.994, 0.003],
+                        [0.002, 0.008, 0.990]])
+
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1M': 1_000_000}
+
+def regime_path(n: int, rng: np.random.Generator, start: int = 1) -> np.ndarray:
+    """Suite des régimes (0, 1, 2) tirée de TRANSITIONS, tirée par segments : durée
+    géométrique (1 - p_reste) puis régime suivant selon les transitions hors diagonale."""
+    out = np.empty(n, dtype=np.int8); i = 0; s = start
+    while i < n:
+        stay = TRANSITIONS[s, s]
+        d = int(rng.geometric(1.0 - stay))
+        out[i:i+d] = s; i += d
+        p = TRANSITIONS[s].copy(); p[s] = 0.0
+        s = int(rng.choice(len(p), p=p / p.sum()))
+    return out
+
+def synthetic_ohlcv(n: int, seed: int = 0, timeframe: str = '1h', start: str = '2020-01-01',
+                    price: float = 100.0) -> pd.DataFrame:
+    """DataFrame OHLCV de `n` bougies (index UTC, mêmes colonnes que le loader)."""
+    rng = np.random.default_rng(seed)
+    reg = regime_path(n, rng)
+    vol, drift = REGIMES[reg, 0], REGIMES[reg, 1]
+    close = price * np.exp(np.cumsum(drift + vol * rng.standard_normal(n)))
+    open_ = np.r_[price, close[:-1]] * (1 + 0.1 * vol * rng.standard_normal(n))
+    wick = np.abs(rng.standard_normal((2, n))) * vol * 0.5
+    high = np.maximum(open_, close) * (1 + wick[0]); low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.lognormal(3.0, 0.5, n) * (vol / REGIMES[1, 0])
+    idx = timeframe_index(start, n, timeframe)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume}, index=idx)
+
+def parse_size(s) -> int:
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500. Seuls k/K et M sont des suffixes :
+    '5m' (une durée, pas une taille) est refusé."""
+    if isinstance(s, int):
+        return s
+    s = str(s); mult = {'k': 1e3, 'K': 1e3, 'M': 1e6}.get(s[-1], 1)
+    try:
+        return SIZES.get(s) or int(float(s[:-1] if mult != 1 else s) * mult)
+    except ValueError:
+        raise ValueError(f"taille invalide: {s!r} (ex. 2500, 10k, 1M)") from None
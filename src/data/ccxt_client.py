@@ -1,10 +1,68 @@
-import ccxt, os
+import os, json, time, threading
 from dotenv import load_dotenv
 load_dotenv()
-def build_exchange(name: str):
+from ..tracing import span, count
+
+MARKETS_DIR = os.path.join('app_cache', 'markets')
+MARKETS_TTL = float(os.getenv('MARKETS_TTL', 6*3600))   # secondes
+
+_POOL = {}                 # (exchange, api_key) -> instance ccxt partagée
+_POOL_LOCK = threading.Lock()
+
+def _credentials():
+    return os.getenv('API_KEY',''), os.getenv('API_SECRET',''), os.getenv('PASSWORD','')
+
+def _load_markets(ex, name: str):
+    """Charge les marchés depuis le cache disque s'il est frais, sinon via l'API (puis l'écrit)."""
+    path = os.path.join(MARKETS_DIR, f"{name}.json")
+    try:
+        if time.time() - os.path.getmtime(path) < MARKETS_TTL:
+            with open(path) as f: cached = json.load(f)
+            with span('exchange.markets_from_disk'):
+                ex.set_markets(cached['markets'], cached.get('currencies'))
+            count('markets_cache.hit')
+            return
+    except (OSError, ValueError, KeyError):
+        pass
+    count('markets_cache.miss')
+    with span('exchange.load_markets'):
+        ex.load_markets()
+    try:
+        os.makedirs(MARKETS_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f: json.dump({'markets': ex.markets, 'currencies': ex.currencies}, f, default=str)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+def _new_exchange(name: str, api_key: str, api_secret: str, password: str):
+    import ccxt   # import lourd (~0.4 s) : seulement quand un client est réellement créé
     ex_class = getattr(ccxt, name.lower())
     params = {'enableRateLimit': True, 'options': {'adjustForTimeDifference': True}}
-    api_key=os.getenv('API_KEY',''); api_secret=os.getenv('API_SECRET',''); password=os.getenv('PASSWORD','')
     if api_key and api_secret: params.update({'apiKey': api_key, 'secret': api_secret})
     if password: params['password']=password
-    ex = ex_class(params); ex.load_markets(); return ex
+    ex = ex_class(params)
+    # une seule file de rate-limit par client, partagée par tous les threads
+    throttle, lock = ex.throttle, threading.Lock()
+    def _throttle(*a, **k):
+        with lock: return throttle(*a, **k)
+    ex.throttle = _throttle
+    _load_markets(ex, name.lower())
+    return ex
+
+def build_exchange(name: str):
+    """Client ccxt du pool (un par exchange et jeu d'identifiants) : session HTTP, marchés
+    et rate-limit sont réutilisés d'un appel à l'autre."""
+    api_key, api_secret, password = _credentials()
+    key = (name.lower(), api_key)
+    ex = _POOL.get(key)
+    if ex is None:
+        with _POOL_LOCK:
+            ex = _POOL.get(key)
+            if ex is None:
+                with span('exchange.build'):
+                    ex = _POOL[key] = _new_exchange(name, api_key, api_secret, password)
+    return ex
+
+def reset_pool():
+    with _POOL_LOCK: _POOL.clear()
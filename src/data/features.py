@@ -0,0 +1,99 @@
+"""Cache d'indicateurs partagé entre stratégies et risque.
+
+Chaque DataFrame OHLCV a son propre magasin de features, identifié par l'objet lui-même
+(via weakref) et sa dernière bougie : un même EMA/ATR/rolling n'est calculé qu'une fois
+par symbole/timeframe, puis servi à toutes les stratégies qui le demandent.
+"""
+import threading, weakref
+from collections import OrderedDict
+import pandas as pd
+from ..tracing import count
+
+MAX_FRAMES = 64          # nb max de DataFrames suivis (LRU)
+MAX_FEATURES = 256       # nb max de features par DataFrame
+
+_FEATURES = {}           # nom -> fonction(df, **params) -> pd.Series
+_STORE = OrderedDict()   # id(df) -> (weakref(df), clé dernière bougie, OrderedDict features)
+_LOCK = threading.RLock()
+
+def register(name: str):
+    """Décorateur : enregistre une feature calculable par feature(df, name, **params)."""
+    def deco(fn):
+        _FEATURES[name] = fn
+        return fn
+    return deco
+
+def _last_bar(df: pd.DataFrame):
+    if len(df) == 0:
+        return (0, None, None)
+    return (len(df), df.index[-1], float(df['close'].iloc[-1]) if 'close' in df else None)
+
+def _drop(frame_id: int):
+    with _LOCK:
+        _STORE.pop(frame_id, None)
+
+def _frame_store(df: pd.DataFrame) -> OrderedDict:
+    fid = id(df); last = _last_bar(df)
+    entry = _STORE.get(fid)
+    if entry is not None and entry[0]() is df and entry[1] == last:
+        _STORE.move_to_end(fid)
+        return entry[2]
+    feats = OrderedDict()
+    if entry is None or entry[0]() is not df:
+        weakref.finalize(df, _drop, fid)
+    _STORE[fid] = (weakref.ref(df), last, feats)
+    while len(_STORE) > MAX_FRAMES:
+        _STORE.popitem(last=False)
+    return feats
+
+def feature(df: pd.DataFrame, name: str, **params) -> pd.Series:
+    """Renvoie la feature `name` de df, calculée une seule fois pour ces paramètres.
+    Le résultat est partagé : ne pas le modifier en place."""
+    if name not in _FEATURES:
+        raise KeyError(f"feature inconnue: {name}")
+    key = (name, tuple(sorted(params.items())))
+    with _LOCK:
+        feats = _frame_store(df)
+        if key in feats:
+            feats.move_to_end(key); count('features.hit')
+            return feats[key]
+        count('features.miss')
+        out = _FEATURES[name](df, **params)
+        feats[key] = out
+        while len(feats) > MAX_FEATURES:
+            feats.popitem(last=False)
+        return out
+
+def clear():
+    with _LOCK:
+        _STORE.clear()
+
+# ---------- Features de base ----------
+@register('ema')
+def _ema(df, span: int, col: str = 'close'):
+    return df[col].ewm(span=span, adjust=False).mean()
+
+@register('sma')
+def _sma(df, window: int, col: str = 'close'):
+    return df[col].rolling(window).mean()
+
+@register('rolling_std')
+def _rolling_std(df, window: int, col: str = 'close'):
+    return df[col].rolling(window).std()
+
+@register('rolling_max')
+def _rolling_max(df, window: int, col: str = 'high'):
+    return df[col].rolling(window).max()
+
+@register('rolling_min')
+def _rolling_min(df, window: int, col: str = 'low'):
+    return df[col].rolling(window).min()
+
+@register('true_range')
+def _true_range(df):
+    hl = df['high'] - df['low']; hc = (df['high'] - df['close'].shift()).abs(); lc = (df['low'] - df['close'].shift()).abs()
+    return pd.concat([hl,hc,lc], axis=1).max(axis=1)
+
+@register('atr')
+def _atr(df, length: int = 14):
+    return feature(df, 'true_range').ewm(span=length, adjust=False).mean()
@@ -1,7 +1,10 @@
-import pandas as pd, os
+import pandas as pd, os, glob, time, json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .ccxt_client import build_exchange
+from ..tracing import span, traced, count
 
 FALLBACK_EXCHANGES = ['okx','bybit','kraken','coinbase','kucoin']
+_TF_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'M': 2592000}
 
 def _map_symbol(exchange_id: str, symbol: str) -> str:
     if exchange_id=='kraken' and symbol.startswith('BTC/'):
@@ -10,31 +13,211 @@ def _map_symbol(exchange_id: str, symbol: str) -> str:
         symbol = symbol.replace('/USDT','/USDC')
     return symbol
 
-def fetch_ohlcv(exchange_name: str, symbol: str, timeframe: str = '1h', limit: int = 2500):
+def timeframe_seconds(timeframe: str) -> int:
+    return int(timeframe[:-1]) * _TF_UNITS[timeframe[-1]]
+
+@traced('data.fetch_ohlcv')
+def fetch_ohlcv(exchange_name: str, symbol: str, timeframe: str = '1h', limit: int = 2500, since: int = None):
     ex = build_exchange(exchange_name)
     sym = _map_symbol(exchange_name, symbol)
     if sym not in ex.markets: raise ValueError(f"{exchange_name}: symbole indisponible: {sym}")
-    data = ex.fetch_ohlcv(sym, timeframe=timeframe, limit=limit)
+    data = ex.fetch_ohlcv(sym, timeframe=timeframe, since=since, limit=limit)
     df = pd.DataFrame(data, columns=['ts','open','high','low','close','volume'])
     df['ts'] = pd.to_datetime(df['ts'], unit='ms', utc=True)
     df.set_index('ts', inplace=True)
     return df
 
+@traced('data.fetch_since')
+def _fetch_since(exchange_name: str, symbol: str, timeframe: str, since: pd.Timestamp, page: int = 1000, max_pages: int = 50):
+    """Récupère toutes les bougies à partir de `since` (incluse), page par page jusqu'à la bougie courante."""
+    step = timeframe_seconds(timeframe) * 1000
+    since_ms = int(since.timestamp() * 1000); frames = []
+    for _ in range(max_pages):
+        df = fetch_ohlcv(exchange_name, symbol, timeframe, limit=page, since=since_ms)
+        if df.empty: break
+        frames.append(df)
+        last_ms = int(df.index[-1].timestamp() * 1000)
+        if last_ms < since_ms or last_ms + step > time.time() * 1000: break
+        since_ms = last_ms + step
+    if not frames:
+        return pd.DataFrame(columns=['open','high','low','close','volume'])
+    out = pd.concat(frames)
+    return out[~out.index.duplicated(keep='last')].sort_index()
+
+# ---------- Cache parquet partitionné (append-only) ----------
+def _cache_path(cache_dir: str, ex_id: str, symbol: str, timeframe: str) -> str:
+    return os.path.join(cache_dir, f"{ex_id}_{symbol.replace('/','-')}_{timeframe}")
+
+def _partition_keys(index: pd.DatetimeIndex, timeframe: str):
+    # une partition par mois en intraday, par an au-delà
+    return index.strftime('%Y' if timeframe_seconds(timeframe) >= 86400 else '%Y-%m')
+
+@traced('data.parquet_write')
+def _write_cache(path: str, new: pd.DataFrame, timeframe: str):
+    """Fusionne `new` dans les seules partitions qu'il touche (la dernière bougie écrase l'ancienne)."""
+    os.makedirs(path, exist_ok=True)
+    for key, chunk in new.groupby(_partition_keys(new.index, timeframe)):
+        f = os.path.join(path, f"{key}.parquet")
+        if os.path.exists(f):
+            chunk = pd.concat([pd.read_parquet(f), chunk])
+            chunk = chunk[~chunk.index.duplicated(keep='last')].sort_index()
+        tmp = f"{f}.{os.getpid()}.tmp"
+        chunk.to_parquet(tmp); os.replace(tmp, f)
+
+@traced('data.parquet_read')
+def _read_cache(path: str, limit: int = None):
+    """Lit les partitions les plus récentes jusqu'à avoir `limit` bougies (tout si None)."""
+    parts, n = [], 0
+    for f in sorted(glob.glob(os.path.join(path, '*.parquet')), reverse=True):
+        p = pd.read_parquet(f); parts.append(p); n += len(p)
+        if limit and n >= limit: break
+    if not parts:
+        return None
+    df = pd.concat(parts[::-1]).sort_index()
+    return df.iloc[-limit:] if limit else df
+
+def _migrate_legacy(path: str, timeframe: str):
+    legacy = f"{path}.parquet"   # ancien format : un seul fichier par série
+    if os.path.exists(legacy) and not os.path.isdir(path):
+        _write_cache(path, pd.read_parquet(legacy), timeframe)
+        os.remove(legacy)
+
+def update_cache(ex_id: str, symbol: str, timeframe: str, cache_dir='app_cache', limit=2500):
+    """Met le cache à jour : historique complet (limit) s'il est vide, sinon seulement les
+    bougies depuis la dernière en cache (re-téléchargée, elle pouvait être en formation)."""
+    path = _cache_path(cache_dir, ex_id, symbol, timeframe)
+    _migrate_legacy(path, timeframe)
+    last = _read_cache(path, limit=1)
+    if last is None or last.empty:
+        new = fetch_ohlcv(ex_id, symbol, timeframe, limit)
+    else:
+        new = _fetch_since(ex_id, symbol, timeframe, since=last.index[-1])
+    if len(new):
+        _write_cache(path, new, timeframe)
+    return path
+
 def load_or_fetch(exchange: str, symbol: str, timeframe: str, cache_dir='app_cache', limit=2500, refresh=False):
+    with span('data.load_or_fetch', symbol=symbol):
+        return _load_or_fetch(exchange, symbol, timeframe, cache_dir, limit, refresh)
+
+def _load_or_fetch(exchange, symbol, timeframe, cache_dir, limit, refresh):
+    """Dernières `limit` bougies depuis le cache, complété de façon incrémentale quand une
+    nouvelle bougie a clôturé (ou toujours si refresh=True)."""
     os.makedirs(cache_dir, exist_ok=True)
     try_order = [exchange] + [e for e in FALLBACK_EXCHANGES if e!=exchange]
     last_err=None
     for ex_id in try_order:
-        path = os.path.join(cache_dir, f"{ex_id}_{symbol.replace('/','-')}_{timeframe}.parquet")
-        if os.path.exists(path) and not refresh:
-            return pd.read_parquet(path)
+        path = _cache_path(cache_dir, ex_id, symbol, timeframe)
+        _migrate_legacy(path, timeframe)
+        cached = _read_cache(path, limit)
+        if cached is not None and not cached.empty:
+            next_close = cached.index[-1] + pd.Timedelta(seconds=timeframe_seconds(timeframe))
+            count('ohlcv_cache.stale' if refresh or pd.Timestamp.now(tz='UTC') >= next_close else 'ohlcv_cache.fresh')
+            if refresh or pd.Timestamp.now(tz='UTC') >= next_close:
+                try:
+                    update_cache(ex_id, symbol, timeframe, cache_dir, limit)
+                    cached = _read_cache(path, limit)
+                except Exception as e:
+                    last_err = e   # réseau indisponible : on sert le cache tel quel
+            return cached
         try:
-            df = fetch_ohlcv(ex_id, symbol, timeframe, limit)
-            df.to_parquet(path); return df
+            update_cache(ex_id, symbol, timeframe, cache_dir, limit)
+            df = _read_cache(path, limit)
+            if df is not None: return df
+            last_err = ValueError(f"{ex_id}: aucune bougie pour {symbol}")
         except Exception as e:
             last_err = e; continue
     raise RuntimeError(f"Aucun exchange disponible: {last_err}")
 
+# ---------- Backfill profond (pagination parallèle, reprise sur checkpoint) ----------
+def _fetch_window(exchange_name: str, symbol: str, timeframe: str, start_ms: int, end_ms: int, page: int):
+    """Toutes les bougies de [start_ms, end_ms[, en enchaînant les pages si l'exchange en renvoie moins que `page`."""
+    step = timeframe_seconds(timeframe) * 1000
+    frames, since = [], start_ms
+    while since < end_ms:
+        df = fetch_ohlcv(exchange_name, symbol, timeframe, limit=page, since=since)
+        if df.empty: break
+        frames.append(df)
+        last_ms = int(df.index[-1].timestamp() * 1000)
+        if last_ms < since: break
+        since = last_ms + step
+    if not frames:
+        return pd.DataFrame(columns=['open','high','low','close','volume'])
+    out = pd.concat(frames)
+    return out[(out.index >= pd.Timestamp(start_ms, unit='ms', tz='UTC')) & (out.index < pd.Timestamp(end_ms, unit='ms', tz='UTC'))]
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+def validate_bars(df: pd.DataFrame, timeframe: str) -> dict:
+    """Contrôle de continuité : trous dans la série et bougies OHLC incohérentes."""
+    step = pd.Timedelta(seconds=timeframe_seconds(timeframe))
+    d = df.index.to_series().diff()
+    gaps = [(str(t - dt), str(t)) for t, dt in d[d > step].items()]
+    bad = int(((df['high'] < df[['open','close']].max(axis=1)) | (df['low'] > df[['open','close']].min(axis=1))).sum())
+    return {'bars': len(df), 'gaps': gaps, 'bad_bars': bad}
+
+def backfill(exchange: str, symbol: str, timeframe: str, start, end=None, cache_dir='app_cache',
+             page: int = 1000, workers: int = 4) -> dict:
+    """Télécharge l'historique [start, end] par fenêtres de `page` bougies, en parallèle (le
+    rate-limit est partagé par le client poolé). Les fenêtres terminées sont notées dans
+    _backfill.json : une reprise après interruption ne refait que les manquantes. Une fenêtre
+    vide n'est notée que si elle est antérieure à la première bougie du symbole."""
+    step = timeframe_seconds(timeframe) * 1000; span = page * step
+    start_ms = int(_utc(start).timestamp() * 1000); now_ms = int(time.time() * 1000)
+    end_ms = min(now_ms, int(_utc(end).timestamp() * 1000)) if end is not None else now_ms
+    path = _cache_path(cache_dir, exchange, symbol, timeframe)
+    _migrate_legacy(path, timeframe); os.makedirs(path, exist_ok=True)
+    ckpt = os.path.join(path, '_backfill.json')
+    try:
+        with open(ckpt) as f: done = set(json.load(f).get(str(page), []))
+    except (OSError, ValueError):
+        done = set()
+    # grille absolue : les fenêtres restent les mêmes d'un run à l'autre
+    windows = [w for w in range(start_ms // span * span, end_ms + 1, span) if w not in done]
+    errors = []; empty = []
+    def save():
+        tmp = f"{ckpt}.tmp"
+        with open(tmp, 'w') as f: json.dump({str(page): sorted(done)}, f)
+        os.replace(tmp, ckpt)
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        futs = {pool.submit(_fetch_window, exchange, symbol, timeframe, w, w + span, page): w for w in windows}
+        for fut in as_completed(futs):
+            w = futs[fut]
+            try:
+                df = fut.result()
+            except Exception as e:
+                errors.append(f"{pd.Timestamp(w, unit='ms', tz='UTC')}: {e}"); continue
+            if not len(df):
+                empty.append(w); continue   # vide : avant le listing, ou réponse transitoire
+            _write_cache(path, df, timeframe)
+            if w + span <= now_ms:        # la fenêtre courante reste à rafraîchir
+                done.add(w); save()
+    hist = _read_cache(path)
+    # une fenêtre vide n'est close que si elle précède la première bougie connue (listing) ;
+    # sinon elle est retentée au prochain run
+    if empty and hist is not None and len(hist):
+        first_ms = int(hist.index[0].timestamp() * 1000)
+        listed = [w for w in empty if w + span <= first_ms]
+        if listed:
+            done.update(listed); save()
+    if hist is None:
+        hist = pd.DataFrame(columns=['open','high','low','close','volume'], index=pd.DatetimeIndex([], tz='UTC'))
+    hist = hist[(hist.index >= pd.Timestamp(start_ms, unit='ms', tz='UTC')) & (hist.index <= pd.Timestamp(end_ms, unit='ms', tz='UTC'))]
+    report = validate_bars(hist, timeframe)
+    report.update({'windows': len(windows), 'errors': errors})
+    return report
+
+def load_history(exchange: str, symbol: str, timeframe: str, start, end=None, cache_dir='app_cache', **kw):
+    """backfill() puis renvoie la série [start, end] depuis le cache."""
+    backfill(exchange, symbol, timeframe, start, end, cache_dir=cache_dir, **kw)
+    df = _read_cache(_cache_path(cache_dir, exchange, symbol, timeframe))
+    if df is None:
+        raise RuntimeError(f"{exchange}: aucun historique pour {symbol} {timeframe}")
+    df = df[df.index >= _utc(start)]
+    return df if end is None else df[df.index <= _utc(end)]
+
 def fetch_last_price(exchange_name: str, symbol: str):
     ex = build_exchange(exchange_name)
     sym = _map_symbol(exchange_name, symbol)
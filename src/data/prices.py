@@ -0,0 +1,57 @@
+"""Snapshot de prix pour le portefeuille : un seul fetch_tickers quand l'exchange le permet,
+puis des fetch_ticker concurrents pour les symboles qu'il n'a pas renvoyés (ou pour tous si
+l'appel groupé échoue) ; les cotations sont gardées `ttl` secondes."""
+import os, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from .ccxt_client import build_exchange
+from .loader import _map_symbol
+from ..tracing import span, count
+
+PRICE_TTL = float(os.getenv('PRICE_TTL', 5))   # secondes
+
+_QUOTES = {}     # (exchange, symbol) -> (horodatage, prix)
+_LOCK = threading.Lock()
+
+def _price(t: dict) -> float:
+    return float(t.get('last') or t.get('close') or 0.0)
+
+def _fetch_prices(exchange: str, symbols) -> dict:
+    ex = build_exchange(exchange)
+    mapped = {_map_symbol(exchange, s): s for s in symbols}
+    out = {}
+    if ex.has.get('fetchTickers'):
+        try:
+            tickers = ex.fetch_tickers(list(mapped))
+            out = {mapped[k]: p for k, t in tickers.items() if k in mapped and (p := _price(t))}
+        except Exception:
+            pass   # certains exchanges refusent une liste : on passe aux appels unitaires
+    # symboles absents de la réponse groupée : un fetch_ticker chacun
+    rest = [k for k, s in mapped.items() if s not in out]
+    if rest:
+        count('prices.fallback', len(rest))
+        def one(sym):
+            try: return mapped[sym], _price(ex.fetch_ticker(sym))
+            except Exception: return mapped[sym], None
+        with ThreadPoolExecutor(max_workers=min(8, len(rest))) as pool:
+            out.update({s: p for s, p in pool.map(one, rest) if p})
+    return out
+
+def snapshot(exchange: str, symbols, ttl: float = None) -> dict:
+    """{symbole: dernier prix}. Les symboles introuvables sont absents du résultat."""
+    ttl = PRICE_TTL if ttl is None else float(ttl)
+    symbols = list(dict.fromkeys(symbols)); now = time.time()
+    with _LOCK:
+        out = {s: q[1] for s in symbols if (q := _QUOTES.get((exchange, s))) and now - q[0] < ttl}
+    missing = [s for s in symbols if s not in out]
+    count('prices.hit', len(out)); count('prices.miss', len(missing))
+    if missing:
+        with span('data.fetch_prices'):
+            fresh = _fetch_prices(exchange, missing)
+        now = time.time()
+        with _LOCK:
+            for s, p in fresh.items(): _QUOTES[(exchange, s)] = (now, p)
+        out.update(fresh)
+    return out
+
+def last_price(exchange: str, symbol: str, ttl: float = None):
+    return snapshot(exchange, [symbol], ttl).get(symbol)
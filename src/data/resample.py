@@ -0,0 +1,162 @@
+"""Timeframes dérivés par rééchantillonnage d'une série de base (15m par défaut).
+
+Une seule série est téléchargée par symbole (la base, mise en cache parquet et dans le
+magasin mappé) ; 1h, 4h, 1d... en sont agrégés : open = premier, high = max, low = min,
+close = dernier, volume = somme. Les bornes de buckets suivent celles des exchanges : époque
+UTC (minuit) pour m/h/d, lundi 00:00 UTC pour w, 1er du mois pour M. Le dernier bucket peut
+être incomplet, comme la bougie en formation renvoyée par l'exchange.
+
+Mise à jour incrémentale : seuls les buckets touchés par les nouvelles bougies de base sont
+recalculés (à partir du dernier bucket dérivé) ; la série dérivée est reconstruite si elle ne
+vient pas de la même base ou si la base a été étendue vers le passé.
+
+La base n'est rallongée vers le passé que si le backfill reste sous HELIOS_BASE_MAX_BARS
+bougies : au-delà (ex. 3 ans en 1d, 2500 bougies 4h), le timeframe est chargé directement,
+ce qui coûte 10 à 100 fois moins d'appels fetch_ohlcv qu'un historique 15m.
+"""
+import os, time
+import numpy as np, pandas as pd
+from .loader import timeframe_seconds, load_history, _fetch_since, _write_cache, _cache_path
+from .store import STORE, load as store_load, _bound_ms
+from ..tracing import span, count
+
+BASE_TIMEFRAME = os.getenv('HELIOS_BASE_TF', '15m')
+MAX_BASE_BARS = int(os.getenv('HELIOS_BASE_MAX_BARS', '20000'))   # backfill max de la base par requête
+_WEEK_OFFSET = 4 * 86400 * 1000      # 1970-01-01 était un jeudi : les semaines partent du lundi
+
+def bucket_start(ts_ms: np.ndarray, timeframe: str) -> np.ndarray:
+    """Début (ms UTC) du bucket `timeframe` contenant chaque horodatage."""
+    ts_ms = np.asarray(ts_ms, dtype='int64'); n, unit = int(timeframe[:-1]), timeframe[-1]
+    if unit == 'M':
+        months = ts_ms.view('datetime64[ms]').astype('datetime64[M]').astype('int64')
+        return (months // n * n).astype('datetime64[M]').astype('datetime64[ms]').astype('int64')
+    if unit == 'w':
+        step = n * 604800 * 1000
+        return (ts_ms - _WEEK_OFFSET) // step * step + _WEEK_OFFSET
+    step = timeframe_seconds(timeframe) * 1000
+    return ts_ms // step * step
+
+def timeframe_index(start, periods: int, timeframe: str) -> pd.DatetimeIndex:
+    """Index UTC de `periods` bougies `timeframe` à partir de la bougie contenant `start`
+    (mêmes bornes que bucket_start : lundi pour w, 1er du mois pour M)."""
+    t0 = pd.Timestamp(int(bucket_start([_bound_ms(start)], timeframe)[0]), unit='ms', tz='UTC')
+    n, unit = int(timeframe[:-1]), timeframe[-1]
+    freq = f"{n}MS" if unit == 'M' else pd.Timedelta(seconds=timeframe_seconds(timeframe))
+    return pd.date_range(t0, periods=int(periods), freq=freq, name='ts')
+
+def derivable(base: str, timeframe: str) -> bool:
+    """`timeframe` s'obtient-il en regroupant des bougies `base` entières ?"""
+    b = timeframe_seconds(base)
+    if timeframe[-1] in 'wM':
+        return 86400 % b == 0
+    t = timeframe_seconds(timeframe)
+    return t >= b and t % b == 0 and (86400 % t == 0 or t % 86400 == 0)
+
+def aggregate(ts, open_, high, low, close, volume, timeframe: str):
+    """Agrégation OHLCV de bougies triées : (ts des buckets, {colonne: array})."""
+    ts = np.asarray(ts)
+    if not len(ts):
+        return ts[:0], {c: np.asarray(a)[:0] for c, a in zip(('open', 'high', 'low', 'close', 'volume'),
+                                                              (open_, high, low, close, volume))}
+    b = bucket_start(ts, timeframe)
+    starts = np.flatnonzero(np.r_[True, b[1:] != b[:-1]]); ends = np.r_[starts[1:], len(ts)] - 1
+    return b[starts], {'open': np.asarray(open_)[starts], 'high': np.maximum.reduceat(high, starts),
+                       'low': np.minimum.reduceat(low, starts), 'close': np.asarray(close)[ends],
+                       'volume': np.add.reduceat(volume, starts)}
+
+def resample(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """DataFrame OHLCV (index UTC) regroupé en `timeframe`."""
+    idx = df.index if df.index.tz is not None else df.index.tz_localize('UTC')
+    ts, cols = aggregate(idx.as_unit('ms').asi8, *(df[c].to_numpy() for c in ('open', 'high', 'low', 'close', 'volume')),
+                         timeframe)
+    return pd.DataFrame(cols, index=pd.DatetimeIndex(ts.view('datetime64[ms]')).tz_localize('UTC').rename('ts'))
+
+def derive(exchange: str, symbol: str, base: str, timeframe: str, store=None):
+    """Met à jour la série `timeframe` du magasin depuis la base ; renvoie ses Bars."""
+    store = store or STORE
+    src = store.attach(exchange, symbol, base)
+    if src is None or not len(src) or timeframe == base:
+        return src
+    dst = store.attach(exchange, symbol, timeframe)
+    if dst is not None and dst.meta.get('source') == base and dst.meta.get('base_version') == src.version:
+        count('resample.unchanged'); return dst
+    incremental = (dst is not None and len(dst) and dst.meta.get('source') == base
+                   and bucket_start(src.ts[:1], timeframe)[0] >= dst.ts[0])
+    i0 = int(np.searchsorted(src.ts, dst.ts[-1], 'left')) if incremental else 0   # dernier bucket recalculé
+    with span('data.resample', symbol=symbol):
+        ts, cols = aggregate(src.ts[i0:], *(src[c][i0:] for c in ('open', 'high', 'low', 'close', 'volume')), timeframe)
+        if incremental:
+            count('resample.incremental')
+            store.append_arrays(exchange, symbol, timeframe, ts, cols, source=base, base_version=src.version)
+        else:
+            count('resample.full')
+            store.write_arrays(exchange, symbol, timeframe, ts, cols, src.meta.get('dtype'), source=base,
+                               base_version=src.version)
+    return store.attach(exchange, symbol, timeframe)
+
+def sync_base(exchange: str, symbol: str, base: str, start_ms: int, store=None, cache_dir='app_cache'):
+    """Série de base couvrant [start_ms, maintenant] : historique paginé (backfill) si elle ne
+    remonte pas assez loin, sinon seulement les bougies depuis la dernière (si une a clôturé)."""
+    store = store or STORE
+    bars = store.attach(exchange, symbol, base); step = timeframe_seconds(base) * 1000
+    synced = (bars.meta.get('synced_from') if bars is not None and len(bars) else None)
+    if synced is not None and synced <= start_ms:
+        if bars.ts[-1] + step > time.time() * 1000:
+            count('resample.base_fresh'); return bars
+        try:
+            new = _fetch_since(exchange, symbol, base, since=bars.last_ts)
+        except Exception:
+            count('resample.base_stale'); return bars     # réseau indisponible : base servie telle quelle
+        if len(new):
+            _write_cache(_cache_path(cache_dir, exchange, symbol, base), new, base)
+            store.append(exchange, symbol, base, new, source=base)
+        return store.attach(exchange, symbol, base)
+    hist = load_history(exchange, symbol, base, start=pd.Timestamp(start_ms, unit='ms', tz='UTC'), cache_dir=cache_dir)
+    if hist.empty:
+        raise ValueError(f"{exchange}: aucune bougie {base} pour {symbol}")
+    store.append(exchange, symbol, base, hist, source=base, synced_from=min(start_ms, synced or start_ms))
+    return store.attach(exchange, symbol, base)
+
+def use_base(exchange: str, symbol: str, base: str, timeframe: str, start_ms: int, store=None) -> bool:
+    """Dériver `timeframe` de la base pour une fenêtre commençant à start_ms ? Oui si la base
+    en mémoire la couvre déjà, ou si les bougies manquantes tiennent dans MAX_BASE_BARS."""
+    if not derivable(base, timeframe):
+        return False
+    bars = (store or STORE).attach(exchange, symbol, base)
+    synced = bars.meta.get('synced_from') if bars is not None and len(bars) else None
+    if synced is not None and synced <= start_ms:
+        return True
+    missing = ((synced or time.time() * 1000) - start_ms) / (timeframe_seconds(base) * 1000)
+    if missing > MAX_BASE_BARS:
+        count('resample.direct'); return False
+    return True
+
+def _start_ms(start, timeframe: str) -> int:
+    t = pd.Timestamp(start); t = t.tz_localize('UTC') if t.tzinfo is None else t
+    return int(bucket_start([int(t.timestamp() * 1000)], timeframe)[0])
+
+def history(exchange: str, symbol: str, timeframe: str, start, end=None, base: str = None, store=None,
+            cache_dir='app_cache') -> pd.DataFrame:
+    """Bougies `timeframe` de [start, end], dérivées de la base (vue du magasin, lecture seule).
+    Si `timeframe` ne se dérive pas de la base, ou si la fenêtre demanderait un backfill de la
+    base trop long (use_base), l'historique est téléchargé directement."""
+    base = base or BASE_TIMEFRAME
+    start_ms = _start_ms(start, timeframe)
+    if not use_base(exchange, symbol, base, timeframe, start_ms, store):
+        return load_history(exchange, symbol, timeframe, start, end, cache_dir=cache_dir)
+    sync_base(exchange, symbol, base, start_ms, store, cache_dir)
+    bars = derive(exchange, symbol, base, timeframe, store)
+    return bars.frame(start=pd.Timestamp(start_ms, unit='ms', tz='UTC'), end=end)
+
+def load(exchange: str, symbol: str, timeframe: str, limit: int = 2500, base: str = None, store=None,
+         cache_dir='app_cache', **kw) -> pd.DataFrame:
+    """Remplace load_or_fetch : les `limit` dernières bougies `timeframe`, dérivées de la base.
+    Repli sur le chargement direct (avec exchanges de secours) si la base est indisponible."""
+    base = base or BASE_TIMEFRAME
+    start = pd.Timestamp.now(tz='UTC') - pd.Timedelta(seconds=(limit + 1) * timeframe_seconds(timeframe))
+    if use_base(exchange, symbol, base, timeframe, _start_ms(start, timeframe), store):
+        try:
+            return history(exchange, symbol, timeframe, start, base=base, store=store, cache_dir=cache_dir).iloc[-limit:]
+        except Exception:
+            count('resample.fallback')
+    return store_load(exchange, symbol, timeframe, limit=limit, store=store, cache_dir=cache_dir, **kw)
@@ -0,0 +1,231 @@
+"""Magasin OHLCV colonnaire en fichiers .npy mappés en mémoire.
+
+    store = MarketStore()                                  # app_cache/store (MARKET_STORE)
+    store.write('okx', 'BTC/USDT', '1h', df, dtype='float32')
+    df = store.frame('okx', 'BTC/USDT', '1h', limit=2500)   # vue DataFrame en lecture seule
+
+Une série = un dossier {exchange}/{symbole}_{tf}/ : ts.npy (int64 ms, trié : c'est l'index
+temporel, recherché par searchsorted), un .npy contigu par colonne (float32 ou float64) et
+meta.json (version, dtype, nb de bougies, bornes). catalog() recense les séries.
+
+Les lecteurs ouvrent les fichiers en np.load(mmap_mode='r') : aucune copie, les pages sont
+partagées entre processus par le cache du noyau. Une écriture crée une nouvelle version des
+fichiers puis bascule meta.json (os.replace) : les vues déjà ouvertes restent valides.
+Seul l'index UTC des vues DataFrame est matérialisé (8 octets par bougie). Les écritures
+d'une même série (UI, daemon, workers) sont sérialisées par un verrou fichier {dossier}/.lock.
+"""
+import os, json, glob, threading, contextlib
+import numpy as np, pandas as pd
+from ..tracing import span, count
+
+ROOT = os.getenv('MARKET_STORE', os.path.join('app_cache', 'store'))
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+DTYPES = ('float32', 'float64')
+_OWN_META = ('version', 'dtype', 'columns', 'n', 'first', 'last', 'exchange', 'symbol', 'timeframe')
+
+_LOCK = threading.Lock()
+try:
+    import fcntl
+except ImportError:   # Windows : verrou limité au processus
+    fcntl = None
+_WRITE_LOCK = threading.Lock()
+
+@contextlib.contextmanager
+def _series_lock(path: str):
+    """Verrou exclusif d'écriture sur une série, entre processus (flock) comme entre threads
+    (chaque open() a sa propre description de fichier)."""
+    os.makedirs(path, exist_ok=True)
+    if fcntl is None:
+        with _WRITE_LOCK: yield
+        return
+    with open(os.path.join(path, '.lock'), 'a') as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try: yield
+        finally: fcntl.flock(fh, fcntl.LOCK_UN)
+
+def _to_ms(index: pd.DatetimeIndex) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.as_unit('ms').asi8.astype('int64', copy=False)
+
+def _bound_ms(t) -> int:
+    t = pd.Timestamp(t)
+    return int((t.tz_localize('UTC') if t.tzinfo is None else t).timestamp() * 1000)
+
+class Bars:
+    """Série attachée : ts (int64 ms) et colonnes, toutes en memmap lecture seule."""
+    def __init__(self, path: str, meta: dict):
+        self.path, self.meta, self.version = path, meta, meta['version']
+        n = meta['n']
+        load = lambda c: np.load(os.path.join(path, f"{c}.{self.version}.npy"), mmap_mode='r')[:n]
+        self.ts = load('ts')
+        self.columns = {c: load(c) for c in meta['columns']}
+
+    def __len__(self):
+        return len(self.ts)
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self.columns[col]
+
+    def bounds(self, start=None, end=None, limit: int = None):
+        """(i0, i1) des bougies dans [start, end], réduit aux `limit` dernières."""
+        i0 = 0 if start is None else int(np.searchsorted(self.ts, _bound_ms(start), 'left'))
+        i1 = len(self.ts) if end is None else int(np.searchsorted(self.ts, _bound_ms(end), 'right'))
+        if limit:
+            i0 = max(i0, i1 - int(limit))
+        return i0, i1
+
+    def frame(self, start=None, end=None, limit: int = None) -> pd.DataFrame:
+        """Vue DataFrame (mêmes colonnes/index que le loader) ; les colonnes partagent la
+        mémoire des fichiers, ne pas les modifier en place."""
+        i0, i1 = self.bounds(start, end, limit)
+        idx = pd.DatetimeIndex(self.ts[i0:i1].view('datetime64[ms]')).tz_localize('UTC').rename('ts')
+        return pd.DataFrame({c: a[i0:i1] for c, a in self.columns.items()}, index=idx, copy=False)
+
+    @property
+    def last_ts(self):
+        return pd.Timestamp(int(self.ts[-1]), unit='ms', tz='UTC') if len(self.ts) else None
+
+class MarketStore:
+    def __init__(self, root: str = None, dtype: str = 'float64'):
+        if dtype not in DTYPES: raise ValueError(f"dtype invalide: {dtype} ({', '.join(DTYPES)})")
+        self.root, self.dtype = root or ROOT, dtype
+        self._attached = {}    # dossier -> Bars (réutilisé tant que la version n'a pas changé)
+
+    def _path(self, exchange: str, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, exchange, f"{symbol.replace('/', '-')}_{timeframe}")
+
+    def _meta(self, path: str):
+        try:
+            with open(os.path.join(path, 'meta.json')) as f: return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, exchange: str, symbol: str, timeframe: str, df: pd.DataFrame, dtype: str = None, **meta) -> int:
+        """Remplace la série par `df` (index temporel, colonnes OHLCV). Retourne le nb de bougies.
+        `meta` : champs ajoutés à meta.json (ex. source='15m' pour une série rééchantillonnée)."""
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        return self.write_arrays(exchange, symbol, timeframe, _to_ms(df.index),
+                                 {c: df[c].to_numpy() for c in COLUMNS if c in df}, dtype, **meta)
+
+    def write_arrays(self, exchange, symbol, timeframe, ts, cols, dtype=None, **extra):
+        """Comme write(), à partir de ts (int64 ms triés) et {colonne: array}."""
+        path = self._path(exchange, symbol, timeframe)
+        with _series_lock(path):
+            return self._write(path, exchange, symbol, timeframe, ts, cols, dtype, **extra)
+
+    def _write(self, path, exchange, symbol, timeframe, ts, cols, dtype=None, **extra):
+        """Nouvelle version de la série ; à appeler sous _series_lock(path)."""
+        old = self._meta(path)
+        dtype = dtype or (old or {}).get('dtype') or self.dtype
+        if dtype not in DTYPES: raise ValueError(f"dtype invalide: {dtype} ({', '.join(DTYPES)})")
+        version = (old or {}).get('version', 0) + 1
+        with span('data.store_write', symbol=symbol):
+            for c, a in [('ts', ts)] + list(cols.items()):
+                f = os.path.join(path, f"{c}.{version}.npy"); tmp = f"{f}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as fh:
+                    np.save(fh, np.ascontiguousarray(a, dtype='int64' if c == 'ts' else dtype))
+                os.replace(tmp, f)
+            meta = {'source': timeframe, **extra,
+                    'version': version, 'dtype': dtype, 'columns': list(cols), 'n': int(len(ts)),
+                    'first': int(ts[0]) if len(ts) else None, 'last': int(ts[-1]) if len(ts) else None,
+                    'exchange': exchange, 'symbol': symbol, 'timeframe': timeframe}
+            tmp = os.path.join(path, f"meta.json.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f: json.dump(meta, f)
+            os.replace(tmp, os.path.join(path, 'meta.json'))
+        if old:   # les memmaps déjà ouverts gardent leur inode
+            for f in glob.glob(os.path.join(path, f"*.{old['version']}.npy")):
+                try: os.remove(f)
+                except OSError: pass
+        return meta['n']
+
+    def append(self, exchange: str, symbol: str, timeframe: str, df: pd.DataFrame, **meta) -> int:
+        """Fusionne `df` dans la série (une bougie déjà présente est écrasée)."""
+        df = df[~df.index.duplicated(keep='last')]
+        return self.append_arrays(exchange, symbol, timeframe, _to_ms(df.index),
+                                  {c: df[c].to_numpy() for c in COLUMNS if c in df}, **meta)
+
+    def append_arrays(self, exchange, symbol, timeframe, new_ts, new_cols, **meta) -> int:
+        path = self._path(exchange, symbol, timeframe)
+        with _series_lock(path):   # lecture de la dernière version et écriture de la suivante
+            bars = self.attach(exchange, symbol, timeframe)
+            if bars is None or not len(bars):
+                order = np.argsort(new_ts, kind='stable')
+                return self._write(path, exchange, symbol, timeframe, new_ts[order],
+                                   {c: np.asarray(a)[order] for c, a in new_cols.items()}, **meta)
+            keep = ~np.isin(bars.ts, new_ts)
+            ts = np.concatenate([bars.ts[keep], new_ts]); order = np.argsort(ts, kind='stable')
+            cols = {c: np.concatenate([a[keep], np.asarray(new_cols[c], dtype=a.dtype)])[order] for c, a in bars.columns.items()}
+            meta = {k: v for k, v in bars.meta.items() if k not in _OWN_META} | meta
+            return self._write(path, exchange, symbol, timeframe, ts[order], cols, **meta)
+
+    def attach(self, exchange: str, symbol: str, timeframe: str):
+        """Bars en lecture seule (memmap), ou None si la série n'existe pas."""
+        path = self._path(exchange, symbol, timeframe)
+        for _ in range(3):   # une écriture concurrente peut supprimer la version lue entre-temps
+            meta = self._meta(path)
+            if meta is None:
+                return None
+            with _LOCK:
+                bars = self._attached.get(path)
+                if bars is not None and bars.version == meta['version']:
+                    count('store.attach_reuse'); return bars
+            try:
+                bars = Bars(path, meta)
+            except FileNotFoundError:
+                continue
+            with _LOCK: self._attached[path] = bars
+            count('store.attach'); return bars
+        return None
+
+    def frame(self, exchange: str, symbol: str, timeframe: str, start=None, end=None, limit: int = None):
+        """Vue DataFrame zéro copie de la série, ou None si elle n'existe pas."""
+        bars = self.attach(exchange, symbol, timeframe)
+        return None if bars is None else bars.frame(start, end, limit)
+
+    def remove(self, exchange: str, symbol: str, timeframe: str):
+        path = self._path(exchange, symbol, timeframe)
+        with _LOCK: self._attached.pop(path, None)
+        for f in glob.glob(os.path.join(path, '*')) + glob.glob(os.path.join(path, '.lock')):
+            os.remove(f)
+        if os.path.isdir(path): os.rmdir(path)
+
+    def catalog(self, exchange: str = None) -> pd.DataFrame:
+        """Index des séries : exchange, symbol, timeframe, dtype, n, first, last."""
+        rows = []
+        for f in glob.glob(os.path.join(self.root, exchange or '*', '*', 'meta.json')):
+            m = self._meta(os.path.dirname(f))
+            if m: rows.append({k: m.get(k) for k in ('exchange', 'symbol', 'timeframe', 'dtype', 'n', 'first', 'last')})
+        df = pd.DataFrame(rows, columns=['exchange', 'symbol', 'timeframe', 'dtype', 'n', 'first', 'last'])
+        for c in ('first', 'last'):
+            df[c] = pd.to_datetime(df[c], unit='ms', utc=True)
+        return df.sort_values(['exchange', 'symbol', 'timeframe']).reset_index(drop=True)
+
+    def nbytes(self) -> int:
+        return sum(os.path.getsize(f) for f in glob.glob(os.path.join(self.root, '*', '*', '*.npy')))
+
+STORE = MarketStore()
+_STORES = {ROOT: STORE}
+
+def open_store(root: str = None) -> MarketStore:
+    """MarketStore partagé par racine (un par processus : les attaches sont réutilisées)."""
+    root = root or ROOT
+    with _LOCK:
+        if root not in _STORES: _STORES[root] = MarketStore(root)
+        return _STORES[root]
+
+def load(exchange: str, symbol: str, timeframe: str, limit: int = 2500, store: MarketStore = None, **kw):
+    """Comme load_or_fetch, mais servi depuis le magasin mappé : le parquet n'est relu (et
+    l'exchange interrogé) que lorsqu'une nouvelle bougie a clôturé."""
+    from .loader import load_or_fetch, timeframe_seconds
+    store = store or STORE
+    bars = store.attach(exchange, symbol, timeframe)
+    if bars is not None and len(bars) >= limit and not kw.get('refresh'):
+        nxt = bars.last_ts + pd.Timedelta(seconds=timeframe_seconds(timeframe))
+        if pd.Timestamp.now(tz='UTC') < nxt:
+            count('store.hit'); return bars.frame(limit=limit)
+    count('store.miss')
+    df = load_or_fetch(exchange, symbol, timeframe, limit=limit, **kw)
+    store.append(exchange, symbol, timeframe, df, source=timeframe)
+    return store.frame(exchange, symbol, timeframe, limit=limit)
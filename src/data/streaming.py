@@ -0,0 +1,201 @@
+"""Indicateurs incrémentaux (O(1) par bougie) pour le mode streaming des stratégies.
+
+Chaque primitive reproduit pas à pas l'algorithme de pandas (ewm adjust=False, rolling
+mean/var avec compensation de Kahan, rolling max/min) afin que la sortie streaming soit
+identique, bit pour bit, à la version batch.
+"""
+import math
+from collections import deque
+import pandas as pd
+
+NAN = float('nan')
+_INV_COND_TOL = 2.220446049250313e-16 * 1e3   # même seuil que pandas (roll_var)
+
+class Ewm:
+    """df[col].ewm(span=span, adjust=False).mean(), une valeur à la fois."""
+    def __init__(self, span: int):
+        self.com = (span - 1) / 2
+        self.alpha = 1. / (1. + self.com)
+        self.factor = 1. - self.alpha
+        self.weighted = None; self.old_wt = 1.; self.nobs = 0
+
+    def update(self, x: float) -> float:
+        obs = x == x
+        if self.weighted is None:
+            self.weighted = x; self.nobs = int(obs); self.old_wt = 1.
+        else:
+            self.nobs += obs
+            w = self.weighted
+            if w == w:
+                self.old_wt *= self.factor
+                if obs:
+                    if w != x:
+                        new_wt = 1. - self.old_wt if self.com == 1 else self.alpha
+                        w = self.old_wt * w + new_wt * x
+                        w /= (self.old_wt + new_wt)
+                    self.old_wt = 1.
+            elif obs:
+                w = x
+            self.weighted = w
+        return self.weighted if self.nobs >= 1 else NAN
+
+class RollingMean:
+    """df[col].rolling(window).mean()."""
+    def __init__(self, window: int):
+        self.window = window; self.buf = deque(); self.first = True
+
+    def _add(self, x):
+        if x == x:
+            self.nobs += 1
+            y = x - self.comp_add
+            t = self.sum + y
+            self.comp_add = t - self.sum - y
+            self.sum = t
+            if math.copysign(1., x) < 0:
+                self.neg += 1
+            self.same = self.same + 1 if x == self.prev else 1
+            self.prev = x
+
+    def _remove(self, x):
+        if x == x:
+            self.nobs -= 1
+            y = - x - self.comp_rem
+            t = self.sum + y
+            self.comp_rem = t - self.sum - y
+            self.sum = t
+            if math.copysign(1., x) < 0:
+                self.neg -= 1
+
+    def update(self, x: float) -> float:
+        if self.first or self.window <= 1:
+            self.buf.clear()
+            self.sum = self.comp_add = self.comp_rem = 0.; self.nobs = self.neg = 0
+            self.prev = x; self.same = 0
+            self.first = False
+        elif len(self.buf) == self.window:
+            self._remove(self.buf.popleft())
+        self._add(x); self.buf.append(x)
+        if self.nobs >= self.window and self.nobs > 0:
+            res = self.sum / self.nobs
+            if self.same >= self.nobs: res = self.prev
+            elif self.neg == 0 and res < 0: res = 0.
+            elif self.neg == self.nobs and res > 0: res = 0.
+            return res
+        return NAN
+
+class RollingStd:
+    """df[col].rolling(window).std() (ddof=1, Welford + Kahan comme pandas)."""
+    def __init__(self, window: int, ddof: int = 1):
+        self.window = window; self.ddof = ddof; self.buf = deque(); self.first = True
+        self.nobs = self.mean = self.ssqdm = self.comp_add = self.comp_rem = 0.
+        self.unstable = False
+
+    def _add(self, x):
+        if x != x:
+            return
+        prev_m2 = self.ssqdm
+        self.nobs += 1
+        prev_mean = self.mean - self.comp_add
+        y = x - self.comp_add
+        t = y - self.mean
+        self.comp_add = t + self.mean - y
+        self.mean = self.mean + t / self.nobs if self.nobs else 0.
+        self.ssqdm = self.ssqdm + (x - prev_mean) * (x - self.mean)
+        if prev_m2 * _INV_COND_TOL > self.ssqdm:
+            self.unstable = True
+
+    def _remove(self, x):
+        if x != x:
+            return
+        prev_m2 = self.ssqdm
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean - self.comp_rem
+            y = x - self.comp_rem
+            t = y - self.mean
+            self.comp_rem = t + self.mean - y
+            self.mean = self.mean - t / self.nobs
+            self.ssqdm = self.ssqdm - (x - prev_mean) * (x - self.mean)
+            if prev_m2 * _INV_COND_TOL > self.ssqdm:
+                self.unstable = True
+        else:
+            self.mean = self.ssqdm = 0.; self.unstable = False
+
+    def update(self, x: float) -> float:
+        recompute = self.first or self.window <= 1
+        self.first = False
+        self.buf.append(x)
+        if not recompute:
+            if len(self.buf) > self.window:
+                self._remove(self.buf.popleft())
+            self._add(x)
+        else:
+            while len(self.buf) > self.window:
+                self.buf.popleft()
+        if recompute or self.unstable:
+            self.nobs = self.mean = self.ssqdm = self.comp_add = self.comp_rem = 0.
+            for v in self.buf:
+                self._add(v)
+            self.unstable = False
+        if self.nobs >= max(self.window, 1) and self.nobs > self.ddof:
+            var = self.ssqdm / (self.nobs - self.ddof)
+            return 0. if var < 0 else math.sqrt(var)
+        return NAN
+
+class RollingExtremum:
+    """df[col].rolling(window).max() / .min() via une deque monotone."""
+    def __init__(self, window: int, mode: str = 'max'):
+        self.window = window; self.is_max = mode == 'max'
+        self.dq = deque(); self.vals = deque(); self.nobs = 0; self.i = 0
+
+    def update(self, x: float) -> float:
+        if len(self.vals) == self.window:
+            old = self.vals.popleft()
+            if old == old: self.nobs -= 1
+            if self.dq and self.dq[0][0] <= self.i - self.window:
+                self.dq.popleft()
+        self.vals.append(x)
+        if x == x:
+            self.nobs += 1
+            while self.dq and (self.dq[-1][1] <= x if self.is_max else self.dq[-1][1] >= x):
+                self.dq.pop()
+            self.dq.append((self.i, x))
+        self.i += 1
+        return self.dq[0][1] if self.nobs >= self.window and self.dq else NAN
+
+class TrueRange:
+    """max(high-low, |high-close_prev|, |low-close_prev|), NaN ignorés comme pandas."""
+    def __init__(self):
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        pc = self.prev_close; self.prev_close = close
+        vals = [v for v in (high - low, abs(high - pc), abs(low - pc)) if v == v]
+        return max(vals) if vals else NAN
+
+class Atr:
+    """true range lissé par ewm(span=length, adjust=False), comme features 'atr'."""
+    def __init__(self, length: int = 14):
+        self.tr = TrueRange(); self.ewm = Ewm(length)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        return self.ewm.update(self.tr.update(high, low, close))
+
+def _cmp(a: float, b: float) -> int:
+    return (1 if a > b else 0) - (1 if a < b else 0)
+
+class SignalStream:
+    """Base du mode streaming : update(bar) fait avancer l'état d'une bougie et renvoie
+    le signal courant (-1/0/+1), identique au dernier point de la fonction batch."""
+    def step(self, high: float, low: float, close: float) -> int:
+        raise NotImplementedError
+
+    def update(self, bar) -> int:
+        return self.step(float(bar['high']), float(bar['low']), float(bar['close']))
+
+    def run(self, df: pd.DataFrame) -> pd.Series:
+        """Rejoue df bougie par bougie (warm-up) ; renvoie la série de signaux complète."""
+        h = df['high'].to_numpy(dtype=float).tolist(); l = df['low'].to_numpy(dtype=float).tolist()
+        c = df['close'].to_numpy(dtype=float).tolist()
+        out = [self.step(*bar) for bar in zip(h, l, c)]
+        return pd.Series(out, index=df.index, dtype='int64', name='signal')
@@ -0,0 +1,59 @@
+"""Analytique du portefeuille calculée côté SQL.
+
+Les agrégats lisent la table pnl_summary (jour × symbole × sens × note, mise à jour par
+trigger à chaque clôture) : leur coût dépend du nombre de jours/symboles, pas du nombre
+de trades. Le listing est paginé par clé (id), sans OFFSET.
+"""
+import numpy as np
+import pandas as pd
+from ..storage.db import connect, POSITION_COLS
+
+GROUPS = ('symbol', 'side', 'day', 'note')
+
+def _stats(where: str = '', params=(), group: str = None, path: str = None) -> pd.DataFrame:
+    key = f'{group}, ' if group else ''
+    q = (f"SELECT {key}SUM(n), SUM(wins), SUM(pnl), SUM(r_sum), SUM(r_n) FROM pnl_summary {where}"
+         + (f" GROUP BY {group} ORDER BY {group}" if group else ''))
+    cols = ([group] if group else []) + ['trades', 'wins', 'pnl', 'r_sum', 'r_n']
+    df = pd.DataFrame(connect(path).execute(q, params).fetchall(), columns=cols)
+    df['win_rate'] = df['wins'] / df['trades'].where(df['trades'] > 0)
+    df['avg_r'] = df['r_sum'] / df['r_n'].where(df['r_n'] > 0)
+    return df.drop(columns=['r_sum', 'r_n'])
+
+def pnl_by(group: str = 'symbol', path: str = None) -> pd.DataFrame:
+    """P&L réalisé par symbol | side | day | note : trades, wins, pnl, win_rate, avg_r."""
+    if group not in GROUPS:
+        raise ValueError(f"group doit être parmi {GROUPS}")
+    return _stats(group=group, path=path)
+
+def equity_curve(initial: float = 0.0, path: str = None) -> pd.DataFrame:
+    """Courbe d'equity journalière : pnl du jour, cumul (initial + somme) et drawdown."""
+    rows = connect(path).execute(
+        "SELECT day, SUM(pnl), SUM(SUM(pnl)) OVER (ORDER BY day) FROM pnl_summary GROUP BY day ORDER BY day").fetchall()
+    df = pd.DataFrame(rows, columns=['day', 'pnl', 'equity'])
+    df['equity'] += float(initial)
+    peak = np.maximum.accumulate(np.maximum(df['equity'].to_numpy(dtype=float), float(initial))) if len(df) else []
+    df['drawdown'] = df['equity'] - peak
+    return df.set_index(pd.to_datetime(df.pop('day')))
+
+def summary(initial: float = 0.0, path: str = None) -> dict:
+    """Totaux réalisés : trades, pnl, win_rate, avg_r, max_drawdown (en devise)."""
+    s = _stats(path=path).iloc[0]
+    curve = equity_curve(initial, path)
+    return {'trades': int(s['trades'] or 0), 'pnl': float(s['pnl'] or 0.0),
+            'win_rate': None if pd.isna(s['win_rate']) else float(s['win_rate']),
+            'avg_r': None if pd.isna(s['avg_r']) else float(s['avg_r']),
+            'max_drawdown': float(curve['drawdown'].min()) if len(curve) else 0.0}
+
+def page_positions(status: str = 'CLOSED', before_id: int = None, limit: int = 50, symbol: str = None,
+                   path: str = None):
+    """Une page de positions (plus récentes d'abord) et le curseur de la suivante (None à la fin).
+    Pagination par clé : WHERE id < before_id, servie par l'index (status, id)."""
+    q = f"SELECT {', '.join(POSITION_COLS)} FROM positions WHERE status=?"; params = [status]
+    if symbol:
+        q += ' AND symbol=?'; params.append(symbol)
+    if before_id is not None:
+        q += ' AND id<?'; params.append(int(before_id))
+    rows = connect(path).execute(q + ' ORDER BY id DESC LIMIT ?', params + [int(limit) + 1]).fetchall()
+    df = pd.DataFrame(rows[:int(limit)], columns=POSITION_COLS)
+    return df, (int(df['id'].iloc[-1]) if len(rows) > int(limit) else None)
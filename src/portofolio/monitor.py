@@ -0,0 +1,245 @@
+"""Surveillance TP/SL en continu (asyncio), à la place du bouton « Mettre à jour (TP/SL) ».
+
+    python -m src.portofolio.monitor --exchange okx --interval 1   # polling (fetch_tickers groupé)
+    python -m src.portofolio.monitor --stream                      # websocket (ccxt.pro)
+    python -m src.portofolio.monitor --simulate                    # flux simulé local
+
+Une source de prix expose ticks(symbols) : itérable asynchrone de (ts ms, {symbole: prix}),
+`symbols()` donnant les symboles à suivre. À chaque tick, toutes les positions ouvertes sont
+comparées à leurs niveaux en une passe numpy ; celles qui sont touchées sont clôturées en une
+transaction (close_positions) avec le niveau touché et l'horodatage du tick. Les positions
+ouvertes sont relues en base toutes les `refresh` secondes (ouvertures depuis l'UI,
+clôtures manuelles).
+"""
+import time, signal, asyncio, logging, argparse, threading, datetime
+import numpy as np, pandas as pd
+from ..storage.db import list_positions, close_positions
+from ..tracing import span, count
+
+log = logging.getLogger("helios.monitor")
+
+def _iso(ts_ms) -> str:
+    """Horodatage ms -> ISO UTC naïf (même format que close_ts)."""
+    return datetime.datetime.fromtimestamp(ts_ms / 1000, datetime.timezone.utc).replace(tzinfo=None).isoformat()
+
+def hits(long, px, sl, tp):
+    """(touché, SL) pour chaque position ; un prix NaN ne touche rien, SL prioritaire si les
+    deux niveaux sont franchis (gap)."""
+    long, px = np.asarray(long, bool), np.asarray(px, float)
+    at_tp = np.where(long, px >= tp, px <= tp)
+    at_sl = np.where(long, px <= sl, px >= sl)
+    return at_tp | at_sl, at_sl
+
+# ---------- Sources de prix ----------
+class PollingSource:
+    """Cotations via data.prices.snapshot (fetch_tickers groupé) toutes les `interval` secondes."""
+    def __init__(self, exchange: str, interval: float = 1.0):
+        self.exchange, self.interval = exchange, float(interval)
+
+    async def ticks(self, symbols):
+        from ..data.prices import snapshot
+        while True:
+            t0 = time.monotonic(); syms = symbols()
+            if syms:
+                try:
+                    quotes = await asyncio.to_thread(snapshot, self.exchange, syms, 0)
+                except Exception as e:
+                    log.warning("cotations %s indisponibles: %s", self.exchange, e); quotes = {}
+                if quotes:
+                    yield int(time.time() * 1000), quotes
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - t0)))
+
+class StreamSource:
+    """Tickers poussés par websocket (ccxt.pro) : watch_tickers groupé, sinon watch_ticker
+    par symbole (premier arrivé)."""
+    def __init__(self, exchange: str):
+        self.exchange = exchange
+
+    async def ticks(self, symbols):
+        import ccxt.pro as ccxtpro
+        from ..data.loader import _map_symbol
+        ex = getattr(ccxtpro, self.exchange.lower())({'enableRateLimit': True})
+        try:
+            while True:
+                syms = symbols()
+                if not syms:
+                    await asyncio.sleep(1.0); continue
+                mapped = {_map_symbol(self.exchange, s): s for s in syms}
+                if ex.has.get('watchTickers'):
+                    tickers = await ex.watch_tickers(list(mapped))
+                else:
+                    tasks = [asyncio.ensure_future(ex.watch_ticker(s)) for s in mapped]
+                    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for t in pending: t.cancel()
+                    tickers = {t['symbol']: t for t in (d.result() for d in done)}
+                quotes = {mapped[k]: float(t.get('last') or t.get('close') or 0.0) for k, t in tickers.items() if k in mapped}
+                ts = max((t.get('timestamp') or 0 for t in tickers.values()), default=0) or int(time.time() * 1000)
+                if quotes:
+                    yield ts, quotes
+        finally:
+            await ex.close()
+
+class SimulatedFeed:
+    """Flux local pour les tests : marche aléatoire log-normale par symbole, un tick toutes les
+    `interval` secondes. set_price() impose le prix du prochain tick (ex. franchir un SL)."""
+    def __init__(self, prices: dict = None, vol: float = 0.002, interval: float = 0.05, seed: int = 0,
+                 default: float = 100.0):
+        self.prices, self.vol, self.interval, self.default = dict(prices or {}), float(vol), float(interval), default
+        self.rng = np.random.default_rng(seed); self._forced = {}
+
+    def set_price(self, symbol: str, price: float):
+        self._forced[symbol] = float(price)
+
+    async def ticks(self, symbols):
+        while True:
+            syms = symbols()
+            if syms:
+                px = np.array([self.prices.get(s, self.default) for s in syms], dtype=float)
+                px *= np.exp(self.vol * self.rng.standard_normal(len(syms)))
+                self.prices.update(zip(syms, px.tolist())); self.prices.update(self._forced); self._forced.clear()
+                yield int(time.time() * 1000), {s: self.prices[s] for s in syms}
+            await asyncio.sleep(self.interval)
+
+# ---------- Moniteur ----------
+class PositionMonitor:
+    """Clôture automatiquement les positions dont le TP ou le SL est touché.
+
+    Les positions ouvertes sont gardées en tableaux numpy (id, sens, sl, tp, code symbole) et
+    le dernier prix connu par symbole dans un vecteur : un tick = une mise à jour du vecteur
+    et une comparaison vectorisée, quelle que soit la taille du portefeuille."""
+    def __init__(self, source, refresh: float = 5.0, note: str = 'AUTO_TP_SL', path: str = None,
+                 on_close=None, limit: int = 100_000):
+        self.source, self.refresh, self.note, self.path = source, float(refresh), note, path
+        self.on_close, self.limit = on_close, int(limit)
+        self.stats = {'ticks': 0, 'closed': 0, 'positions': 0, 'last_tick': None, 'check_ms': None, 'close_ms': None}
+        self._symbols, self._px, self._pts = [], np.empty(0), np.empty(0, np.int64)
+        self._loop = self._task = self._thread = None; self._stopping = False
+        self.load(pd.DataFrame(columns=['id', 'symbol', 'side', 'sl', 'tp']))
+        self.loaded_at = float('-inf')
+
+    def load(self, df: pd.DataFrame = None):
+        """(Re)charge les positions ouvertes ; les derniers prix connus sont conservés."""
+        if df is None:
+            df = list_positions('OPEN', limit=self.limit, path=self.path)
+        old = dict(zip(self._symbols, zip(self._px.tolist(), self._pts.tolist())))
+        self._symbols = list(dict.fromkeys(df['symbol']))
+        self._index = {s: i for i, s in enumerate(self._symbols)}
+        self._px = np.array([old.get(s, (np.nan, 0))[0] for s in self._symbols], dtype=float)
+        self._pts = np.array([old.get(s, (np.nan, 0))[1] for s in self._symbols], dtype=np.int64)
+        self.ids = df['id'].to_numpy(np.int64)
+        self.code = np.array([self._index[s] for s in df['symbol']], dtype=np.intp)
+        self.long = (df['side'] == 'LONG').to_numpy(bool)
+        self.sl, self.tp = df['sl'].to_numpy(float), df['tp'].to_numpy(float)
+        self.stats['positions'] = len(self.ids); self.loaded_at = time.monotonic()
+
+    def symbols(self) -> list:
+        return list(self._symbols)
+
+    def update(self, ts: int, quotes: dict):
+        for s, p in quotes.items():
+            i = self._index.get(s)
+            if i is not None and p:
+                self._px[i] = p; self._pts[i] = ts
+
+    def check(self):
+        """Positions touchées au dernier prix connu : (indices, [(id, prix, 'TP'|'SL', ts ISO)])."""
+        px = self._px[self.code]
+        hit, at_sl = hits(self.long, px, self.sl, self.tp)
+        idx = np.flatnonzero(hit)
+        return idx, [(int(self.ids[i]), float(px[i]), 'SL' if at_sl[i] else 'TP', _iso(self._pts[self.code[i]]))
+                     for i in idx]
+
+    def _drop(self, idx):
+        keep = np.ones(len(self.ids), bool); keep[idx] = False
+        self.ids, self.code, self.long = self.ids[keep], self.code[keep], self.long[keep]
+        self.sl, self.tp = self.sl[keep], self.tp[keep]
+        self.stats['positions'] = len(self.ids)
+
+    async def on_tick(self, ts: int, quotes: dict) -> dict:
+        """Traite un tick ; retourne {id: pnl} des positions clôturées."""
+        t0 = time.perf_counter()
+        self.update(ts, quotes)
+        with span('monitor.check'):
+            idx, rows = self.check()
+        self.stats.update(ticks=self.stats['ticks'] + 1, last_tick=_iso(ts), check_ms=1000 * (time.perf_counter() - t0))
+        count('monitor.tick')
+        if not rows:
+            return {}
+        t1 = time.perf_counter()
+        with span('monitor.close'):
+            closed = await asyncio.to_thread(close_positions, rows, self.note, self.path)
+        self._drop(idx)   # déjà closes ailleurs (clôture manuelle) : ignorées par close_positions
+        self.stats.update(closed=self.stats['closed'] + len(closed), close_ms=1000 * (time.perf_counter() - t1))
+        count('monitor.closed', len(closed))
+        for pid, px, kind, hit_ts in rows:
+            if pid in closed:
+                log.info("position %d clôturée (%s à %.6g, tick %s) : PnL %.2f", pid, kind, px, hit_ts, closed[pid])
+        if self.on_close and closed:   # [(id, prix, 'TP'|'SL', ts, pnl)]
+            self.on_close([r + (closed[r[0]],) for r in rows if r[0] in closed])
+        return closed
+
+    async def run(self):
+        """Boucle principale (jusqu'à annulation de la tâche)."""
+        self._task = asyncio.current_task()
+        if self._stopping:   # stop() appelé avant que la tâche soit connue
+            return
+        self.load(await asyncio.to_thread(list_positions, 'OPEN', self.limit, self.path))
+        async for ts, quotes in self.source.ticks(self.symbols):
+            if time.monotonic() - self.loaded_at >= self.refresh:
+                self.load(await asyncio.to_thread(list_positions, 'OPEN', self.limit, self.path))
+            await self.on_tick(ts, quotes)
+
+    def start(self) -> threading.Thread:
+        """Lance run() dans un thread dédié (boucle asyncio propre), ex. depuis Streamlit."""
+        def _main():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.run())
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                log.exception("moniteur TP/SL arrêté")
+            finally:
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens()); self._loop.close()
+        self._stopping = False
+        self._thread = threading.Thread(target=_main, name="helios-monitor", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stopping = True
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Surveillance TP/SL des positions ouvertes")
+    p.add_argument("--exchange", default="okx")
+    p.add_argument("--interval", type=float, default=1.0, help="secondes entre deux polls")
+    p.add_argument("--refresh", type=float, default=5.0, help="secondes entre deux relectures des positions")
+    p.add_argument("--stream", action="store_true", help="websocket ccxt.pro au lieu du polling")
+    p.add_argument("--simulate", action="store_true", help="flux simulé (marche aléatoire autour des entrées)")
+    p.add_argument("--vol", type=float, default=0.002, help="volatilité par tick du flux simulé")
+    a = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if a.simulate:
+        pos = list_positions('OPEN', limit=100_000)
+        source = SimulatedFeed(pos.groupby('symbol')['entry'].last().to_dict(), vol=a.vol, interval=a.interval / 10)
+    else:
+        source = StreamSource(a.exchange) if a.stream else PollingSource(a.exchange, a.interval)
+    mon = PositionMonitor(source, refresh=a.refresh)
+    async def _run():
+        task = asyncio.ensure_future(mon.run()); loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            log.info("arrêt demandé : %d ticks, %d positions clôturées", mon.stats['ticks'], mon.stats['closed'])
+    asyncio.run(_run())
+
+if __name__ == "__main__":
+    main()
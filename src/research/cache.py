@@ -0,0 +1,158 @@
+"""Mémoïsation du pipeline (signaux, poids, régime, niveaux, confiance) par symbole.
+
+Clé = (exchange, symbole, timeframe, dernière bougie, jeu de stratégies, hash de config,
+empreinte du code) : le résultat n'est recalculé que lorsqu'une nouvelle bougie arrive, que
+les réglages changent ou que le code du pipeline a été modifié. Niveau mémoire LRU borné en
+octets + niveau disque optionnel (pickle), lui aussi borné en octets (les fichiers les plus
+anciens sont supprimés).
+"""
+import os, glob, json, pickle, hashlib, threading, functools
+from collections import OrderedDict
+
+PIPELINE_CACHE_MB = float(os.getenv('PIPELINE_CACHE_MB', 64))
+PIPELINE_CACHE_DIR = os.getenv('PIPELINE_CACHE_DIR', os.path.join('app_cache', 'pipeline'))
+
+MISS = object()
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CODE_DIRS = ('research', 'strategies', 'risk', 'backtest', 'data')
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """Empreinte du contenu des sources du pipeline (et du manifeste des stratégies), calculée
+    une fois par processus : les résultats sur disque d'une version antérieure ne sont plus servis."""
+    h = hashlib.sha1()
+    for d in _CODE_DIRS:
+        for f in sorted(glob.glob(os.path.join(SRC, d, '*.py')) + glob.glob(os.path.join(SRC, d, '*.json'))):
+            try:
+                with open(f, 'rb') as fh: h.update(os.path.basename(f).encode() + fh.read())
+            except OSError:
+                pass
+    return h.hexdigest()[:16]
+
+def config_hash(config: dict) -> str:
+    """Hash stable d'un dict de réglages (clés triées, valeurs non JSON passées par repr)."""
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=repr).encode()).hexdigest()[:16]
+
+def strategy_set(strategies: dict) -> tuple:
+    """Identité d'un jeu de stratégies : (nom, module.fonction) triés."""
+    return tuple(sorted((name, f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}")
+                        for name, fn in strategies.items()))
+
+def pipeline_key(exchange: str, symbol: str, timeframe: str, df, strategies: dict, config: dict) -> str:
+    """Clé du pipeline. La dernière bougie compte par son horodatage et sa clôture (une bougie
+    en cours rafraîchie change donc la clé)."""
+    last = (str(df.index[-1]), float(df['close'].iloc[-1]), len(df)) if len(df) else None
+    raw = repr((exchange, symbol, timeframe, last, strategy_set(strategies), config_hash(config), code_version()))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+class ResultCache:
+    """LRU thread-safe borné par la taille picklée des valeurs, avec niveau disque optionnel."""
+    def __init__(self, max_bytes: int = int(PIPELINE_CACHE_MB * 2**20), disk_dir: str = None,
+                 disk_max_bytes: int = 4 * int(PIPELINE_CACHE_MB * 2**20)):
+        self.max_bytes, self.disk_dir, self.disk_max_bytes = int(max_bytes), disk_dir, int(disk_max_bytes)
+        self._mem = OrderedDict(); self._bytes = 0; self._lock = threading.Lock()
+        self._disk_bytes = None   # total du niveau disque, tenu à jour à chaque écriture (None : inconnu)
+        self.hits = self.misses = self.disk_hits = 0
+
+    def __len__(self):
+        return len(self._mem)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _put_mem(self, key, value, blob: bytes):
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._mem[key] = (value, size); self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, s) = self._mem.popitem(last=False); self._bytes -= s
+
+    def get(self, key: str, default=MISS):
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                self._mem.move_to_end(key); self.hits += 1
+                return item[0]
+        if self.disk_dir:
+            try:
+                with open(self._path(key), 'rb') as f: blob = f.read()
+                value = pickle.loads(blob)
+                with self._lock:
+                    self._put_mem(key, value, blob); self.hits += 1; self.disk_hits += 1
+                return value
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: str, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._put_mem(key, value, blob)
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                path = self._path(key); tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try: replaced = os.path.getsize(path)
+                except OSError: replaced = 0
+                with open(tmp, 'wb') as f: f.write(blob)
+                os.replace(tmp, path)
+                with self._lock:
+                    if self._disk_bytes is not None:
+                        self._disk_bytes += len(blob) - replaced
+                    over = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+                if over:   # listing du dossier seulement au premier passage ou au-delà du budget
+                    self._evict_disk()
+            except OSError:
+                pass
+
+    def _evict_disk(self):
+        """Supprime les fichiers les plus anciens jusqu'à 80 % du budget (le prochain listing
+        n'aura lieu qu'après ~20 % d'écritures) ; recale le total (les autres processus écrivent
+        dans le même dossier)."""
+        files = []
+        for e in os.scandir(self.disk_dir):
+            if e.name.endswith('.pkl'):
+                st = e.stat(); files.append((st.st_mtime, st.st_size, e.path))
+        total = sum(f[1] for f in files)
+        target = 0.8 * self.disk_max_bytes if total > self.disk_max_bytes else total
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try: os.remove(path); total -= size
+            except OSError: pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def get_or_compute(self, key: str, fn, *args, **kw):
+        value = self.get(key)
+        if value is MISS:
+            value = fn(*args, **kw); self.set(key, value)
+        return value
+
+    def clear(self, disk: bool = False):
+        with self._lock:
+            self._mem.clear(); self._bytes = 0
+        if disk and self.disk_dir and os.path.isdir(self.disk_dir):
+            for e in os.scandir(self.disk_dir):
+                if e.name.endswith('.pkl'):
+                    try: os.remove(e.path)
+                    except OSError: pass
+            with self._lock:
+                self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        return {'entries': len(self._mem), 'bytes': self._bytes, 'hits': self.hits,
+                'disk_hits': self.disk_hits, 'misses': self.misses}
+
+PIPELINE_CACHE = ResultCache(disk_dir=PIPELINE_CACHE_DIR or None)
@@ -1,6 +1,8 @@
-import numpy as np
+import os, multiprocessing
+import numpy as np, pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from .backtest import backtest, metrics
-from .ensemble import softmax, blend
+from .ensemble import blended_signal
 
 def score_from_metrics(m):
     # combine Sharpe (0..3+), MaxDD (-1..0), Hit (0..1) -> 0..100
@@ -13,7 +15,73 @@ def score_from_metrics(m):
 def compute_confidence(df, signals: dict, window: int = 800):
     # equal weights ensemble for robustness
     w = {k: 1.0/len(signals) for k in signals}
-    sig = blend(signals, w)
+    sig = blended_signal(signals, pd.Series(w))
     bt = backtest(df.iloc[-window:], sig.iloc[-window:])
     m = metrics(bt)
     return score_from_metrics(m), m  # (0..100), metrics
+
+# ---------- Bootstrap par blocs stationnaire (Politis-Romano) ----------
+PERIODS_PER_YEAR = 365*24
+_CHUNK = 500   # chemins par tâche : découpage fixe -> mêmes résultats quel que soit le nb de workers
+POOL_MIN_PATHS = 20000   # en dessous, lancer un pool de processus coûte plus qu'il ne rapporte
+
+def _score_arrays(sharpe, maxdd, hit):
+    """score_from_metrics, vectorisé."""
+    raw = 0.6*(np.maximum(sharpe, 0.0)/3.0) + 0.25*(1.0 + maxdd) + 0.15*hit
+    return np.clip(100*raw, 0.0, 100.0)
+
+def backtest_score(sharpe, maxdd):
+    """Score 0–100 de scan.confidence_from_backtest : 70 × Sharpe/3 + 30 × (1 − |DD|/0.4), bornés."""
+    s = np.clip(sharpe, 0.0, 3.0); dd = np.minimum(np.abs(maxdd), 0.4)
+    return (s/3.0)*70.0 + (1.0 - dd/0.4)*30.0
+
+def _bootstrap_chunk(pnl, n_paths, block, seed, scorer=_score_arrays):
+    rng = np.random.default_rng(seed); n = len(pnl)
+    new = rng.random((n_paths, n)) < 1.0/block; new[:, 0] = True
+    starts = rng.integers(0, n, size=(n_paths, n))
+    t = np.arange(n)
+    bstart = np.maximum.accumulate(np.where(new, t, 0), axis=1)          # début du bloc courant
+    idx = (np.take_along_axis(starts, bstart, axis=1) + (t - bstart)) % n
+    x = pnl[idx]
+    s = x.std(axis=1, ddof=1)
+    sharpe = np.where(s > 0, x.mean(axis=1)/np.where(s > 0, s, 1.0)*np.sqrt(PERIODS_PER_YEAR), 0.0)
+    eq = np.cumprod(1 + x, axis=1)
+    maxdd = (eq/np.maximum.accumulate(eq, axis=1) - 1).min(axis=1)
+    hit = (x > 0).mean(axis=1)
+    return np.column_stack([sharpe, maxdd, scorer(sharpe, maxdd, hit)])
+
+def bootstrap_pnl(pnl, n_paths: int = 2000, block: float = 24, seed: int = 42, workers: int = None,
+                  q=(5, 50, 95), scorer=_score_arrays) -> dict:
+    """Rééchantillonne une série de PnL en n_paths chemins (blocs de longueur moyenne `block`)
+    et renvoie les quantiles `q` de Sharpe, MaxDD et du score 0–100. Reproductible via `seed`
+    (résultats identiques quel que soit `workers`).
+    workers=None : pool de processus à partir de POOL_MIN_PATHS chemins, sinon en série.
+    scorer(sharpe, maxdd, hit) : score vectorisé de chaque chemin (_score_arrays, c.-à-d.
+    score_from_metrics, par défaut) ; fonction de module pour pouvoir passer au pool."""
+    pnl = np.nan_to_num(np.asarray(pnl, dtype=float))
+    if len(pnl) < 2:
+        return {k: tuple(float('nan') for _ in q) for k in ('sharpe', 'maxdd', 'score')}
+    sizes = [min(_CHUNK, n_paths - i) for i in range(0, n_paths, _CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(sizes)) if n_paths >= POOL_MIN_PATHS else 1
+    if workers > 1 and len(sizes) > 1:
+        # forkserver/spawn : pas de fork d'un processus qui a d'autres threads (voir scan._process_pool)
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method)) as pool:
+            parts = list(pool.map(_bootstrap_chunk, [pnl]*len(sizes), sizes, [block]*len(sizes), seeds,
+                                      [scorer]*len(sizes)))
+    else:
+        parts = [_bootstrap_chunk(pnl, k, block, sd, scorer) for k, sd in zip(sizes, seeds)]
+    res = np.percentile(np.vstack(parts), q, axis=0)
+    return {k: tuple(float(v) for v in res[:, j]) for j, k in enumerate(('sharpe', 'maxdd', 'score'))}
+
+def bootstrap_confidence(df, signals: dict, window: int = 800, **kw) -> dict:
+    """Même ensemble que compute_confidence, plus des intervalles de confiance par bootstrap."""
+    w = {k: 1.0/len(signals) for k in signals}
+    sig = blended_signal(signals, pd.Series(w))
+    bt = backtest(df.iloc[-window:], sig.iloc[-window:])
+    out = bootstrap_pnl(bt['pnl'].to_numpy(), **kw)
+    out['point'] = score_from_metrics(metrics(bt))
+    return out
+
@@ -0,0 +1,114 @@
+"""Scanner Top Picks headless (sans Streamlit), calé sur les clôtures de bougies.
+
+    python -m src.research.daemon --once                     # un scan par timeframe puis sortie
+    python -m src.research.daemon --timeframes 1h 4h         # boucle : scan après chaque clôture
+
+Même pipeline que l'onglet Top Picks (scan -> select_picks, caps d'exposition, de positions et
+budget de volatilité) ; les picks retenus sont écrits en base (scan_runs / picks) et l'UI se
+contente de les relire.
+"""
+import os, time, signal, logging, argparse
+import pandas as pd
+from ..data.loader import timeframe_seconds
+from ..data.resample import bucket_start
+from .scan import scan
+from ..risk.portfolio import select_picks
+from ..storage.db import save_picks, list_positions
+
+log = logging.getLogger("helios.scanner")
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_STOP = False
+
+def _read_cfg(path: str = None) -> dict:
+    try:
+        import yaml
+        with open(path or os.path.join(ROOT, "configs", "default.yml")) as f: return yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+
+def last_close(timeframe: str, now: float = None) -> pd.Timestamp:
+    """Ouverture de la bougie en cours = clôture de la dernière bougie terminée (UTC). Bornes
+    des exchanges : semaines au lundi 00:00 UTC, mois au 1er (voir data/resample.bucket_start)."""
+    now = time.time() if now is None else now
+    return pd.Timestamp(int(bucket_start([int(now * 1000)], timeframe)[0]), unit="ms", tz="UTC")
+
+def next_close(timeframe: str, now: float = None) -> float:
+    """Epoch (s) de la prochaine clôture de `timeframe`."""
+    step = timeframe_seconds(timeframe) * 1000
+    cur = int(last_close(timeframe, now).value // 10**6)
+    # un peu plus d'un pas après l'ouverture : bougie suivante, y compris pour les mois de 31 jours
+    return int(bucket_start([cur + step + step // 15], timeframe)[0]) // 1000
+
+def run_once(exchange: str, symbols, timeframe: str, max_pos: int = 5, cpu_workers: int = None,
+             max_expo: float = 80.0, vol_budget: float = 2.0, **params) -> int:
+    """Scanne `symbols`, sélectionne les picks sous les caps du portefeuille (positions ouvertes
+    comprises) et les enregistre. Retourne l'id du run."""
+    t0 = time.perf_counter(); rows = []; errors = 0
+    for sym, row, err in scan(exchange, symbols, timeframe, cpu_workers=cpu_workers, **params):
+        if err is not None:
+            errors += 1; log.warning("%s %s: %s", timeframe, sym, err)
+        elif row:
+            rows.append(row)
+    picks, pf = select_picks(rows, exchange, timeframe, params.get("capital", 1000.0), max_expo=max_expo,
+                             max_pos=max_pos, vol_budget=vol_budget, existing=list_positions("OPEN"))
+    dt = time.perf_counter() - t0
+    run_id = save_picks(exchange, timeframe, last_close(timeframe), picks, n_symbols=len(symbols), duration_s=dt,
+                        params=dict(params, max_pos=max_pos, max_expo=max_expo, vol_budget=vol_budget, portfolio=pf))
+    log.info("%s %s : %d symboles, %d picks (expo %.0f %%, vol %.2f %%/j), %d erreurs en %.1fs (run %d)",
+             exchange, timeframe, len(symbols), len(picks), pf["gross_pct"], pf["vol_day_pct"], errors, dt, run_id)
+    return run_id
+
+def run_forever(exchange: str, symbols, timeframes, delay: float = 5.0, **kw):
+    """Boucle : pour chaque timeframe, un scan `delay` secondes après chaque clôture
+    (le temps que l'exchange publie la bougie). S'arrête proprement sur SIGINT/SIGTERM."""
+    global _STOP
+    _STOP = False
+    def _stop(*_):
+        global _STOP
+        _STOP = True; log.info("arrêt demandé")
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, _stop)
+    due = {tf: next_close(tf) + delay for tf in timeframes}
+    while not _STOP:
+        tf, at = min(due.items(), key=lambda kv: kv[1])
+        while not _STOP and time.time() < at:
+            time.sleep(min(1.0, at - time.time()))
+        if _STOP:
+            break
+        try:
+            run_once(exchange, symbols, tf, **kw)
+        except Exception:
+            log.exception("scan %s échoué", tf)
+        due[tf] = next_close(tf) + delay
+
+def main(argv=None):
+    cfg = _read_cfg(); app = cfg.get("app", {}); risk = cfg.get("risk", {})
+    p = argparse.ArgumentParser(description="Scanner Top Picks headless")
+    p.add_argument("--exchange", default=app.get("exchange", "okx"))
+    p.add_argument("--symbols", nargs="+", default=app.get("symbols") or ["BTC/USDT", "ETH/USDT"])
+    p.add_argument("--timeframes", nargs="+", default=app.get("timeframes") or ["1h"])
+    p.add_argument("--mode", default="Balanced", help="preset de configs/default.yml (risk_modes)")
+    p.add_argument("--capital", type=float, default=1000.0)
+    p.add_argument("--max-pos", type=int, default=None, help="nb max de positions (preset max_positions par défaut)")
+    p.add_argument("--max-expo", type=float, default=None, help="exposition brute max, %% du capital (preset max_gross_pct)")
+    p.add_argument("--vol-budget", type=float, default=2.0, help="volatilité max du portefeuille, %% du capital par jour")
+    p.add_argument("--cpu-workers", type=int, default=None)
+    p.add_argument("--delay", type=float, default=5.0, help="secondes après la clôture avant de scanner")
+    p.add_argument("--once", action="store_true", help="un scan par timeframe puis sortie")
+    a = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    preset = (cfg.get("risk_modes") or {}).get(a.mode, {})
+    params = dict(min_rr=float(preset.get("min_rr", 1.5)), risk_pct=float(preset.get("risk_pct", 1.0)),
+                  capital=a.capital, atr_k_sl=float(risk.get("atr_k_sl", 2.5)), atr_k_tp=float(risk.get("atr_k_tp", 3.5)),
+                  ensemble_window=int(app.get("ensemble_window") or 300))
+    caps = dict(max_pos=a.max_pos or int(preset.get("max_positions", app.get("top_k", 5))),
+                max_expo=a.max_expo or float(preset.get("max_gross_pct", 80.0)), vol_budget=a.vol_budget)
+    if a.once:
+        for tf in a.timeframes:
+            run_once(a.exchange, a.symbols, tf, cpu_workers=a.cpu_workers, **caps, **params)
+    else:
+        run_forever(a.exchange, a.symbols, a.timeframes, delay=a.delay, cpu_workers=a.cpu_workers, **caps, **params)
+
+if __name__ == "__main__":
+    main()
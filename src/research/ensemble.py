@@ -1,21 +1,8 @@
 import numpy as np
 import pandas as pd
-from ..backtest.engine import compute
+from ..backtest.engine import run
 from ..backtest.metrics import sharpe, max_drawdown
 
-def _score(pnl: pd.Series, equity: pd.Series) -> float:
-    # score simple et robuste : Sharpe + (−|MaxDD|)
-    try:
-        s = float(sharpe(pnl))
-    except Exception:
-        s = 0.0
-    try:
-        dd = float(max_drawdown(equity))
-    except Exception:
-        dd = 0.0
-    # dd est négatif (ex: -0.35). On préfère un drawdown moins profond.
-    return s + (1.0 + dd)  # plus grand = mieux
-
 def ensemble_weights(df: pd.DataFrame, signals: dict, window: int = 300) -> pd.Series:
     """Calcule des poids (softmax) pour chaque stratégie selon sa perf récente."""
     if not signals:
@@ -23,30 +10,58 @@ def ensemble_weights(df: pd.DataFrame, signals: dict, window: int = 300) -> pd.S
     # aligne / tronque
     end = len(df)
     start = max(0, end - int(window))
-    scores = {}
-    for name, sig in signals.items():
-        try:
-            pnl, equity = None, None
-            # compute() renvoie (ret, pos, pnl, equity)
-            _, _, pnl, equity = compute(df.iloc[start:end], sig.iloc[start:end])
-            scores[name] = _score(pnl, equity)
-        except Exception:
-            scores[name] = -1e9  # très mauvais si erreur
-    keys = list(scores.keys())
-    arr = np.array([scores[k] for k in keys], dtype=float)
+    keys = list(signals.keys())
+    sub = df.iloc[start:end]
+    pos = pd.concat([signals[k] for k in keys], axis=1).reindex(sub.index).to_numpy(dtype=float)
+    # toutes les stratégies backtestées en un appel (temps × stratégies)
+    res = run(sub["close"], pos)
+    # score simple et robuste : Sharpe + (1 − |MaxDD|), dd est négatif (ex: -0.35)
+    arr = np.atleast_1d(sharpe(res["pnl"])) + (1.0 + np.atleast_1d(max_drawdown(res["equity"])))
+    arr = np.where(np.isfinite(arr), arr, -1e9)  # très mauvais si non calculable
     # softmax stable
     arr = arr - np.nanmax(arr)
     w = np.exp(arr)
     w = w / np.nansum(w) if np.nansum(w) != 0 else np.ones_like(w)/len(w)
     return pd.Series(w, index=keys)
 
-def blended_signal(signals: dict, weights: pd.Series) -> pd.Series:
-    """Combine les signaux (−1..+1) selon les poids fournis et clippe en [−1, +1]."""
+def walk_forward_weights(df: pd.DataFrame, signals: dict, window: int = 300, fee_bps: float = 2.0,
+                         slippage_bps: float = 1.0, periods_per_year: float = 365*24) -> pd.DataFrame:
+    """Poids softmax variables dans le temps (sans look-ahead) : à chaque bougie t, chaque
+    stratégie est notée sur ses `window` dernières bougies de PnL connues en t.
+    Score = Sharpe glissant + (1 + pire drawdown de la fenêtre, mesuré depuis le plus haut
+    courant de l'equity). Tout est calculé en une passe sur la matrice PnL (temps × stratégies) ;
+    avant `window` bougies d'historique, poids égaux."""
+    if not signals:
+        return pd.DataFrame(index=df.index)
+    keys = list(signals.keys())
+    sig = pd.concat(signals.values(), axis=1).reindex(df.index).fillna(0.0).to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+    ret = np.zeros(len(close)); ret[1:] = close[1:] / close[:-1] - 1
+    pos = np.zeros_like(sig); pos[1:] = np.clip(sig[:-1], -1, 1)
+    cost = np.zeros_like(pos); cost[1:] = np.abs(np.diff(pos, axis=0))
+    pnl = pd.DataFrame(pos * np.nan_to_num(ret)[:, None] - cost * ((fee_bps + slippage_bps) / 10000.0))
+    roll = pnl.rolling(int(window), min_periods=int(window))
+    mean, std = roll.mean().to_numpy(), roll.std().to_numpy()
+    sharpe = np.where(std > 0, mean / np.where(std > 0, std, 1.0) * np.sqrt(periods_per_year), 0.0)
+    equity = np.cumprod(1 + pnl.to_numpy(), axis=0)
+    dd = pd.DataFrame(equity / np.maximum.accumulate(equity, axis=0) - 1)
+    worst_dd = dd.rolling(int(window), min_periods=1).min().to_numpy()
+    score = np.where(np.isnan(mean), 0.0, sharpe + (1.0 + worst_dd))
+    score = score - score.max(axis=1, keepdims=True)   # softmax stable, ligne par ligne
+    w = np.exp(score)
+    return pd.DataFrame(w / w.sum(axis=1, keepdims=True), index=df.index, columns=keys)
+
+def blended_signal(signals: dict, weights) -> pd.Series:
+    """Combine les signaux (−1..+1) selon les poids fournis et clippe en [−1, +1].
+    weights : pd.Series (poids fixes) ou pd.DataFrame temps × stratégies (walk_forward_weights)."""
     if not signals:
         return pd.Series(dtype=float, name="signal")
     df = pd.concat(signals.values(), axis=1).fillna(0.0)
     df.columns = list(signals.keys())
-    w = weights.reindex(df.columns).fillna(0.0).values.reshape(1, -1)
+    if isinstance(weights, pd.DataFrame):
+        w = weights.reindex(index=df.index, columns=df.columns).fillna(0.0).values
+    else:
+        w = weights.reindex(df.columns).fillna(0.0).values.reshape(1, -1)
     pos = (df.values * w).sum(axis=1)
     out = pd.Series(pos, index=df.index, name="signal").clip(-1, 1)
     return out
\ No newline at end of file
@@ -1,18 +1,19 @@
+import os, json, threading
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from ..tracing import span, count
 
-def kmeans_regime(df: pd.DataFrame, n_clusters: int = 3, lookback: int = 400) -> pd.Series:
-    """Clustering de régime simple (ret, vol, trend). Retourne une série de labels."""
-    X = pd.DataFrame({
+REGIME_DIR = os.path.join("app_cache", "regime")
+_WINDOWS = {"ret": 5, "vol": 20, "trend": 50}
+
+def _features(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
         "ret": df["close"].pct_change().rolling(5).mean(),
         "vol": df["close"].pct_change().rolling(20).std(),
         "trend": df["close"].pct_change().rolling(50).mean(),
     }).dropna()
-    if len(X) < 20:
-        return pd.Series(["neutral"] * len(df), index=df.index)
-    X = X.iloc[-lookback:]
-    km = KMeans(n_clusters=n_clusters, n_init=5, random_state=42)
-    labels = km.fit_predict(X)
+
+def _label_mapping(X: pd.DataFrame, labels, n_clusters: int) -> dict:
     stats = X.copy()
     stats["cluster"] = labels
     g = stats.groupby("cluster").agg({"trend": "mean", "vol": "mean"})
@@ -21,6 +22,162 @@ def kmeans_regime(df: pd.DataFrame, n_clusters: int = 3, lookback: int = 400) ->
     for c in range(n_clusters):
         if c not in mapping:
             mapping[c] = "high_vol" if c == hv else "neutral"
+    return {int(k): v for k, v in mapping.items()}
+
+def kmeans_regime(df: pd.DataFrame, n_clusters: int = 3, lookback: int = 400) -> pd.Series:
+    """Clustering de régime simple (ret, vol, trend). Retourne une série de labels."""
+    X = _features(df)
+    if len(X) < 20:
+        return pd.Series(["neutral"] * len(df), index=df.index)
+    X = X.iloc[-lookback:]
+    from sklearn.cluster import KMeans   # import lourd, différé au premier fit
+    km = KMeans(n_clusters=n_clusters, n_init=5, random_state=42)
+    labels = km.fit_predict(X)
+    mapping = _label_mapping(X, labels, n_clusters)
     names = [mapping[int(i)] for i in labels]
     ser = pd.Series(index=X.index, data=names).reindex(df.index).ffill().fillna("neutral")
-    return ser
\ No newline at end of file
+    return ser
+
+# ---------- Modèle persistant (centroïdes + mapping), assignation O(k) ----------
+def _last_features(close: np.ndarray) -> np.ndarray:
+    """(ret, vol, trend) de la dernière bougie à partir des 51 dernières clôtures."""
+    r = close[1:] / close[:-1] - 1
+    return np.array([r[-5:].mean(), r[-20:].std(ddof=1), r[-50:].mean()])
+
+class RegimeModel:
+    """Centroïdes KMeans figés entre deux refits. Les nouvelles bougies sont assignées au
+    centroïde le plus proche puis l'ajustent (k-means séquentiel) ; tous les `refit_every`
+    bougies, refit KMeans initialisé sur les centroïdes courants, ce qui garde les labels stables."""
+    def __init__(self, n_clusters: int = 3, lookback: int = 400, refit_every: int = 100):
+        self.n_clusters, self.lookback, self.refit_every = n_clusters, lookback, refit_every
+        self.centroids = None; self.counts = None; self.mapping = {}
+        self.last_ts = None; self.last_label = "neutral"; self.since_fit = 0
+
+    def fit(self, df: pd.DataFrame) -> "RegimeModel":
+        X = _features(df)
+        if len(X) < 20:
+            return self
+        X = X.iloc[-self.lookback:]
+        from sklearn.cluster import KMeans
+        if self.centroids is None:
+            km = KMeans(n_clusters=self.n_clusters, n_init=5, random_state=42)
+            labels = km.fit_predict(X)
+            self.mapping = _label_mapping(X, labels, self.n_clusters)
+        else:   # warm start : les clusters gardent leur identité, donc leur nom
+            km = KMeans(n_clusters=self.n_clusters, init=self.centroids, n_init=1)
+            labels = km.fit_predict(X)
+        self.centroids = km.cluster_centers_
+        self.counts = np.bincount(labels, minlength=self.n_clusters).astype(float)
+        self.last_ts = X.index[-1]; self.last_label = self.mapping[int(labels[-1])]
+        self.since_fit = 0
+        return self
+
+    def _assign(self, x: np.ndarray) -> int:
+        return int(((self.centroids - x) ** 2).sum(axis=1).argmin())
+
+    def update(self, df: pd.DataFrame) -> str:
+        """Label de la dernière bougie ; ne traite que les bougies postérieures à last_ts."""
+        if self.centroids is None:
+            return self.fit(df).last_label
+        if df.index[-1] == self.last_ts:
+            return self.last_label
+        if df.index[-1] < self.last_ts:   # historique en retard sur le modèle (cache périmé, autre worker)
+            return self.label_last(df)
+        new = len(df) - int(df.index.searchsorted(self.last_ts, side="right"))
+        if new <= 0:
+            return self.last_label
+        if self.since_fit + new >= self.refit_every:
+            return self.fit(df).last_label
+        close = df["close"].to_numpy(dtype=float)
+        need = _WINDOWS["trend"] + 1
+        for end in range(len(close) - new + 1, len(close) + 1):
+            if end < need:
+                continue
+            x = _last_features(close[end - need:end])
+            c = self._assign(x)
+            self.counts[c] += 1
+            self.centroids[c] += (x - self.centroids[c]) / self.counts[c]
+            self.last_label = self.mapping.get(c, "neutral")
+        self.last_ts = df.index[-1]; self.since_fit += new
+        return self.last_label
+
+    def label_last(self, df: pd.DataFrame) -> str:
+        """Label de la dernière bougie de `df`, sans toucher aux centroïdes."""
+        need = _WINDOWS["trend"] + 1
+        if self.centroids is None or len(df) < need:
+            return "neutral"
+        x = _last_features(df["close"].to_numpy(dtype=float)[-need:])
+        return self.mapping.get(self._assign(x), "neutral")
+
+    def predict(self, df: pd.DataFrame) -> pd.Series:
+        """Labels de toutes les bougies par centroïde le plus proche (sans refit)."""
+        X = _features(df)
+        if self.centroids is None or X.empty:
+            return pd.Series(["neutral"] * len(df), index=df.index)
+        d = ((X.to_numpy()[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        names = [self.mapping.get(int(i), "neutral") for i in d.argmin(axis=1)]
+        return pd.Series(names, index=X.index).reindex(df.index).ffill().fillna("neutral")
+
+    def to_dict(self) -> dict:
+        return {"n_clusters": self.n_clusters, "lookback": self.lookback, "refit_every": self.refit_every,
+                "centroids": None if self.centroids is None else self.centroids.tolist(),
+                "counts": None if self.counts is None else self.counts.tolist(),
+                "mapping": {str(k): v for k, v in self.mapping.items()},
+                "last_ts": None if self.last_ts is None else str(self.last_ts),
+                "last_label": self.last_label, "since_fit": self.since_fit}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RegimeModel":
+        m = cls(d["n_clusters"], d["lookback"], d["refit_every"])
+        if d.get("centroids") is not None:
+            m.centroids = np.array(d["centroids"], dtype=float); m.counts = np.array(d["counts"], dtype=float)
+        m.mapping = {int(k): v for k, v in d.get("mapping", {}).items()}
+        m.last_ts = pd.Timestamp(d["last_ts"]) if d.get("last_ts") else None
+        m.last_label = d.get("last_label", "neutral"); m.since_fit = d.get("since_fit", 0)
+        return m
+
+_MODELS = {}   # (symbol, timeframe) -> RegimeModel
+_UNSAVED = {}  # (symbol, timeframe) -> bougies traitées depuis la dernière sauvegarde
+_MODEL_LOCKS = {}   # (symbol, timeframe) -> verrou : mise à jour et sauvegarde d'un modèle
+_LOCK = threading.Lock()
+
+def _model_path(symbol: str, timeframe: str) -> str:
+    return os.path.join(REGIME_DIR, f"{symbol.replace('/','-')}_{timeframe}.json")
+
+def _save(model: RegimeModel, path: str):
+    try:
+        os.makedirs(REGIME_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f: json.dump(model.to_dict(), f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def regime_now(df: pd.DataFrame, symbol: str, timeframe: str, n_clusters: int = 3,
+               lookback: int = 400, refit_every: int = 100, save_every: int = 10) -> str:
+    """Régime courant via le modèle persistant de (symbol, timeframe) : fit au premier appel,
+    assignation O(k) ensuite, refit warm-start périodique. Le modèle est sauvegardé après
+    chaque fit et toutes les `save_every` bougies traitées en incrémental, pour que les
+    workers et le daemon repartent d'un modèle à jour après un redémarrage."""
+    key = (symbol, timeframe); path = _model_path(symbol, timeframe)
+    with _LOCK:
+        lock = _MODEL_LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        model = _MODELS.get(key)
+        if model is None:
+            try:
+                with open(path) as f: model = RegimeModel.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                model = RegimeModel(n_clusters, lookback, refit_every)
+            _MODELS[key] = model
+        since = model.since_fit; had = model.centroids is not None
+        with span('research.regime'):
+            label = model.update(df)
+        if model.since_fit < since or (model.centroids is not None and not had):   # (re)fit : on persiste
+            count('regime.fit'); _save(model, path); _UNSAVED[key] = 0
+        else:
+            count('regime.incremental')
+            _UNSAVED[key] = _UNSAVED.get(key, 0) + model.since_fit - since
+            if _UNSAVED[key] >= save_every:
+                _save(model, path); _UNSAVED[key] = 0
+    return label
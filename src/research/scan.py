@@ -0,0 +1,198 @@
+"""Moteur de scan Top Picks, utilisable depuis l'UI ou en headless.
+
+Les téléchargements tournent dans un pool de threads borné, l'analyse (signaux, régime,
+ensemble, niveaux, confiance) dans un pool de processus ; chaque symbole est renvoyé dès
+qu'il est terminé.
+"""
+import os, atexit, functools, multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np, pandas as pd
+from ..data.loader import load_or_fetch
+from ..data.store import STORE, open_store
+from ..data.resample import load as resampled_load
+from ..risk.levels import levels_from_signal, position_size
+from .ensemble import ensemble_weights, walk_forward_weights, blended_signal
+from .confidence import bootstrap_pnl, backtest_score
+from .cache import PIPELINE_CACHE, MISS, pipeline_key
+from .. import tracing as trace
+from ..tracing import span
+
+_POOLS = {}
+
+def _process_pool(n: int) -> ProcessPoolExecutor:
+    """Pool de processus partagé (réutilisé d'un scan à l'autre). Workers lancés par forkserver
+    (spawn sous Windows/macOS) : un fork hériterait des verrous tenus par les autres threads
+    (threads I/O du scan, serveur Streamlit, moniteur TP/SL, tracing, ccxt) et pourrait bloquer."""
+    pool = _POOLS.get(n)
+    if pool is None:
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context('forkserver')
+            ctx.set_forkserver_preload([__name__])   # imports faits une fois dans le serveur
+        else:
+            ctx = multiprocessing.get_context('spawn')
+        pool = _POOLS[n] = ProcessPoolExecutor(max_workers=n, mp_context=ctx)
+    return pool
+
+@atexit.register
+def _shutdown_pools():
+    for pool in _POOLS.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _POOLS.clear()
+
+def rr_from_levels(entry, sl, tp):
+    R = abs(entry - sl)
+    return float(abs(tp - entry) / (R if R>0 else 1e-9))
+
+def _signal_backtest(df, sig):
+    """Backtest du signal retenu (None si l'historique est trop court ou le moteur absent)."""
+    try:
+        from ..backtest.engine import backtest
+    except Exception:
+        return None
+    if len(df) < 100:
+        return None
+    return backtest(df, sig, initial_cash=1.0, fee_bps=2.0, slippage_bps=1.0)
+
+def _confidence(bt):
+    from ..backtest.metrics import sharpe, max_drawdown
+    return round(float(backtest_score(sharpe(bt["pnl"]), max_drawdown(bt["equity"]))), 1)
+
+def _path_score(sharpe, maxdd, hit):
+    """Score d'un chemin du bootstrap, même formule que la confiance."""
+    return backtest_score(sharpe, maxdd)
+
+def confidence_from_backtest(df, sig):
+    bt = _signal_backtest(df, sig)
+    return 50.0 if bt is None else _confidence(bt)
+
+def analyse_symbol(symbol: str, df: pd.DataFrame, strategies: dict = None, min_rr: float = 1.5,
+                   capital: float = 1000.0, risk_pct: float = 1.0, atr_k_sl: float = 2.5,
+                   atr_k_tp: float = 3.5, ensemble_window: int = 300, bootstrap_paths: int = 1000,
+                   timeframe: str = "1h"):
+    """Pipeline d'un symbole. Retourne une ligne Top Picks, ou None si pas de trade.
+    Chaque étape est tracée (src/tracing.py) et attribuée au symbole."""
+    if strategies is None:
+        from ..strategies import ALL as strategies
+    with trace.symbol(symbol), span("research.analyse_symbol"):
+        with span("research.signals"):
+            sigs = {name: fn(df) for name, fn in strategies.items()}
+        try:
+            from .regime import regime_now
+            reg_now = regime_now(df, symbol, timeframe)
+        except ImportError:
+            reg_now = "neutral"
+        with span("research.ensemble_weights"):
+            w = ensemble_weights(df, sigs, window=int(ensemble_window))
+            sig = blended_signal(sigs, w)
+        d = int(sig.iloc[-1])
+        if d == 0:
+            return None
+        lvl = levels_from_signal(df, d, sl_mult=float(atr_k_sl), tp_mult=float(atr_k_tp))
+        if not lvl:
+            return None
+        rr = rr_from_levels(lvl["entry"], lvl["sl"], lvl["tp"])
+        if rr < min_rr:
+            return None
+        # confiance et son intervalle sur l'ensemble walk-forward (poids connus à chaque bougie) :
+        # les poids de `sig`, estimés sur les dernières bougies et appliqués à tout l'historique,
+        # donneraient un backtest avec look-ahead
+        with span("research.confidence_backtest"):
+            wf = blended_signal(sigs, walk_forward_weights(df, sigs, window=int(ensemble_window)))
+            bt = _signal_backtest(df, wf)
+            conf = 50.0 if bt is None else _confidence(bt)
+        # intervalle de confiance 90 % de ce même score : PnL rééchantillonné par blocs (seed fixe),
+        # chaque chemin noté comme `conf` ; en série, le scan parallélise déjà par symbole
+        ci = (np.nan,)*3
+        if bootstrap_paths and bt is not None:
+            with span("research.bootstrap_confidence"):
+                ci = bootstrap_pnl(bt["pnl"].to_numpy(), n_paths=bootstrap_paths, workers=1,
+                                   scorer=_path_score)["score"]
+        return {
+            "symbol": symbol,
+            "dir": "LONG" if d>0 else "SHORT",
+            "entry": lvl["entry"], "sl": lvl["sl"], "tp": lvl["tp"],
+            "rr": rr, "qty": position_size(capital, lvl["entry"], lvl["sl"], risk_pct),
+            "confiance": conf, "regime": reg_now,
+            "score_p5": ci[0], "score_p95": ci[-1],
+        }
+
+def _analyse_traced(*a, **kw):
+    """analyse_symbol dans un worker : renvoie aussi les événements de trace à fusionner."""
+    with trace.collect() as c:
+        row = analyse_symbol(*a, **kw)
+    return row, c.events, c.counters
+
+def _share(store, exchange, symbol, timeframe, df):
+    """Publie `df` dans le magasin mappé et renvoie la poignée que le worker attache (le
+    DataFrame n'est plus picklé vers chaque processus)."""
+    bars = store.attach(exchange, symbol, timeframe)
+    if (bars is None or len(bars) < len(df) or bars.last_ts != df.index[-1]
+            or bars['close'][-1] != bars['close'].dtype.type(df['close'].iloc[-1])):
+        store.append(exchange, symbol, timeframe, df)
+    return (store.root, exchange, symbol, timeframe, df.index[0], df.index[-1])
+
+def _analyse_shared(handle, *a, **kw):
+    root, exchange, symbol, timeframe, start, end = handle
+    df = open_store(root).frame(exchange, symbol, timeframe, start=start, end=end)
+    return _analyse_traced(symbol, df, *a, **kw)
+
+def scan(exchange: str, symbols, timeframe: str, limit: int = 2500, io_workers: int = 8,
+         cpu_workers: int = None, strategies: dict = None, cache=None, loader=None, store=None, **params):
+    """Scanne `symbols` et génère (symbol, ligne | None, erreur | None) au fil de l'eau.
+    cpu_workers <= 1 : analyse dans le thread appelant (les fetchs restent concurrents).
+    cache : ResultCache (PIPELINE_CACHE par défaut, False pour désactiver) ; un symbole dont
+    la dernière bougie et les réglages n'ont pas changé n'est pas ré-analysé.
+    loader(exchange, symbol, timeframe, limit=...) remplace load_or_fetch (données hors ligne).
+    store : MarketStore qui sert les séries (agrégées depuis la base, voir data/resample.py) et
+    les passe aux workers en memmap ; STORE par défaut, False pour load_or_fetch + pickle."""
+    symbols = list(symbols)
+    if not symbols:
+        return
+    if strategies is None:
+        from ..strategies import ALL as strategies
+    cache = PIPELINE_CACHE if cache is None else (cache or None)
+    cpu_workers = (os.cpu_count() or 1) if cpu_workers is None else int(cpu_workers)
+    cpu = _process_pool(cpu_workers) if cpu_workers > 1 else None
+    store = STORE if store is None else (store or None)
+    with ThreadPoolExecutor(max_workers=max(1, min(int(io_workers), len(symbols)))) as io:
+        loader = loader or (functools.partial(resampled_load, store=store) if store is not None else load_or_fetch)
+        pending = {io.submit(loader, exchange, s, timeframe, limit=limit): ("fetch", s, None) for s in symbols}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                kind, sym, key = pending.pop(fut)
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    yield sym, None, e; continue
+                if kind == "analyse":
+                    res, events, counters = res; trace.merge(events, counters)
+                    if cache is not None: cache.set(key, res)
+                    yield sym, res, None; continue
+                if cache is not None:
+                    key = pipeline_key(exchange, sym, timeframe, res, strategies, dict(params, limit=limit))
+                    row = cache.get(key)
+                    if row is not MISS:
+                        trace.count("pipeline_cache.hit"); yield sym, row, None; continue
+                    trace.count("pipeline_cache.miss")
+                if cpu is not None:
+                    if store is not None and len(res):
+                        fut = cpu.submit(_analyse_shared, _share(store, exchange, sym, timeframe, res), strategies,
+                                         timeframe=timeframe, **params)
+                    else:
+                        fut = cpu.submit(_analyse_traced, sym, res, strategies, timeframe=timeframe, **params)
+                    pending[fut] = ("analyse", sym, key)
+                    continue
+                try:
+                    row = analyse_symbol(sym, res, strategies, timeframe=timeframe, **params)
+                except Exception as e:
+                    yield sym, None, e; continue
+                if cache is not None: cache.set(key, row)
+                yield sym, row, None
+
+def rank_picks(rows, k: int = 5) -> pd.DataFrame:
+    """Trie les lignes du scan (confiance puis R/R) et garde les k meilleures."""
+    rows = [r for r in rows if r]
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values(["confiance","rr"], ascending=False).head(k)
@@ -0,0 +1,96 @@
+"""Balayage de paramètres vectorisé : chaque grille est évaluée comme une matrice
+(temps × jeu de paramètres), puis backtestée en une opération NumPy.
+
+Mêmes signaux que les fonctions de src/strategies ; backtest et métriques via src/backtest
+(mêmes formules que src/research/backtest).
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np, pandas as pd
+from ..data.features import feature
+from ..backtest.engine import run
+from ..backtest.metrics import sharpe, max_drawdown, hit_rate
+
+def _cmp(a, b):
+    return (a > b).astype(np.int8) - (a < b).astype(np.int8)
+
+def _col(vectors: dict, keys):
+    return np.column_stack([vectors[k] for k in keys])
+
+# ---------- Matrices de signaux (n_bars × n_combos) ----------
+def _ema_trend(df, p):
+    ema = {s: feature(df, 'ema', span=int(s)).to_numpy(dtype=float) for s in set(p['fast']) | set(p['slow'])}
+    return _cmp(_col(ema, p['fast']), _col(ema, p['slow']))
+
+def _macd(df, p):
+    out = np.empty((len(df), len(p)), dtype=np.int8)
+    ema = {s: feature(df, 'ema', span=int(s)).to_numpy(dtype=float) for s in set(p['fast']) | set(p['slow'])}
+    macd = np.column_stack([ema[f] - ema[s] for f, s in zip(p['fast'], p['slow'])])
+    for span, idx in p.groupby('signal').indices.items():
+        sig = pd.DataFrame(macd[:, idx]).ewm(span=int(span), adjust=False).mean().to_numpy()
+        out[:, idx] = _cmp(macd[:, idx], sig)
+    return out
+
+def _donchian(df, p):
+    close = df['close'].to_numpy(dtype=float)[:, None]
+    hh = {w: feature(df, 'rolling_max', window=int(w)).shift().to_numpy(dtype=float) for w in set(p['lookback'])}
+    ll = {w: feature(df, 'rolling_min', window=int(w)).shift().to_numpy(dtype=float) for w in set(p['lookback'])}
+    return (close > _col(hh, p['lookback'])).astype(np.int8) - (close < _col(ll, p['lookback'])).astype(np.int8)
+
+def _boll_mr(df, p):
+    close = df['close'].to_numpy(dtype=float)[:, None]
+    ma = _col({w: feature(df, 'sma', window=int(w)).to_numpy(dtype=float) for w in set(p['length'])}, p['length'])
+    std = _col({w: feature(df, 'rolling_std', window=int(w)).to_numpy(dtype=float) for w in set(p['length'])}, p['length'])
+    mult = p['mult'].to_numpy(dtype=float)
+    return (close < ma - mult*std).astype(np.int8) - (close > ma + mult*std).astype(np.int8)
+
+def _atr_channel(df, p):
+    close = df['close'].to_numpy(dtype=float)[:, None]
+    ema = _col({w: feature(df, 'ema', span=int(w)).to_numpy(dtype=float) for w in set(p['length'])}, p['length'])
+    atr = _col({w: feature(df, 'atr', length=int(w)).to_numpy(dtype=float) for w in set(p['length'])}, p['length'])
+    mult = p['mult'].to_numpy(dtype=float)
+    return (close > ema + mult*atr).astype(np.int8) - (close < ema - mult*atr).astype(np.int8)
+
+def _supertrend(df, p):
+    from ..strategies.supertrend import supertrend_matrix
+    return supertrend_matrix(df, p['period'].to_numpy(), p['mult'].to_numpy())
+
+MATRIX = {'ema_trend': _ema_trend, 'macd': _macd, 'donchian': _donchian, 'boll_mr': _boll_mr,
+          'atr_channel': _atr_channel, 'supertrend': _supertrend}
+
+def signal_matrix(df: pd.DataFrame, strategy, combos: pd.DataFrame) -> np.ndarray:
+    """Signaux de `strategy` (nom de module ou fonction de signal) pour chaque ligne de combos.
+    Stratégies sans version matricielle : une colonne par appel de la fonction."""
+    name = strategy if isinstance(strategy, str) else strategy.__module__.rsplit('.', 1)[-1]
+    if name in MATRIX:
+        return MATRIX[name](df, combos.reset_index(drop=True))
+    if isinstance(strategy, str):
+        from importlib import import_module
+        strategy = getattr(import_module(f"..strategies.{name}", __package__), f"{name}_signal")
+    return np.column_stack([strategy(df, **row).to_numpy() for row in combos.to_dict('records')])
+
+def _run_chunk(df, strategy, combos, fee_bps, slippage_bps):
+    res = run(df['close'].to_numpy(dtype=float), signal_matrix(df, strategy, combos), fee_bps, slippage_bps)
+    pnl, eq = res['pnl'], res['equity']
+    return combos.assign(sharpe=sharpe(pnl), maxdd=max_drawdown(eq), hit=hit_rate(pnl), total_return=eq[-1] - 1)
+
+def param_grid(grid: dict) -> pd.DataFrame:
+    """{'fast': [8, 12], 'slow': [26, 48]} -> une ligne par combinaison."""
+    keys = list(grid)
+    return pd.DataFrame(list(itertools.product(*(grid[k] for k in keys))), columns=keys)
+
+def sweep(df: pd.DataFrame, strategy, grid, chunk: int = 256, workers: int = 1,
+          fee_bps: float = 2.0, slippage_bps: float = 1.0) -> pd.DataFrame:
+    """Évalue toute la grille ; tableau (params + sharpe, maxdd, hit, total_return) trié par Sharpe.
+    Les combinaisons sont traitées par paquets de `chunk` colonnes, répartis sur `workers` processus."""
+    combos = grid if isinstance(grid, pd.DataFrame) else param_grid(grid)
+    chunks = [combos.iloc[i:i+chunk] for i in range(0, len(combos), max(1, int(chunk)))]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_chunk, [df]*len(chunks), [strategy]*len(chunks), chunks,
+                                  [fee_bps]*len(chunks), [slippage_bps]*len(chunks)))
+    else:
+        parts = [_run_chunk(df, strategy, c, fee_bps, slippage_bps) for c in chunks]
+    if not parts:
+        return combos.assign(sharpe=[], maxdd=[], hit=[], total_return=[])
+    return pd.concat(parts).sort_values('sharpe', ascending=False).reset_index(drop=True)
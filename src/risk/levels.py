@@ -1,9 +1,10 @@
 import pandas as pd, numpy as np
+from ..data.features import feature
+from ..tracing import traced
 def atr(df: pd.DataFrame, length: int = 14):
-    hl = df['high'] - df['low']; hc = (df['high'] - df['close'].shift()).abs(); lc = (df['low'] - df['close'].shift()).abs()
-    tr = pd.concat([hl,hc,lc], axis=1).max(axis=1)
-    return tr.ewm(span=length, adjust=False).mean()
+    return feature(df, 'atr', length=length)
 
+@traced('risk.levels')
 def levels_from_signal(df: pd.DataFrame, direction: int, sl_mult: float=2.5, tp_mult: float=3.5):
     if direction == 0: return None
     a = float(atr(df,14).iloc[-1]); price = float(df['close'].iloc[-1])
@@ -0,0 +1,143 @@
+"""Moteur de risque portefeuille : sélection et dimensionnement des picks sous contraintes.
+
+Les candidats du scan (déjà dimensionnés un à un par position_size) sont parcourus par ordre
+de classement (confiance puis R/R) et retenus tant que le portefeuille — positions ouvertes
+comprises — respecte :
+  - le nombre max de positions (max_pos),
+  - le cap d'exposition brute en % du capital (max_expo) ; le dernier trade peut être réduit,
+  - le budget de volatilité du portefeuille en %/jour (vol_budget), σ = sqrt(wᵀΣw),
+  - une corrélation max avec un pick déjà retenu dans le même sens (max_corr) : BTC/ETH/SOL
+    longs ne comptent pas comme trois paris indépendants.
+
+La covariance des rendements est estimée en une passe (produit matriciel sur la fenêtre, EWMA
+optionnelle) ; la variance du portefeuille est mise à jour de façon incrémentale (Σw gardé en
+vecteur), soit O(N) par candidat.
+"""
+import numpy as np, pandas as pd
+
+def returns_matrix(frames: dict, window: int = 500) -> pd.DataFrame:
+    """Log-rendements des `window` dernières bougies, une colonne par symbole (index aligné)."""
+    close = pd.concat({s: df['close'] for s, df in frames.items() if df is not None and len(df)}, axis=1)
+    if close.empty:
+        return close
+    r = np.log(close.astype(float)).diff().iloc[1:]
+    return r.iloc[-int(window):]
+
+def load_returns(exchange: str, symbols, timeframe: str, window: int = 500, store=None) -> pd.DataFrame:
+    """returns_matrix() depuis le magasin mappé (séries déjà chargées par le scan, sans copie)."""
+    from ..data.store import STORE
+    store = store or STORE
+    return returns_matrix({s: store.frame(exchange, s, timeframe, limit=int(window) + 1) for s in dict.fromkeys(symbols)},
+                          window)
+
+def covariance(returns: pd.DataFrame, halflife: float = None) -> pd.DataFrame:
+    """Matrice de covariance en une passe ; les trous (historiques plus courts) comptent pour
+    un rendement moyen. halflife (en bougies) : pondération exponentielle des plus récentes."""
+    X = returns.to_numpy(float); n = len(X)
+    if n < 2:
+        return pd.DataFrame(np.zeros((X.shape[1],) * 2), index=returns.columns, columns=returns.columns)
+    w = np.ones(n) if halflife is None else 0.5 ** (np.arange(n)[::-1] / float(halflife))
+    valid = ~np.isnan(X)
+    mu = np.nansum(X * w[:, None], axis=0) / np.maximum((valid * w[:, None]).sum(axis=0), 1e-12)
+    D = np.where(valid, X - mu, 0.0) * np.sqrt(w)[:, None]
+    cov = D.T @ D / (w.sum() * (1 - (w ** 2).sum() / w.sum() ** 2))
+    return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+def correlation(cov: pd.DataFrame) -> pd.DataFrame:
+    sd = np.sqrt(np.diag(cov.to_numpy()))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = cov.to_numpy() / np.outer(sd, sd)
+    return pd.DataFrame(np.nan_to_num(c), index=cov.index, columns=cov.columns)
+
+def _universe_cov(cov: pd.DataFrame, symbols) -> np.ndarray:
+    """Covariance réindexée sur `symbols` ; un symbole sans historique reçoit la variance
+    médiane et aucune corrélation."""
+    symbols = list(symbols)
+    C = cov.reindex(index=symbols, columns=symbols).to_numpy(float)
+    miss = np.isnan(np.diag(C)); C = np.nan_to_num(C)
+    if miss.any():
+        known = np.diag(C)[~miss]
+        C[miss, miss] = np.median(known) if len(known) else 1e-4
+    return C
+
+def _empty_picks(cand: pd.DataFrame) -> pd.DataFrame:
+    cols = list(dict.fromkeys(list(cand.columns) + ['symbol', 'dir', 'entry', 'qty', 'confiance', 'rr',
+                                                     'scale', 'notional_pct']))
+    return pd.DataFrame(columns=cols)
+
+def allocate(candidates: pd.DataFrame, cov: pd.DataFrame, capital: float, max_expo: float = 80.0,
+             max_pos: int = 3, vol_budget: float = 2.0, max_corr: float = 0.85, existing: pd.DataFrame = None,
+             bar_seconds: int = 3600, min_scale: float = 0.25):
+    """Sélectionne et dimensionne les candidats (colonnes symbol, dir, entry, qty, confiance, rr).
+
+    max_expo : exposition brute max en % du capital ; vol_budget : volatilité max du portefeuille
+    en % du capital par jour ; existing : positions ouvertes (symbol, side, entry, qty) comptées
+    dans les trois caps. Un trade réduit à moins de `min_scale` de sa taille est écarté.
+    Retourne (picks retenus avec qty ajustée, scale, notional_pct ; infos du portefeuille)."""
+    cand = pd.DataFrame(candidates)
+    info = {'n': 0, 'gross_pct': 0.0, 'vol_day_pct': 0.0, 'rejected': {}}
+    if cand.empty:
+        return _empty_picks(cand), info
+    cand = cand.sort_values(['confiance', 'rr'], ascending=False).reset_index(drop=True)
+    ex = existing if existing is not None and len(existing) else pd.DataFrame(columns=['symbol', 'side', 'entry', 'qty'])
+    universe = list(dict.fromkeys(list(ex['symbol']) + list(cand['symbol'])))
+    idx = {s: i for i, s in enumerate(universe)}
+    C = _universe_cov(cov, universe)
+    sd = np.sqrt(np.diag(C))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        R = np.nan_to_num(C / np.outer(sd, sd))
+    # poids signés (notionnel / capital) ; budget ramené à la bougie
+    B = float(vol_budget) / 100.0 / np.sqrt(86400.0 / float(bar_seconds))
+    w = np.zeros(len(universe))
+    ex_sign = np.where(ex['side'].astype(str).str.upper() == 'LONG', 1.0, -1.0) if len(ex) else np.empty(0)
+    np.add.at(w, [idx[s] for s in ex['symbol']], ex_sign * ex['entry'].to_numpy(float) * ex['qty'].to_numpy(float) / capital)
+    gross_cap = float(max_expo) / 100.0
+    gross = float(np.abs(w).sum()); Cw = C @ w; var = float(w @ Cw)
+    n_pos = len(ex); taken = []; scales = []; chosen = set(ex['symbol'])
+
+    sign = np.where(cand['dir'].astype(str).str.upper() == 'LONG', 1.0, -1.0)
+    full = cand['entry'].to_numpy(float) * cand['qty'].to_numpy(float) / capital
+    for k in range(len(cand)):
+        sym = cand.at[k, 'symbol']; j = idx[sym]
+        if n_pos >= int(max_pos):
+            info['rejected'][sym] = 'max_pos'; continue
+        if sym in chosen:
+            info['rejected'][sym] = 'déjà en portefeuille'; continue
+        dup = [o for o in chosen if R[j, idx[o]] * sign[k] * np.sign(w[idx[o]]) > max_corr]
+        if dup:
+            info['rejected'][sym] = f"corrélé à {dup[0]}"; continue
+        d = sign[k] * full[k]
+        s_expo = min(1.0, max(0.0, gross_cap - gross) / full[k]) if full[k] > 0 else 1.0
+        # plus grande fraction s telle que var(w + s·d) <= B² : a s² + b s + c <= 0
+        a, b, c = C[j, j] * d * d, 2.0 * d * Cw[j], var - B * B
+        s_vol = 1.0
+        if a > 0 and a + b + c > 0:
+            disc = b * b - 4 * a * c
+            s_vol = max(0.0, (-b + np.sqrt(disc)) / (2 * a)) if disc >= 0 else 0.0
+        s = min(s_expo, s_vol)
+        if s < min_scale:
+            info['rejected'][sym] = 'cap d’exposition' if s_expo <= s_vol else 'budget de volatilité'; continue
+        dw = s * d; w[j] += dw; Cw += C[:, j] * dw; var = float(w @ Cw)
+        gross += abs(dw); n_pos += 1; chosen.add(sym); taken.append(k); scales.append(s)
+
+    picks = cand.loc[taken].copy()
+    picks['scale'] = np.asarray(scales, dtype=float)   # colonnes présentes même sans pick retenu
+    picks['qty'] = picks['qty'].astype(float) * picks['scale']
+    picks['notional_pct'] = 100.0 * picks['entry'].astype(float) * picks['qty'] / capital
+    info.update(n=len(picks), gross_pct=float(100.0 * gross),
+                vol_day_pct=float(100.0 * np.sqrt(max(var, 0.0)) * np.sqrt(86400.0 / float(bar_seconds))))
+    return picks.reset_index(drop=True), info
+
+def select_picks(rows, exchange: str, timeframe: str, capital: float, max_expo: float = 80.0, max_pos: int = 3,
+                 vol_budget: float = 2.0, max_corr: float = 0.85, existing: pd.DataFrame = None,
+                 window: int = 500, halflife: float = None, store=None):
+    """Lignes du scan -> (picks retenus, infos) : covariance des candidats et des positions
+    ouvertes lue dans le magasin mappé, puis allocate(). Remplace rank_picks(..., k=5)."""
+    from ..data.loader import timeframe_seconds
+    cand = pd.DataFrame([r for r in rows if r])
+    if cand.empty:
+        return _empty_picks(cand), {'n': 0, 'gross_pct': 0.0, 'vol_day_pct': 0.0, 'rejected': {}}
+    syms = list(cand['symbol']) + (list(existing['symbol']) if existing is not None and len(existing) else [])
+    cov = covariance(load_returns(exchange, syms, timeframe, window, store), halflife)
+    return allocate(cand, cov, capital, max_expo, max_pos, vol_budget, max_corr, existing,
+                    timeframe_seconds(timeframe))
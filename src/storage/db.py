@@ -0,0 +1,293 @@
+"""Stockage SQLite unique (positions du portefeuille, journal de trades, Top Picks précalculés).
+
+Une connexion longue par thread et par fichier, mode WAL, schéma versionné par
+PRAGMA user_version (migrations appliquées une seule fois à l'ouverture, sous verrou
+d'écriture entre processus), écritures
+groupées en une transaction via executemany.
+"""
+import os, json, sqlite3, threading, datetime
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DB = os.getenv('HELIOS_DB', os.path.join(ROOT, 'portfolio.db'))
+
+POSITION_COLS = ['id','open_ts','close_ts','symbol','side','entry','sl','tp','qty','status','exit_price','pnl','note','hit','hit_ts']
+PICK_COLS = ['symbol','dir','entry','sl','tp','qty','rr','confiance','regime','score_p5','score_p95']
+TRADE_COLS = ['id','ts','symbol','side','entry','sl','tp','qty','rr','result','pnl','note']
+
+# bases séparées d'avant le stockage unique (src/portofolio/db.py et src/journal/db.py)
+LEGACY = {'positions': os.path.join(ROOT, 'src', 'portofolio', 'portfolio.db'),
+          'trades': os.path.join(ROOT, 'src', 'journal', 'journal.db')}
+
+_REBUILD_SUMMARY = """INSERT OR REPLACE INTO pnl_summary
+        SELECT substr(close_ts, 1, 10), symbol, side, COALESCE(note, ''), COUNT(*), SUM(pnl > 0), SUM(pnl),
+               SUM(pnl / NULLIF(ABS(entry - sl) * qty, 0)), SUM(ABS(entry - sl) * qty > 0)
+        FROM positions WHERE status='CLOSED' GROUP BY 1, 2, 3, 4;"""
+
+# migration i -> i+1 ; ne jamais modifier une entrée existante, en ajouter une
+MIGRATIONS = [
+    """CREATE TABLE IF NOT EXISTS positions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        open_ts TEXT, close_ts TEXT, symbol TEXT, side TEXT,
+        entry REAL, sl REAL, tp REAL, qty REAL,
+        status TEXT, exit_price REAL, pnl REAL, note TEXT
+    );
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TEXT, symbol TEXT, side TEXT,
+        entry REAL, sl REAL, tp REAL, qty REAL, rr REAL,
+        result TEXT, pnl REAL, note TEXT
+    );""",
+    """CREATE INDEX IF NOT EXISTS ix_positions_status ON positions(status, id);
+    CREATE INDEX IF NOT EXISTS ix_positions_symbol ON positions(symbol, status);
+    CREATE INDEX IF NOT EXISTS ix_positions_close ON positions(status, close_ts);
+    CREATE INDEX IF NOT EXISTS ix_trades_symbol ON trades(symbol);
+    CREATE INDEX IF NOT EXISTS ix_trades_ts ON trades(ts);""",
+    # agrégats réalisés (jour × symbole × sens × note), tenus à jour par trigger à chaque clôture
+    """CREATE TABLE IF NOT EXISTS pnl_summary (
+        day TEXT, symbol TEXT, side TEXT, note TEXT,
+        n INTEGER, wins INTEGER, pnl REAL, r_sum REAL, r_n INTEGER,
+        PRIMARY KEY (day, symbol, side, note)
+    );
+    CREATE TRIGGER IF NOT EXISTS tr_positions_closed AFTER UPDATE OF status ON positions
+    WHEN NEW.status='CLOSED' AND OLD.status='OPEN'
+    BEGIN
+        INSERT INTO pnl_summary VALUES (substr(NEW.close_ts, 1, 10), NEW.symbol, NEW.side, COALESCE(NEW.note, ''),
+            1, COALESCE(NEW.pnl, 0) > 0, COALESCE(NEW.pnl, 0), NEW.pnl / NULLIF(ABS(NEW.entry - NEW.sl) * NEW.qty, 0),
+            ABS(NEW.entry - NEW.sl) * NEW.qty > 0)
+        ON CONFLICT (day, symbol, side, note) DO UPDATE SET
+            n = n + 1, wins = wins + excluded.wins, pnl = pnl + excluded.pnl,
+            r_sum = COALESCE(r_sum, 0) + COALESCE(excluded.r_sum, 0), r_n = r_n + excluded.r_n;
+    END;
+    """ + _REBUILD_SUMMARY,
+    # Top Picks précalculés par le scanner headless (src/research/daemon.py)
+    """CREATE TABLE IF NOT EXISTS scan_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts TEXT, exchange TEXT, timeframe TEXT, bar_ts TEXT,
+        n_symbols INTEGER, n_picks INTEGER, duration_s REAL, params TEXT
+    );
+    CREATE TABLE IF NOT EXISTS picks (
+        run_id INTEGER REFERENCES scan_runs(id), rank INTEGER,
+        symbol TEXT, dir TEXT, entry REAL, sl REAL, tp REAL, qty REAL, rr REAL,
+        confiance REAL, regime TEXT, score_p5 REAL, score_p95 REAL,
+        PRIMARY KEY (run_id, rank)
+    );
+    CREATE INDEX IF NOT EXISTS ix_scan_runs_tf ON scan_runs(exchange, timeframe, id);""",
+    # niveau touché ('TP' | 'SL') et horodatage du tick déclencheur (src/portofolio/monitor.py)
+    lambda conn: _add_columns(conn, 'positions', hit='TEXT', hit_ts='TEXT'),
+    # reprise unique des positions et du journal des anciennes bases séparées
+    lambda conn: _import_legacy(conn),
+]
+
+_LOCAL = threading.local()
+_MIGRATED = set()
+_LOCK = threading.Lock()
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
+
+def _add_columns(conn: sqlite3.Connection, table: str, **cols):
+    """ALTER TABLE … ADD COLUMN pour les colonnes absentes seulement (rejouable sans erreur)."""
+    have = {r[1] for r in conn.execute(f'PRAGMA table_info({table})')}
+    for name, decl in cols.items():
+        if name not in have:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {name} {decl}')
+
+def _import_legacy(conn: sqlite3.Connection, legacy: dict = None) -> dict:
+    """Copie les lignes des anciennes portfolio.db / journal.db dans la base principale (nouveaux
+    id ; les fichiers d'origine ne sont pas modifiés). Seulement pour la base de l'application :
+    une base de test ou ouverte via `path` ne reprend rien. Retourne {table: lignes copiées}."""
+    main = next((r[2] for r in conn.execute('PRAGMA database_list') if r[1] == 'main'), '')
+    if legacy is None and (not main or os.path.abspath(main) != os.path.abspath(DB)):
+        return {}
+    cols = {'positions': POSITION_COLS[1:13], 'trades': TRADE_COLS[1:]}
+    copied = {}
+    for table, src in (legacy or LEGACY).items():
+        if not os.path.exists(src):
+            continue
+        old = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+        try:
+            have = {r[1] for r in old.execute(f'PRAGMA table_info({table})')}
+            if not have:
+                continue
+            names = [c for c in cols[table] if c in have]
+            rows = old.execute(f"SELECT {', '.join(names)} FROM {table} ORDER BY id").fetchall()
+        finally:
+            old.close()
+        conn.executemany(f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", rows)
+        copied[table] = len(rows)
+    if copied.get('positions'):   # clôtures importées : hors trigger, agrégats recalculés
+        conn.execute(_REBUILD_SUMMARY)
+    return copied
+
+def _statements(script: str):
+    """Découpe un script SQL en instructions (les corps de trigger BEGIN … END restent entiers)."""
+    buf = ''
+    for part in script.split(';'):
+        buf += part + ';'
+        if sqlite3.complete_statement(buf):
+            if buf.strip(' \n;'): yield buf.strip()
+            buf = ''
+
+def migrate(conn: sqlite3.Connection):
+    """Applique les migrations manquantes, une transaction BEGIN IMMEDIATE par version. La
+    version est relue sous le verrou d'écriture : l'UI, le daemon et le moniteur peuvent ouvrir
+    la base en même temps, chaque migration n'est appliquée qu'une fois."""
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version >= len(MIGRATIONS):
+                conn.execute('COMMIT'); return
+            step = MIGRATIONS[version]
+            if callable(step):
+                step(conn)
+            else:
+                for stmt in _statements(step): conn.execute(stmt)
+            conn.execute(f'PRAGMA user_version = {version + 1}')
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction: conn.execute('ROLLBACK')
+            raise
+
+def connect(path: str = None) -> sqlite3.Connection:
+    """Connexion du thread courant vers `path` (créée et migrée au premier appel)."""
+    path = path or DB
+    conns = getattr(_LOCAL, 'conns', None)
+    if conns is None:
+        conns = _LOCAL.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL'); conn.execute('PRAGMA synchronous=NORMAL')
+        with _LOCK:
+            if path not in _MIGRATED:
+                migrate(conn); _MIGRATED.add(path)
+        conns[path] = conn
+    return conn
+
+def close_all():
+    """Ferme les connexions du thread courant."""
+    for conn in getattr(_LOCAL, 'conns', {}).values():
+        conn.close()
+    _LOCAL.conns = {}
+
+# ---------- Positions ----------
+def _position_row(r, note, ts):
+    if isinstance(r, dict):
+        r = (r['symbol'], r.get('side', r.get('dir')), r['entry'], r['sl'], r['tp'], r['qty'], r.get('note', note))
+    symbol, side, entry, sl, tp, qty, *rest = r
+    return (ts, None, symbol, str(side).upper(), float(entry), float(sl), float(tp), float(qty),
+            'OPEN', None, None, rest[0] if rest else note)
+
+def open_positions(rows, note: str = '', path: str = None) -> int:
+    """Ouvre un lot de positions en une transaction. rows : dicts (symbol, side|dir, entry, sl, tp, qty[, note])
+    ou tuples dans cet ordre. Retourne le nombre de positions créées."""
+    ts = _now(); data = [_position_row(r, note, ts) for r in rows]
+    conn = connect(path)
+    with conn:
+        conn.executemany('INSERT INTO positions (open_ts, close_ts, symbol, side, entry, sl, tp, qty, status, exit_price, pnl, note) '
+                         'VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', data)
+    return len(data)
+
+def open_position(symbol: str, side: str, entry: float, sl: float, tp: float, qty: float,
+                  note: str = '', path: str = None) -> int:
+    """Ouvre une position. Retourne son id."""
+    conn = connect(path)
+    with conn:
+        cur = conn.execute('INSERT INTO positions (open_ts, close_ts, symbol, side, entry, sl, tp, qty, status, exit_price, pnl, note) '
+                           'VALUES (?,?,?,?,?,?,?,?,?,?,?,?)', _position_row((symbol, side, entry, sl, tp, qty), note, _now()))
+    return cur.lastrowid
+
+_CLOSE = ("UPDATE positions SET close_ts=?, status='CLOSED', exit_price=?, "
+          "pnl=(? - entry) * qty * (CASE WHEN side='LONG' THEN 1 ELSE -1 END), note=?, hit=?, hit_ts=? "
+          "WHERE id=? AND status='OPEN'")
+
+def close_positions(closes, note: str = 'CLOSE', path: str = None) -> dict:
+    """Clôture un lot [(id, prix de sortie[, 'TP'|'SL'[, horodatage du tick]]), ...] en une
+    transaction ; P&L calculé en SQL. Retourne {id: pnl} des positions effectivement clôturées
+    (les ids déjà clos sont ignorés)."""
+    ts = _now(); closes = [(int(c[0]), float(c[1]), c[2] if len(c) > 2 else None, c[3] if len(c) > 3 else None)
+                           for c in closes]
+    if not closes:
+        return {}
+    conn = connect(path)
+    with conn:
+        before = conn.total_changes
+        conn.executemany(_CLOSE, [(ts, px, px, note, hit, hit_ts, i) for i, px, hit, hit_ts in closes])
+        if conn.total_changes == before:
+            return {}
+        ids = [c[0] for c in closes]; out = {}
+        for a in range(0, len(ids), 900):   # limite de variables SQLite
+            part = ids[a:a+900]
+            out.update(conn.execute(f"SELECT id, pnl FROM positions WHERE close_ts=? AND id IN ({','.join('?'*len(part))})",
+                                    [ts, *part]).fetchall())
+    return out
+
+def close_position(pos_id: int, exit_price: float, note: str = 'CLOSE', path: str = None) -> float:
+    """Clôture une position ouverte au prix donné et retourne son P&L."""
+    pnl = close_positions([(pos_id, exit_price)], note, path).get(int(pos_id))
+    if pnl is None:
+        raise ValueError(f'Position {pos_id} introuvable ou déjà close')
+    return pnl
+
+def list_positions(status: str = None, limit: int = 500, path: str = None) -> pd.DataFrame:
+    """Positions (plus récentes d'abord). status : None | 'OPEN' | 'CLOSED'."""
+    q = f"SELECT {', '.join(POSITION_COLS)} FROM positions"; params = ()
+    if status in ('OPEN', 'CLOSED'):
+        q += ' WHERE status=?'; params = (status,)
+    rows = connect(path).execute(q + ' ORDER BY id DESC LIMIT ?', params + (int(limit),)).fetchall()
+    return pd.DataFrame(rows, columns=POSITION_COLS)
+
+# ---------- Journal ----------
+def add_trades(rows, path: str = None) -> int:
+    """Ajoute un lot de trades : tuples (symbol, side, entry, sl, tp, qty, rr[, note])."""
+    ts = _now(); data = []
+    for symbol, side, entry, sl, tp, qty, rr, *rest in rows:
+        data.append((ts, symbol, side, entry, sl, tp, qty, rr, '', None, rest[0] if rest else ''))
+    conn = connect(path)
+    with conn:
+        conn.executemany('INSERT INTO trades (ts, symbol, side, entry, sl, tp, qty, rr, result, pnl, note) '
+                         'VALUES (?,?,?,?,?,?,?,?,?,?,?)', data)
+    return len(data)
+
+def add_trade(symbol, side, entry, sl, tp, qty, rr, note='', path: str = None) -> int:
+    return add_trades([(symbol, side, entry, sl, tp, qty, rr, note)], path)
+
+def update_trade_result(trade_id, result, pnl, path: str = None):
+    conn = connect(path)
+    with conn:
+        conn.execute('UPDATE trades SET result=?, pnl=? WHERE id=?', (result, pnl, trade_id))
+
+def list_trades(limit: int = 500, path: str = None) -> pd.DataFrame:
+    rows = connect(path).execute(f"SELECT {', '.join(TRADE_COLS)} FROM trades ORDER BY id DESC LIMIT ?",
+                                 (int(limit),)).fetchall()
+    return pd.DataFrame(rows, columns=TRADE_COLS)
+
+# ---------- Top Picks précalculés ----------
+def save_picks(exchange: str, timeframe: str, bar_ts, picks: pd.DataFrame, n_symbols: int = 0,
+               duration_s: float = None, params: dict = None, path: str = None) -> int:
+    """Enregistre un run de scan et ses picks classés (une transaction). Retourne l'id du run."""
+    picks = picks if picks is not None else pd.DataFrame()
+    conn = connect(path)
+    with conn:
+        run_id = conn.execute('INSERT INTO scan_runs (ts, exchange, timeframe, bar_ts, n_symbols, n_picks, duration_s, params) '
+                              'VALUES (?,?,?,?,?,?,?,?)',
+                              (_now(), exchange, timeframe, None if bar_ts is None else str(bar_ts), int(n_symbols),
+                               len(picks), duration_s, json.dumps(params or {}, default=repr))).lastrowid
+        rows = picks.reindex(columns=PICK_COLS).astype(object).where(picks.reindex(columns=PICK_COLS).notna(), None)
+        conn.executemany(f"INSERT INTO picks VALUES (?,?,{','.join('?'*len(PICK_COLS))})",
+                         [(run_id, i, *r) for i, r in enumerate(rows.itertuples(index=False, name=None), 1)])
+    return run_id
+
+def latest_picks(exchange: str, timeframe: str, path: str = None):
+    """(infos du dernier run, DataFrame des picks) pour exchange/timeframe ; (None, vide) si aucun run."""
+    conn = connect(path)
+    run = conn.execute('SELECT id, ts, bar_ts, n_symbols, n_picks, duration_s, params FROM scan_runs '
+                       'WHERE exchange=? AND timeframe=? ORDER BY id DESC LIMIT 1', (exchange, timeframe)).fetchone()
+    if run is None:
+        return None, pd.DataFrame(columns=PICK_COLS)
+    info = dict(zip(['id','ts','bar_ts','n_symbols','n_picks','duration_s','params'], run))
+    info['params'] = json.loads(info['params'] or '{}')
+    rows = conn.execute(f"SELECT {', '.join(PICK_COLS)} FROM picks WHERE run_id=? ORDER BY rank", (run[0],)).fetchall()
+    return info, pd.DataFrame(rows, columns=PICK_COLS)
@@ -1,7 +1,18 @@
 import pandas as pd
+from ..data.features import feature
+from ..data.streaming import Atr, Ewm, SignalStream
 def atr_channel_signal(df: pd.DataFrame, length:int=14, mult:float=2.0):
-    ema = df['close'].ewm(span=length, adjust=False).mean()
-    tr = (pd.concat([(df['high']-df['low']),(df['high']-df['close'].shift()).abs(),(df['low']-df['close'].shift()).abs()],axis=1).max(axis=1))
-    atr = tr.ewm(span=length, adjust=False).mean()
+    ema = feature(df, 'ema', span=length)
+    atr = feature(df, 'atr', length=length)
     upper = ema + mult*atr; lower = ema - mult*atr
     return ((df['close']>upper).astype(int) - (df['close']<lower).astype(int)).rename('signal')
+
+class AtrChannelStream(SignalStream):
+    """Version streaming de atr_channel_signal."""
+    def __init__(self, length:int=14, mult:float=2.0):
+        self.ema = Ewm(length); self.atr = Atr(length); self.mult = mult
+
+    def step(self, high, low, close):
+        ema = self.ema.update(close); atr = self.atr.update(high, low, close)
+        upper = ema + self.mult*atr; lower = ema - self.mult*atr
+        return (1 if close > upper else 0) - (1 if close < lower else 0)
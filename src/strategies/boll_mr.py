@@ -1,7 +1,19 @@
 import pandas as pd
+from ..data.features import feature
+from ..data.streaming import RollingMean, RollingStd, SignalStream
 def boll_mr_signal(df: pd.DataFrame, length:int=20, mult:float=2.0):
-    ma = df['close'].rolling(length).mean()
-    std = df['close'].rolling(length).std()
+    ma = feature(df, 'sma', window=length)
+    std = feature(df, 'rolling_std', window=length)
     upper = ma + mult*std; lower = ma - mult*std
     long = (df['close']<lower).astype(int); short = -(df['close']>upper).astype(int)
     return (long+short).clip(-1,1).rename('signal')
+
+class BollMrStream(SignalStream):
+    """Version streaming de boll_mr_signal."""
+    def __init__(self, length:int=20, mult:float=2.0):
+        self.ma = RollingMean(length); self.std = RollingStd(length); self.mult = mult
+
+    def step(self, high, low, close):
+        ma = self.ma.update(close); std = self.std.update(close)
+        upper = ma + self.mult*std; lower = ma - self.mult*std
+        return max(-1, min(1, (1 if close < lower else 0) - (1 if close > upper else 0)))
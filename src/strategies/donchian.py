@@ -1,5 +1,18 @@
 import pandas as pd
+from ..data.features import feature
+from ..data.streaming import RollingExtremum, SignalStream, NAN
 def donchian_signal(df: pd.DataFrame, lookback:int=55):
-    hh = df['high'].rolling(lookback).max()
-    ll = df['low'].rolling(lookback).min()
+    hh = feature(df, 'rolling_max', window=lookback)
+    ll = feature(df, 'rolling_min', window=lookback)
     return ((df['close']>hh.shift()).astype(int) - (df['close']<ll.shift()).astype(int)).clip(-1,1).rename('signal')
+
+class DonchianStream(SignalStream):
+    """Version streaming de donchian_signal (canal de la bougie précédente)."""
+    def __init__(self, lookback:int=55):
+        self.hh = RollingExtremum(lookback, 'max'); self.ll = RollingExtremum(lookback, 'min')
+        self.prev_hh = self.prev_ll = NAN
+
+    def step(self, high, low, close):
+        sig = (1 if close > self.prev_hh else 0) - (1 if close < self.prev_ll else 0)
+        self.prev_hh = self.hh.update(high); self.prev_ll = self.ll.update(low)
+        return max(-1, min(1, sig))
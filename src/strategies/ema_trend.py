@@ -1,5 +1,15 @@
 import pandas as pd
+from ..data.features import feature
+from ..data.streaming import Ewm, SignalStream, _cmp
 def ema_trend_signal(df: pd.DataFrame, fast:int=12, slow:int=48):
-    ema_f = df['close'].ewm(span=fast, adjust=False).mean()
-    ema_s = df['close'].ewm(span=slow, adjust=False).mean()
+    ema_f = feature(df, 'ema', span=fast)
+    ema_s = feature(df, 'ema', span=slow)
     return ((ema_f>ema_s).astype(int) - (ema_f<ema_s).astype(int)).rename('signal')
+
+class EmaTrendStream(SignalStream):
+    """Version streaming de ema_trend_signal."""
+    def __init__(self, fast:int=12, slow:int=48):
+        self.ema_f = Ewm(fast); self.ema_s = Ewm(slow)
+
+    def step(self, high, low, close):
+        return _cmp(self.ema_f.update(close), self.ema_s.update(close))
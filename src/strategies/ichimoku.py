@@ -1,14 +1,34 @@
 import pandas as pd
+from collections import deque
+from ..data.features import feature
+from ..data.streaming import RollingExtremum, SignalStream, NAN, _cmp
 def ichimoku_signal(df: pd.DataFrame, conv:int=9, base:int=26, spanb:int=52):
-    high9 = df['high'].rolling(conv).max(); low9 = df['low'].rolling(conv).min()
+    high9 = feature(df, 'rolling_max', window=conv); low9 = feature(df, 'rolling_min', window=conv)
     tenkan = (high9 + low9) / 2
-    high26 = df['high'].rolling(base).max(); low26 = df['low'].rolling(base).min()
+    high26 = feature(df, 'rolling_max', window=base); low26 = feature(df, 'rolling_min', window=base)
     kijun = (high26 + low26) / 2
     spanA = ((tenkan + kijun) / 2).shift(base)
-    high52 = df['high'].rolling(spanb).max(); low52 = df['low'].rolling(spanb).min()
+    high52 = feature(df, 'rolling_max', window=spanb); low52 = feature(df, 'rolling_min', window=spanb)
     spanB = ((high52 + low52) / 2).shift(base)
     cross = (tenkan > kijun).astype(int) - (tenkan < kijun).astype(int)
     cloud_up = (df['close'] > spanA) & (df['close'] > spanB)
     cloud_down = (df['close'] < spanA) & (df['close'] < spanB)
     sig = cross.where(cloud_up, 0).where(~cloud_down, -1)
     return sig.fillna(0).rename('signal')
+
+class IchimokuStream(SignalStream):
+    """Version streaming de ichimoku_signal ; les spans sont décalés via un buffer de `base` bougies."""
+    def __init__(self, conv:int=9, base:int=26, spanb:int=52):
+        self.h9, self.l9 = RollingExtremum(conv, 'max'), RollingExtremum(conv, 'min')
+        self.h26, self.l26 = RollingExtremum(base, 'max'), RollingExtremum(base, 'min')
+        self.h52, self.l52 = RollingExtremum(spanb, 'max'), RollingExtremum(spanb, 'min')
+        self.spans = deque(maxlen=base + 1); self.base = base
+
+    def step(self, high, low, close):
+        tenkan = (self.h9.update(high) + self.l9.update(low)) / 2
+        kijun = (self.h26.update(high) + self.l26.update(low)) / 2
+        span_b = (self.h52.update(high) + self.l52.update(low)) / 2
+        self.spans.append(((tenkan + kijun) / 2, span_b))
+        span_a, span_b = self.spans[0] if len(self.spans) > self.base else (NAN, NAN)
+        sig = _cmp(tenkan, kijun) if (close > span_a and close > span_b) else 0
+        return -1 if (close < span_a and close < span_b) else sig
@@ -1,7 +1,18 @@
 import pandas as pd
+from ..data.features import feature
+from ..data.streaming import Ewm, SignalStream, _cmp
 def macd_signal(df: pd.DataFrame, fast:int=12, slow:int=26, signal:int=9):
-    ema_f = df['close'].ewm(span=fast, adjust=False).mean()
-    ema_s = df['close'].ewm(span=slow, adjust=False).mean()
+    ema_f = feature(df, 'ema', span=fast)
+    ema_s = feature(df, 'ema', span=slow)
     macd = ema_f - ema_s
     macd_sig = macd.ewm(span=signal, adjust=False).mean()
     return ((macd>macd_sig).astype(int) - (macd<macd_sig).astype(int)).rename('signal')
+
+class MacdStream(SignalStream):
+    """Version streaming de macd_signal."""
+    def __init__(self, fast:int=12, slow:int=26, signal:int=9):
+        self.ema_f = Ewm(fast); self.ema_s = Ewm(slow); self.ema_sig = Ewm(signal)
+
+    def step(self, high, low, close):
+        macd = self.ema_f.update(close) - self.ema_s.update(close)
+        return _cmp(macd, self.ema_sig.update(macd))
@@ -0,0 +1,98 @@
+"""Registre des stratégies, piloté par manifest.json (nom, point d'entrée, schéma de
+paramètres, features utilisées).
+
+Lire le registre n'importe rien : chaque stratégie est un LazyStrategy qui importe son
+module au premier appel. Les durées d'import sont relevées dans IMPORT_TIMES.
+"""
+import os, json, time, threading
+from importlib import import_module
+from ..tracing import span
+
+MANIFEST = os.path.join(os.path.dirname(__file__), 'manifest.json')
+
+IMPORT_TIMES = {}      # module -> secondes (premier import)
+_LOCK = threading.Lock()
+_SPECS = None          # nom -> entrée du manifest
+
+def timed_import(module: str, package: str = None):
+    """import_module en relevant la durée du premier import dans IMPORT_TIMES."""
+    name = module if package is None or not module.startswith('.') else f"{package}{module}"
+    t0 = time.perf_counter()
+    m = import_module(module, package)
+    IMPORT_TIMES.setdefault(name, time.perf_counter() - t0)
+    return m
+
+def _resolve(entry: str):
+    mod, attr = entry.split(':')
+    return getattr(timed_import(f".{mod}", __package__), attr)
+
+class LazyStrategy:
+    """Fonction de signal chargée à la demande : LazyStrategy(df, **params) -> Series."""
+    def __init__(self, name: str, entry: str, params: dict = None, features=(), group: str = None, stream: str = None):
+        self.name, self.entry, self.params = name, entry, dict(params or {})
+        self.features, self.group, self.stream_entry = tuple(features), group, stream
+        mod, attr = entry.split(':')
+        self.__module__, self.__qualname__ = f"{__package__}.{mod}", attr   # identité pour les clés de cache
+        self.label = f"strategy.{name}"
+        self._fn = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._fn is not None
+
+    def load(self):
+        if self._fn is None:
+            self._fn = _resolve(self.entry)
+        return self._fn
+
+    def __call__(self, df, **params):
+        fn = self._fn or self.load()
+        with span(self.label):
+            return fn(df, **params)
+
+    def defaults(self) -> dict:
+        return {k: v.get('default') for k, v in self.params.items()}
+
+    def stream(self, **params):
+        """Instance streaming de la stratégie (update(bar) -> signal), si déclarée."""
+        if not self.stream_entry:
+            raise KeyError(f"{self.name}: pas de version streaming")
+        return _resolve(self.stream_entry)(**params)
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k != '_fn'} | {'_fn': None}
+
+    def __repr__(self):
+        return f"LazyStrategy({self.name!r}, {self.entry!r}{', loaded' if self.loaded else ''})"
+
+def _specs() -> dict:
+    global _SPECS
+    if _SPECS is None:
+        with _LOCK:
+            if _SPECS is None:
+                with open(MANIFEST) as f:
+                    _SPECS = {d['name']: LazyStrategy(d['name'], d['entry'], d.get('params'), d.get('features', ()),
+                                                      d.get('group'), d.get('stream')) for d in json.load(f)}
+    return _SPECS
+
+def register(name: str, entry: str, params: dict = None, features=(), group: str = None, stream: str = None):
+    """Ajoute (ou remplace) une stratégie hors manifest, ex. register('RSI', 'rsi_reversion:rsi_signal')."""
+    _specs()[name] = LazyStrategy(name, entry, params, features, group, stream)
+
+def names(group: str = None) -> list:
+    return [n for n, s in _specs().items() if group is None or s.group == group]
+
+def get(name: str) -> LazyStrategy:
+    return _specs()[name]
+
+def strategies(selected=None) -> dict:
+    """{nom: LazyStrategy} pour `selected` (tous par défaut), dans l'ordre du manifest."""
+    specs = _specs()
+    return {n: s for n, s in specs.items() if selected is None or n in selected}
+
+def streams() -> dict:
+    return {n: s for n, s in _specs().items() if s.stream_entry}
+
+def import_report() -> dict:
+    """Durées de premier import (s) des modules de stratégie chargés, triées décroissantes."""
+    return dict(sorted(IMPORT_TIMES.items(), key=lambda kv: -kv[1]))
@@ -1,15 +1,71 @@
-import pandas as pd
+import numpy as np, pandas as pd
+from ..data.features import feature
+from ..data.streaming import Atr, SignalStream
+try:
+    from numba import njit
+except ImportError:  # numba absent : même noyau, exécuté en Python sur des tableaux NumPy
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+@njit(cache=True)
+def _supertrend_kernel(close, hl2, atr, mult):
+    """close, hl2: (n,) ; atr: (n, k) ; mult: (k,) -> signaux (n, k) en -1/0/+1."""
+    n, k = atr.shape
+    out = np.zeros((n, k), dtype=np.int64)
+    for j in range(k):
+        m = mult[j]
+        fu = 0.0; fl = 0.0
+        for i in range(n):
+            bu = hl2[i] + m*atr[i, j]
+            bl = hl2[i] - m*atr[i, j]
+            if i == 0:
+                fu = bu; fl = bl
+            else:
+                prev = close[i-1]
+                # même sémantique que min()/max() Python de la version d'origine
+                if prev > fu:
+                    fu = fu if fu < bu else bu
+                else:
+                    fu = bu
+                if prev < fl:
+                    fl = fl if fl > bl else bl
+                else:
+                    fl = bl
+            c = close[i]
+            out[i, j] = (1 if c > fl else 0) - (1 if c < fu else 0)
+    return out
+
+def supertrend_matrix(df: pd.DataFrame, periods, mults) -> np.ndarray:
+    """Signaux SuperTrend pour plusieurs couples (period, mult) en une passe.
+    periods/mults sont diffusés l'un contre l'autre ; retourne une matrice (n_bars, n_couples)."""
+    periods, mults = np.broadcast_arrays(np.atleast_1d(np.asarray(periods, dtype=int)),
+                                         np.atleast_1d(np.asarray(mults, dtype=float)))
+    atr_by_period = {int(p): feature(df, 'atr', length=int(p)).to_numpy(dtype=float) for p in np.unique(periods)}
+    atr = np.column_stack([atr_by_period[int(p)] for p in periods]) if len(df) else np.empty((0, len(periods)))
+    close = df['close'].to_numpy(dtype=float)
+    hl2 = ((df['high'] + df['low'])/2).to_numpy(dtype=float)
+    return _supertrend_kernel(close, hl2, np.ascontiguousarray(atr), np.ascontiguousarray(mults, dtype=float))
+
 def supertrend_signal(df: pd.DataFrame, period:int=10, mult:float=3.0):
-    hl = df['high'] - df['low']
-    hc = (df['high'] - df['close'].shift()).abs()
-    lc = (df['low'] - df['close'].shift()).abs()
-    tr = pd.concat([hl,hc,lc], axis=1).max(axis=1)
-    atr = tr.ewm(span=period, adjust=False).mean()
-    basic_upper = (df['high'] + df['low'])/2 + mult*atr
-    basic_lower = (df['high'] + df['low'])/2 - mult*atr
-    final_upper = basic_upper.copy(); final_lower = basic_lower.copy()
-    for i in range(1, len(df)):
-        final_upper.iloc[i] = min(basic_upper.iloc[i], final_upper.iloc[i-1]) if df['close'].iloc[i-1] > final_upper.iloc[i-1] else basic_upper.iloc[i]
-        final_lower.iloc[i] = max(basic_lower.iloc[i], final_lower.iloc[i-1]) if df['close'].iloc[i-1] < final_lower.iloc[i-1] else basic_lower.iloc[i]
-    up = df['close'] > final_lower; down = df['close'] < final_upper
-    return (up.astype(int) - down.astype(int)).rename('signal')
+    sig = supertrend_matrix(df, [period], [mult])[:, 0]
+    return pd.Series(sig, index=df.index, name='signal')
+
+class SuperTrendStream(SignalStream):
+    """Version streaming de supertrend_signal : conserve ATR et bandes finales."""
+    def __init__(self, period:int=10, mult:float=3.0):
+        self.atr = Atr(period); self.mult = mult
+        self.fu = self.fl = None; self.prev_close = None
+
+    def step(self, high, low, close):
+        atr = self.atr.update(high, low, close); hl2 = (high + low)/2
+        bu = hl2 + self.mult*atr; bl = hl2 - self.mult*atr
+        if self.fu is None:
+            self.fu, self.fl = bu, bl
+        else:
+            prev = self.prev_close
+            self.fu = (self.fu if self.fu < bu else bu) if prev > self.fu else bu
+            self.fl = (self.fl if self.fl > bl else bl) if prev < self.fl else bl
+        self.prev_close = close
+        return (1 if close > self.fl else 0) - (1 if close < self.fu else 0)
@@ -0,0 +1,151 @@
+"""Traçage léger des étapes du pipeline (fetch, cache, stratégies, régime, ensemble, risque).
+
+    with span("data.fetch_ohlcv", symbol=sym): ...
+    @traced("risk.levels")
+    count("pipeline_cache.hit")
+
+Chaque span coûte ~1-2 µs (deux perf_counter + un append sous verrou) : on peut le laisser
+actif en production (HELIOS_TRACE=0 pour le couper). Les événements sont gardés dans un
+tampon circulaire, les agrégats par étape / symbole et les compteurs sont cumulés.
+Export JSON (snapshot) ou Chrome trace (chrome://tracing, Perfetto) ; cProfile à la demande.
+"""
+import os, io, json, time, threading, functools, contextvars
+from collections import deque, defaultdict
+
+ENABLED = os.getenv('HELIOS_TRACE', '1') != '0'
+MAX_EVENTS = int(os.getenv('HELIOS_TRACE_EVENTS', 20000))
+
+_LOCK = threading.Lock()
+_EVENTS = deque(maxlen=MAX_EVENTS)       # (nom, début epoch s, durée s, pid, tid, symbole)
+_STAGES = defaultdict(lambda: [0, 0.0, 0.0])                     # nom -> [n, total, max]
+_BY_SYMBOL = defaultdict(lambda: defaultdict(float))             # symbole -> nom -> total
+_COUNTERS = defaultdict(int)
+_SYMBOL = contextvars.ContextVar('helios_symbol', default=None)
+_SINKS = []                              # listes qui reçoivent aussi les événements (collect)
+
+def _add(ev):   # appelé sous _LOCK
+    name, _, dt, _, _, sym = ev
+    _EVENTS.append(ev)
+    st = _STAGES[name]; st[0] += 1; st[1] += dt
+    if dt > st[2]: st[2] = dt
+    if sym is not None:
+        _BY_SYMBOL[sym][name] += dt
+
+def _record(name, t0, dt, symbol):
+    ev = (name, t0, dt, os.getpid(), threading.get_ident(), symbol)
+    with _LOCK:
+        _add(ev)
+        for sink in _SINKS: sink.append(ev)
+
+class span:
+    """Context manager : mesure le temps mur du bloc sous `name` (symbole courant par défaut)."""
+    __slots__ = ('name', 'symbol', 't0', 'p0')
+    def __init__(self, name: str, symbol: str = None):
+        self.name, self.symbol = name, symbol
+
+    def __enter__(self):
+        if ENABLED:
+            self.t0 = time.time(); self.p0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if ENABLED:
+            _record(self.name, self.t0, time.perf_counter() - self.p0,
+                    self.symbol if self.symbol is not None else _SYMBOL.get())
+        return False
+
+def traced(name: str = None):
+    """Décorateur : chaque appel est un span (nom par défaut : module.fonction)."""
+    def deco(fn):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+        @functools.wraps(fn)
+        def wrapper(*a, **k):
+            with span(label):
+                return fn(*a, **k)
+        return wrapper
+    return deco
+
+def count(name: str, n: int = 1):
+    """Incrémente un compteur (hits/misses de cache, etc.)."""
+    if ENABLED:
+        with _LOCK:
+            _COUNTERS[name] += n
+
+class symbol:
+    """Contexte : les spans ouverts dedans sont attribués à `sym`."""
+    def __init__(self, sym: str):
+        self.sym = sym
+    def __enter__(self):
+        self.token = _SYMBOL.set(self.sym); return self
+    def __exit__(self, *exc):
+        _SYMBOL.reset(self.token); return False
+
+class collect:
+    """Contexte : récupère dans .events les événements enregistrés pendant le bloc (ex. dans un
+    processus worker, pour les renvoyer au parent avec merge())."""
+    def __enter__(self):
+        self.events = []; self.counters = dict(_COUNTERS)
+        with _LOCK: _SINKS.append(self.events)
+        return self
+    def __exit__(self, *exc):
+        with _LOCK:
+            _SINKS.remove(self.events)
+            self.counters = {k: v - self.counters.get(k, 0) for k, v in _COUNTERS.items() if v != self.counters.get(k, 0)}
+        return False
+
+def merge(events, counters=None):
+    """Intègre des événements/compteurs venus d'un autre processus."""
+    with _LOCK:
+        for ev in events: _add(tuple(ev))
+    for k, v in (counters or {}).items():
+        count(k, v)
+
+def reset():
+    with _LOCK:
+        _EVENTS.clear(); _STAGES.clear(); _BY_SYMBOL.clear(); _COUNTERS.clear()
+
+def snapshot() -> dict:
+    """{'stages': {nom: n, total_ms, mean_ms, max_ms}, 'by_symbol': {sym: {nom: ms}}, 'counters': {...}}"""
+    with _LOCK:
+        stages = {k: {'n': n, 'total_ms': 1000*t, 'mean_ms': 1000*t/n if n else 0.0, 'max_ms': 1000*m}
+                  for k, (n, t, m) in sorted(_STAGES.items(), key=lambda kv: -kv[1][1])}
+        by_symbol = {s: {k: 1000*v for k, v in d.items()} for s, d in _BY_SYMBOL.items()}
+        return {'stages': stages, 'by_symbol': by_symbol, 'counters': dict(_COUNTERS)}
+
+def chrome_trace() -> dict:
+    """Événements au format Chrome trace (phase 'X', microsecondes)."""
+    with _LOCK:
+        events = list(_EVENTS)
+    return {'traceEvents': [{'name': n, 'cat': n.split('.', 1)[0], 'ph': 'X', 'ts': t0 * 1e6, 'dur': dt * 1e6,
+                             'pid': pid, 'tid': tid, 'args': {'symbol': s} if s else {}}
+                            for n, t0, dt, pid, tid, s in events],
+            'displayTimeUnit': 'ms'}
+
+def export_json(path: str = None) -> str:
+    out = json.dumps(snapshot(), indent=1)
+    if path:
+        with open(path, 'w') as f: f.write(out)
+    return out
+
+def export_chrome(path: str = None) -> str:
+    out = json.dumps(chrome_trace())
+    if path:
+        with open(path, 'w') as f: f.write(out)
+    return out
+
+class profile:
+    """cProfile à la demande : with profile() as p: ...  puis p.report(30) (texte pstats)."""
+    def __init__(self, sort: str = 'cumulative'):
+        self.sort = sort; self.prof = None
+    def __enter__(self):
+        import cProfile
+        self.prof = cProfile.Profile(); self.prof.enable(); return self
+    def __exit__(self, *exc):
+        self.prof.disable(); return False
+    def report(self, limit: int = 30) -> str:
+        import pstats
+        buf = io.StringIO()
+        pstats.Stats(self.prof, stream=buf).sort_stats(self.sort).print_stats(limit)
+        return buf.getvalue()
+    def dump(self, path: str):
+        self.prof.dump_stats(path)
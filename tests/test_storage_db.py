@@ -0,0 +1,63 @@
+"""Ouverture concurrente de la base : les migrations ne doivent s'appliquer qu'une fois."""
+import os, sys, sqlite3
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.storage import db
+
+
+def _open(path, barrier):
+    barrier.wait()
+    conn = db.connect(path)
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def _worker(path, barrier, out):
+    try:
+        out.put(_open(path, barrier))
+    except Exception as e:   # remonté au test
+        out.put(repr(e))
+
+
+def test_connect_from_several_processes(tmp_path):
+    ctx = mp.get_context('spawn')
+    for run in range(5):
+        path = str(tmp_path / f'helios-{run}.db')
+        barrier, out = ctx.Barrier(4), ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(path, barrier, out)) for _ in range(4)]
+        for p in procs: p.start()
+        res = [out.get(timeout=60) for _ in procs]
+        for p in procs: p.join()
+        assert res == [len(db.MIGRATIONS)] * 4, res
+        cols = [r[1] for r in sqlite3.connect(path).execute('PRAGMA table_info(positions)')]
+        assert cols.count('hit') == 1 and cols.count('hit_ts') == 1
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    path = str(tmp_path / 'helios.db')
+    conn = sqlite3.connect(path)
+    monkeypatch.setattr(db, 'MIGRATIONS', db.MIGRATIONS + ['CREATE TABLE broken (;'])
+    try:
+        db.migrate(conn)
+    except sqlite3.OperationalError:
+        pass
+    else:
+        raise AssertionError('la migration invalide aurait dû échouer')
+    assert not conn.in_transaction
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(db.MIGRATIONS) - 1
+
+
+def test_import_legacy_databases(tmp_path):
+    old = sqlite3.connect(str(tmp_path / 'portfolio.db'))
+    old.execute('CREATE TABLE positions (id INTEGER PRIMARY KEY AUTOINCREMENT, open_ts TEXT, close_ts TEXT, symbol TEXT, '
+                'side TEXT, entry REAL, sl REAL, tp REAL, qty REAL, status TEXT, exit_price REAL, pnl REAL, note TEXT)')
+    old.execute("INSERT INTO positions (open_ts, symbol, side, entry, sl, tp, qty, status) "
+                "VALUES ('2025-01-01', 'BTC/USDT', 'LONG', 100, 90, 120, 1, 'OPEN')")
+    old.commit(); old.close()
+    conn = sqlite3.connect(str(tmp_path / 'helios.db'))
+    db.migrate(conn)
+    with conn:
+        copied = db._import_legacy(conn, {'positions': str(tmp_path / 'portfolio.db'),
+                                          'trades': str(tmp_path / 'absent.db')})
+    assert copied == {'positions': 1}
+    assert conn.execute("SELECT symbol, status FROM positions").fetchall() == [('BTC/USDT', 'OPEN')]